@@ -0,0 +1,8 @@
+"""Performance benchmarks for the BlacknWhite game.
+
+Benchmarks are plain scripts run from the project root, for example::
+
+    python -m benchmarks.bench_open_moves
+
+They are not collected by pytest.
+"""
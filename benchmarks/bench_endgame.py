@@ -0,0 +1,75 @@
+"""Benchmark for the exact endgame solver on a fixed position suite.
+
+Each entry of :data:`POSITIONS` is ``(empties, black, white, turn)``;
+the masks were recorded once from seeded random play, so the suite does
+not depend on the strategies or the RNG.
+
+Usage::
+
+    python -m benchmarks.bench_endgame [--max-empties 12]
+"""
+import argparse
+import time
+
+from game.bitboard import BitBoard
+from game.endgame import EndgameSolver
+from game.square import Square
+
+POSITIONS = (
+    (8, 0x60FE572A120AC682, 0x9E00A8D4EDF51944, "WHITE"),
+    (8, 0x023D0A140A11237D, 0xC8C0F5EAF5EEDC00, "WHITE"),
+    (8, 0xFE84C2A7B40A3700, 0x00783D584AF4C0FC, "WHITE"),
+    (10, 0xFC003C226FB27839, 0x03FF031D100C0686, "WHITE"),
+    (10, 0x010145EEFC7870F0, 0x8ED6AA1102870F0C, "WHITE"),
+    (10, 0x01CF0752971A1603, 0x7430782C28E4A9DC, "WHITE"),
+    (12, 0x82848A5A3E3A46E2, 0x5C7874A40105B909, "WHITE"),
+    (12, 0x4126163F3FBD0201, 0x0A19A8C0C0425C7E, "WHITE"),
+    (12, 0x5C2C343C342E8782, 0x015309034BD16875, "WHITE"),
+    (14, 0x7EBF6CBC3D163F01, 0x80401040C2680026, "WHITE"),
+    (14, 0x0380DBB38BCA8402, 0x787F244C34344804, "WHITE"),
+    (14, 0x01404C5E7E4A4662, 0x243723A101353919, "WHITE"),
+)
+
+
+def suite(max_empties=None):
+    """Yield ``(empties, board)`` for every position up to ``max_empties``."""
+    for empties, black, white, turn in POSITIONS:
+        if max_empties is None or empties <= max_empties:
+            yield empties, BitBoard.from_masks(black, white, Square[turn])
+
+
+def run(max_empties=None):
+    """Solve the suite and return one result dict per position."""
+    results = []
+    for empties, board in suite(max_empties):
+        solver = EndgameSolver()
+        started = time.perf_counter()
+        move, score = solver.solve(board)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "empties": empties,
+            "move": move,
+            "score": score,
+            "nodes": solver.nodes,
+            "seconds": elapsed,
+            "nodes_per_sec": solver.nodes / elapsed if elapsed else 0.0,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-empties", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    print("Empties \tMove \tScore \tNodes \tSeconds \tNodes/sec")
+    total_nodes = total_time = 0
+    for r in run(args.max_empties):
+        total_nodes += r["nodes"]
+        total_time += r["seconds"]
+        print(f"{r['empties']} \t{r['move']} \t{r['score']:+d} \t{r['nodes']} \t{r['seconds']:.3f} \t{r['nodes_per_sec']:.0f}")
+    print(f"total \t\t\t{total_nodes} \t{total_time:.3f} \t{total_nodes / total_time if total_time else 0:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Memory footprint of games, positions and moves.
+
+Measures, with :mod:`tracemalloc`, the bytes one object of each kind
+keeps alive: a board (both engines) fresh and after 30 plies of seeded
+random play, a web :class:`~web.core.GameState`, a
+:class:`~game.records.BoardState`, and a move as the ``(pos, flips)``
+pair of :meth:`Board.iter_moves` versus a :class:`~game.records.Move`.
+Shared objects (the RNG, ``Square`` members, small ints) are not
+counted.
+
+On CPython 3.11, before and after boards got ``__slots__``, an
+empty-square mask instead of a set, and shared ``(row, col)`` tuples:
+
+=====================  ======  =====
+bytes                  before  after
+=====================  ======  =====
+Board, fresh             7341   1706
+Board, 30 plies         13800   8169
+BitBoard, fresh           341    317
+BitBoard, 30 plies       8908   6766
+GameState (grid)         7474   1794
+=====================  ======  =====
+
+A :class:`~game.records.BoardState` takes about 80 bytes and a
+:class:`~game.records.Move` about 90, against about 140 for a midgame
+``(pos, flips)`` pair.
+
+Usage::
+
+    python -m benchmarks.bench_memory [--count 500]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from game.bitboard import BitBoard
+from game.board import Board
+from web.core import GameState
+
+
+def per_object(factory, count):
+    """Return the bytes each of ``count`` objects from ``factory(i)`` keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def played(cls, plies, seed):
+    """Return a ``cls`` board after ``plies`` seeded random moves."""
+    board = cls(rng=random.Random(seed))
+    for _ in range(plies):
+        if board.game_over():
+            break
+        board.make_random_move()
+    board.rng = None
+    return board
+
+
+def midgame_moves(cls, count, plies=20):
+    """Return ``count`` boards ``plies`` into seeded random games that have a move."""
+    boards = []
+    seed = 0
+    while len(boards) < count:
+        board = played(cls, plies, seed)
+        seed += 1
+        if not board.game_over() and board.open_moves()["moves"]:
+            boards.append(board)
+    return boards
+
+
+def measure(count=500):
+    """Return ``{name: bytes per object}``."""
+    results = {}
+    for cls in (Board, BitBoard):
+        for plies in (0, 30):
+            label = "fresh" if plies == 0 else f"{plies} plies"
+            results[f"{cls.__name__}, {label}"] = per_object(lambda i: played(cls, plies, i), count)
+    results["GameState (grid)"] = per_object(lambda i: GameState(seed=i), count)
+    states = [played(BitBoard, 30, i) for i in range(count)]
+    results["BoardState"] = per_object(lambda i: states[i].state(), count)
+    boards = midgame_moves(BitBoard, count)
+    # Copy the pairs so the board's move cache does not hide their cost.
+    results["(pos, flips) pair"] = per_object(
+        lambda i: next((tuple(pos), list(flips)) for pos, flips in boards[i].iter_moves()), count)
+    results["Move"] = per_object(lambda i: next(boards[i].iter_move_records()), count)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500, help="objects measured per kind")
+    args = parser.parse_args(argv)
+    for name, size in measure(args.count).items():
+        print(f"{name:<22} {size:8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Micro-benchmark for ``Board.open_moves`` on midgame positions.
+
+Compares the precomputed-ray implementation against the previous one,
+which rebuilt the eight ``*_coords`` lists for every empty square on
+every call.  The current side is timed through ``_generate_moves``,
+bypassing the ``open_moves`` cache, so both sides compute the moves on
+every call.  Positions are reached by seeded random play so runs are
+comparable.
+
+Usage::
+
+    python -m benchmarks.bench_open_moves [--positions 50] [--repeat 20]
+"""
+import argparse
+import random
+import timeit
+
+from game.board import Board
+
+
+def legacy_open_moves(board):
+    """The pre-ray-table ``open_moves``, kept here as the baseline."""
+    results = {"color": board.current_turn, "moves": {}}
+    for sq in board.open_squares():
+        paths = [board.north_coords(sq), board.south_coords(sq), board.east_coords(sq), board.west_coords(sq),
+                 board.northeast_coords(sq), board.northwest_coords(sq), board.southeast_coords(sq),
+                 board.southwest_coords(sq)]
+        flip_list = []
+        for path in paths:
+            flips = board.get_flips(path)
+            if flips:
+                flip_list.extend(flips)
+        if flip_list:
+            results["moves"][sq] = flip_list
+    return results
+
+
+def midgame_positions(count, seed=2024, plies=(16, 40)):
+    """Return ``count`` boards reached by seeded random play."""
+    rng_state = random.getstate()
+    random.seed(seed)
+    positions = []
+    try:
+        while len(positions) < count:
+            board = Board()
+            target = random.randint(*plies)
+            for _ in range(target):
+                if board.game_over():
+                    break
+                board.make_random_move()
+            if not board.game_over():
+                positions.append(board)
+    finally:
+        random.setstate(rng_state)
+    return positions
+
+
+def run(positions, repeat):
+    """Time both implementations; return microseconds per call for each."""
+    for board in positions:
+        assert legacy_open_moves(board) == board._generate_moves()
+
+    def legacy():
+        for board in positions:
+            legacy_open_moves(board)
+
+    def current():
+        for board in positions:
+            board._generate_moves()
+
+    calls = len(positions) * repeat
+    legacy_us = min(timeit.repeat(legacy, number=repeat, repeat=3)) / calls * 1e6
+    current_us = min(timeit.repeat(current, number=repeat, repeat=3)) / calls * 1e6
+    return legacy_us, current_us
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    legacy_us, current_us = run(midgame_positions(args.positions), args.repeat)
+    print(f"legacy open_moves: \t{legacy_us:8.1f} us/call")
+    print(f"ray-table open_moves: \t{current_us:8.1f} us/call")
+    print(f"speedup: \t\t{legacy_us / current_us:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Benchmark suite for move generation, strategies and the web API.
+
+Every benchmark runs on the fixed corpus of :data:`POSITIONS`, recorded
+once from seeded random play, so results are comparable across commits
+and do not shift when the strategies or the RNG change.  Each benchmark
+is timed ``--repeat`` times and the best run is kept; endpoint latency
+is the median over the requests made.
+
+Results are written as JSON (``-o``).  With ``--baseline`` the run is
+compared against a saved result file, and any benchmark slower than the
+baseline by more than ``--threshold`` (a fraction, default 0.25) is a
+regression: it is reported on stderr and the exit status is 1.
+
+Usage::
+
+    python -m benchmarks.suite -o baseline.json
+    python -m benchmarks.suite --baseline baseline.json [--only strategy]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+from game.engine import ENGINE_ENV_VAR, board_class
+from game.square import Square
+from game.transposition import TranspositionTable
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+
+# (discs on the board, black mask, white mask, side to move)
+POSITIONS = (
+    (10, 0x0000040808380000, 0x0000081030000000, "WHITE"),
+    (13, 0x0000201018040400, 0x00000E0C04020000, "BLACK"),
+    (16, 0x0000201414020500, 0x00000808282C2000, "WHITE"),
+    (19, 0x0000301818200808, 0x001C0800240E1000, "BLACK"),
+    (22, 0x00020C0C68302020, 0x24181010100C0800, "WHITE"),
+    (25, 0x081040103E040200, 0x024C3E0C00700000, "BLACK"),
+    (28, 0x00673E1C18700000, 0x1F18000200004080, "WHITE"),
+    (31, 0x000038C6CC201008, 0x0000043830D8E470, "BLACK"),
+    (34, 0x108C5A2958380808, 0x4562249420401010, "WHITE"),
+    (37, 0x0030387A38381808, 0x7A03828482C58000, "BLACK"),
+    (40, 0x133A40D8404040C0, 0x04043E263E34B804, "WHITE"),
+    (43, 0x1E32753802665108, 0x21490A06FC188010, "BLACK"),
+    (46, 0x02042A3020E874A8, 0x59FB150FDA160200, "WHITE"),
+    (49, 0x008C98B8D18884BE, 0x070325442C777B00, "BLACK"),
+    (52, 0x60705E7440481400, 0x9F0EA088BEB4E8FC, "WHITE"),
+    (55, 0x00911CBCF052F012, 0x7D6643430F2D0FE0, "BLACK"),
+    (58, 0x0003868792BEE6FF, 0x7F7C78786C410800, "WHITE"),
+    (61, 0x9EA6CEF2F4E0D080, 0x2159310D0B1F2F67, "BLACK"),
+)
+
+# Node budget per 'search' move, so its cost does not depend on the clock.
+SEARCH_NODES = 300
+
+# Games per run of the full-game benchmark.
+GAMES = 20
+
+# Games played through the web API per run of the endpoint benchmarks.
+API_GAMES = 3
+
+
+def corpus(engine=None, seed=0):
+    """Return fresh boards for :data:`POSITIONS`, each with its own seeded RNG."""
+    cls = board_class(engine)
+    return [cls.from_masks(black, white, Square[turn], rng=random.Random(f"{seed}/{i}"))
+            for i, (_, black, white, turn) in enumerate(POSITIONS)]
+
+
+@contextlib.contextmanager
+def configured_engine(engine):
+    """Make ``engine`` the default of :func:`board_class` inside the block.
+
+    The web layer picks its boards through ``BLACKNWHITE_ENGINE``, so this
+    is how its benchmarks follow ``--engine``.
+    """
+    old = os.environ.get(ENGINE_ENV_VAR)
+    if engine is not None:
+        os.environ[ENGINE_ENV_VAR] = engine
+    try:
+        yield
+    finally:
+        if old is None:
+            os.environ.pop(ENGINE_ENV_VAR, None)
+        else:
+            os.environ[ENGINE_ENV_VAR] = old
+
+
+def best_us(fn, ops, repeat):
+    """Return the best time of ``fn`` over ``repeat`` runs, in microseconds per op."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / ops * 1e6
+
+
+# ---------------------------------------------------------------------------
+# Board benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_open_moves(engine, repeat):
+    """Move generation with the per-position cache bypassed."""
+    boards = corpus(engine)
+
+    def run():
+        for board in boards:
+            board._generate_moves()
+
+    return {"us_per_op": best_us(run, len(boards), repeat), "ops": len(boards)}
+
+
+def bench_open_moves_cached(engine, repeat):
+    """``open_moves`` on an unchanged position, answered from its cache."""
+    boards = corpus(engine)
+    for board in boards:
+        board.open_moves()
+
+    def run():
+        for board in boards:
+            board.open_moves()
+
+    return {"us_per_op": best_us(run, len(boards), repeat), "ops": len(boards)}
+
+
+def bench_make_move(engine, repeat):
+    """``make_move`` followed by ``undo_move`` for every legal move."""
+    boards = corpus(engine)
+    moves = [(board, pos, flips) for board in boards for pos, flips in board.open_moves()["moves"].items()]
+
+    def run():
+        for board, pos, flips in moves:
+            board.make_move(pos, flips)
+            board.undo_move()
+
+    return {"us_per_op": best_us(run, len(moves), repeat), "ops": len(moves)}
+
+
+def bench_get_flips(engine, repeat):
+    """``get_flips`` along the eight rays of every empty square."""
+    boards = corpus(engine)
+    rays = []
+    for board in boards:
+        for sq in board.open_squares():
+            for coords in (board.north_coords, board.south_coords, board.east_coords, board.west_coords,
+                           board.northeast_coords, board.northwest_coords, board.southeast_coords,
+                           board.southwest_coords):
+                rays.append((board, coords(sq)))
+
+    def run():
+        for board, ray in rays:
+            board.get_flips(ray)
+
+    return {"us_per_op": best_us(run, len(rays), repeat), "ops": len(rays)}
+
+
+def _strategy_bench(method, **kwargs):
+    def bench(engine, repeat):
+        boards = corpus(engine)
+
+        def run():
+            for i, board in enumerate(boards):
+                board.rng = random.Random(i)
+                board._moves_cache = None
+                getattr(board, method)(**kwargs)
+                board.undo_move()
+
+        return {"us_per_op": best_us(run, len(boards), repeat), "ops": len(boards)}
+
+    bench.__doc__ = f"``{method}`` on every corpus position (move cache cold)."
+    return bench
+
+
+def bench_search_move(engine, repeat):
+    """``make_search_move`` with a fixed node budget and a cleared table."""
+    boards = corpus(engine)
+    tt = TranspositionTable(size_mb=1)
+
+    def run():
+        tt.clear()
+        for board in boards:
+            board._moves_cache = None
+            board.make_search_move(time_limit=None, node_limit=SEARCH_NODES, tt=tt)
+            board.undo_move()
+
+    return {"us_per_op": best_us(run, len(boards), repeat), "ops": len(boards)}
+
+
+def bench_games(engine, repeat):
+    """Full seeded random-vs-random games; also reported as games per second."""
+    from game.tournament import play_game
+
+    def run():
+        for index in range(GAMES):
+            play_game("random", "random", index, engine=engine)
+
+    us = best_us(run, GAMES, repeat)
+    return {"us_per_op": us, "ops": GAMES, "games_per_sec": 1e6 / us}
+
+
+# ---------------------------------------------------------------------------
+# Serialization benchmarks
+# ---------------------------------------------------------------------------
+
+def _serialization_bench(dump, load=None):
+    """Time ``dump(board)``, or ``load(cls, dump(board))`` with the engine's class."""
+    def bench(engine, repeat):
+        boards = corpus(engine)
+        items = [dump(board) for board in boards] if load else boards
+        cls = board_class(engine)
+        fn = (lambda item: load(cls, item)) if load else dump
+
+        def run():
+            for item in items:
+                fn(item)
+
+        return {"us_per_op": best_us(run, len(items), repeat), "ops": len(items)}
+
+    return bench
+
+
+def _game_state(board):
+    from web.core import GameState
+    state = GameState(strategy="smart", color=board.current_turn.name, seed=0)
+    state.board = board
+    return state
+
+
+def bench_state_to_json(engine, repeat):
+    """``GameState.to_json`` with ``valid_moves``, as served by the API."""
+    states = [_game_state(board) for board in corpus(engine)]
+
+    def run():
+        for state in states:
+            state.board._moves_cache = None
+            state.to_json()
+
+    return {"us_per_op": best_us(run, len(states), repeat), "ops": len(states)}
+
+
+def bench_state_to_json_compact(engine, repeat):
+    """``GameState.to_json(compact=True)``."""
+    states = [_game_state(board) for board in corpus(engine)]
+
+    def run():
+        for state in states:
+            state.board._moves_cache = None
+            state.to_json(compact=True)
+
+    return {"us_per_op": best_us(run, len(states), repeat), "ops": len(states)}
+
+
+def bench_state_from_json(engine, repeat):
+    """``GameState.from_json`` of the full form."""
+    from web.core import GameState
+
+    def run():
+        for payload in payloads:
+            GameState.from_json(payload)
+
+    with configured_engine(engine):
+        payloads = [_game_state(board).to_json() for board in corpus(engine)]
+        return {"us_per_op": best_us(run, len(payloads), repeat), "ops": len(payloads)}
+
+
+# ---------------------------------------------------------------------------
+# Web API benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_api(engine, repeat):
+    """Latency of each endpoint through the Flask test client.
+
+    Plays :data:`API_GAMES` games against the ``first`` strategy per run
+    and returns one result per endpoint: the median over every request.
+    """
+    from web.app import app
+
+    timings = {}
+
+    def timed(client, method, url, **kwargs):
+        started = time.perf_counter()
+        res = getattr(client, method)(url, **kwargs)
+        timings.setdefault(f"{method.upper()} {url}", []).append(time.perf_counter() - started)
+        return res.get_json()
+
+    for _ in range(repeat):
+        with configured_engine(engine), app.test_client() as client:
+            for game in range(API_GAMES):
+                data = timed(client, "post", "/api/start", json={"color": "WHITE", "strategy": "first", "seed": game})
+                while not data.get("error"):
+                    timed(client, "get", "/api/board")
+                    if not data["valid_moves"]:
+                        break
+                    row, col = data["valid_moves"][0]
+                    timed(client, "post", "/api/move", json={"row": row, "col": col})
+                    data = timed(client, "post", "/api/opponentmove")
+                timed(client, "post", "/api/reset")
+
+    return {
+        f"api {endpoint}": {"us_per_op": statistics.median(samples) * 1e6, "ops": len(samples)}
+        for endpoint, samples in timings.items()
+    }
+
+
+BENCHMARKS = (
+    ("open_moves", bench_open_moves),
+    ("open_moves.cached", bench_open_moves_cached),
+    ("make_move", bench_make_move),
+    ("get_flips", bench_get_flips),
+    ("strategy.random", _strategy_bench("make_random_move")),
+    ("strategy.maxflips", _strategy_bench("make_maxflips_move")),
+    ("strategy.smart", _strategy_bench("make_smart_move")),
+    ("strategy.search", bench_search_move),
+    ("games", bench_games),
+    ("board.to_json", _serialization_bench(lambda board: board.to_json())),
+    ("board.from_json", _serialization_bench(lambda board: board.to_json(), lambda cls, s: cls.from_json(s))),
+    ("board.to_bytes", _serialization_bench(lambda board: board.to_bytes())),
+    ("board.from_bytes", _serialization_bench(lambda board: board.to_bytes(), lambda cls, b: cls.from_bytes(b))),
+    ("state.to_json", bench_state_to_json),
+    ("state.to_json.compact", bench_state_to_json_compact),
+    ("state.from_json", bench_state_from_json),
+    # Returns one result per endpoint.
+    ("api", bench_api),
+)
+
+
+def run(engine=None, repeat=5, only=None):
+    """Run the benchmarks whose name contains one of ``only`` (all by default).
+
+    Returns the result document: ``{"version", "meta", "results"}`` with
+    ``results`` mapping benchmark name to ``{"us_per_op", "ops", ...}``.
+    """
+    results = {}
+    for name, bench in BENCHMARKS:
+        if only and not any(part in name for part in only):
+            continue
+        result = bench(engine, repeat)
+        if "us_per_op" in result:
+            results[name] = result
+        else:
+            results.update(result)
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "engine": board_class(engine).__name__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "positions": len(POSITIONS),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare two result documents.
+
+    Returns ``[(name, baseline_us, current_us, ratio, regressed)]`` for
+    the benchmarks present in both; ``regressed`` is True when
+    ``current_us`` exceeds ``baseline_us`` by more than ``threshold``.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = result["us_per_op"] / old["us_per_op"] if old["us_per_op"] else float("inf")
+        rows.append((name, old["us_per_op"], result["us_per_op"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=("grid", "bitboard"), help="board engine (default: BLACKNWHITE_ENGINE)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark; the best is kept")
+    parser.add_argument("--only", nargs="+", help="run only benchmarks whose name contains one of these")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this saved result file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    args = parser.parse_args(argv)
+
+    document = run(args.engine, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        for name, result in document["results"].items():
+            print(f"{name:28} {result['us_per_op']:12.1f} us/op")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("engine") != document["meta"]["engine"]:
+        print(f"warning: baseline engine {baseline['meta'].get('engine')} differs from "
+              f"{document['meta']['engine']}", file=sys.stderr)
+    regressions = 0
+    for name, old_us, new_us, ratio, regressed in compare(document, baseline, args.threshold):
+        flag = "\tREGRESSION" if regressed else ""
+        print(f"{name:28} {old_us:12.1f} -> {new_us:12.1f} us/op \t{ratio:6.2f}x {flag}")
+        if regressed:
+            regressions += 1
+            print(f"REGRESSION: {name} is {ratio:.2f}x its baseline "
+                  f"({old_us:.1f} -> {new_us:.1f} us/op)", file=sys.stderr)
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
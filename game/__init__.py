@@ -5,6 +5,10 @@ This package exposes the core game types used across the project:
 - ``Square``: an enum describing the state of a single board cell.
 - ``Board``: the game board implementation, move generation, and
 	simple opponent strategies.
+- ``BitBoard``: a faster drop-in ``Board`` backed by two 64-bit masks.
+- ``create_board``: build a board using the configured engine.
+- ``Move`` and ``BoardState``: compact slotted records of moves and
+	positions.
 
 Import these from the package root for convenience::
 
@@ -14,8 +18,16 @@ Import these from the package root for convenience::
 
 from .square import Square
 from .board import Board
+from .bitboard import BitBoard
+from .engine import board_class, create_board
+from .records import BoardState, Move
 
 __all__ = [
 		"Square",
 		"Board",
+		"BitBoard",
+		"board_class",
+		"create_board",
+		"Move",
+		"BoardState",
 ]
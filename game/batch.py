@@ -0,0 +1,199 @@
+"""Vectorized batch game simulator for the BlacknWhite game.
+
+Plays many games at once by holding every board as a pair of ``uint64``
+NumPy arrays (black and white masks, bit ``row * 8 + col`` as in
+:mod:`game.bitboard`).  Legal-move generation, move selection, flipping
+and end-of-game detection all run as whole-array operations, so the
+cost per ply is a few dozen NumPy calls no matter how many games are in
+the batch.
+
+Supported policies mirror the :class:`~game.board.Board` strategies:
+
+- ``"random"``: a uniformly random legal move (``make_random_move``);
+- ``"maxflips"``: a move flipping the most discs, ties broken uniformly
+  at random (``make_maxflips_move``).
+
+Results are statistically equivalent to playing the same pairing with
+:mod:`game.tournament`, but not game-for-game identical, since the
+random draws come from a NumPy generator.
+
+Requires NumPy (see ``requirements-dev.txt``).
+
+Typical usage::
+
+    from game.batch import simulate, summarize
+    white, black = simulate(100_000, "random", "maxflips", seed=1)
+    print(format_row("random", "maxflips", summarize(white, black)))
+
+where ``format_row`` comes from :mod:`game.tournament`.
+"""
+import numpy as np
+
+FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_NOT_FILE_A = np.uint64(0xFEFEFEFEFEFEFEFE)
+_NOT_FILE_H = np.uint64(0x7F7F7F7F7F7F7F7F)
+
+# (shift, mask) per direction; see game.bitboard.DIRECTIONS.
+DIRECTIONS = (
+    (-8, FULL),
+    (8, FULL),
+    (1, _NOT_FILE_A),
+    (-1, _NOT_FILE_H),
+    (-7, _NOT_FILE_A),
+    (-9, _NOT_FILE_H),
+    (9, _NOT_FILE_A),
+    (7, _NOT_FILE_H),
+)
+
+POLICIES = ("random", "maxflips")
+
+_BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+_START_BLACK = np.uint64((1 << 28) | (1 << 35))
+_START_WHITE = np.uint64((1 << 27) | (1 << 36))
+
+
+def _shift(bits, amount, mask):
+    if amount > 0:
+        return (bits << np.uint64(amount)) & mask
+    return (bits >> np.uint64(-amount)) & mask
+
+
+def popcount(bits):
+    """Return the number of set bits of every element of a ``uint64`` array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).astype(np.int64)
+    bits = bits - ((bits >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    bits = (bits & np.uint64(0x3333333333333333)) + ((bits >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    bits = (bits + (bits >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((bits * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def legal_moves(own, opp):
+    """Return the legal-move mask of every board for the side owning ``own``."""
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for amount, mask in DIRECTIONS:
+        run = _shift(own, amount, mask) & opp
+        for _ in range(5):
+            run |= _shift(run, amount, mask) & opp
+        moves |= _shift(run, amount, mask)
+    return moves & empty
+
+
+def flips(own, opp, move):
+    """Return the discs flipped by playing the single-bit ``move`` on each board.
+
+    ``own``, ``opp`` and ``move`` broadcast against each other, so a
+    ``(N, 1)`` position can be combined with ``(N, 64)`` candidate moves.
+    """
+    flipped = np.zeros(np.broadcast(own, opp, move).shape, dtype=np.uint64)
+    for amount, mask in DIRECTIONS:
+        run = _shift(move, amount, mask) & opp
+        for _ in range(5):
+            run |= _shift(run, amount, mask) & opp
+        closed = (_shift(run, amount, mask) & own) != 0
+        flipped |= np.where(closed, run, np.uint64(0))
+    return flipped
+
+
+def _choose_random(moves, rng):
+    """Pick one set bit of each non-zero mask uniformly at random."""
+    counts = popcount(moves)
+    pick = (rng.random(moves.shape[0]) * counts).astype(np.int64)
+    is_set = (moves[:, None] & _BITS) != 0
+    ranks = np.cumsum(is_set, axis=1) - 1
+    index = np.argmax(is_set & (ranks == pick[:, None]), axis=1)
+    return _BITS[index]
+
+
+def _choose_maxflips(own, opp, moves, rng):
+    """Pick the move flipping the most discs, breaking ties at random."""
+    candidates = moves[:, None] & _BITS
+    counts = popcount(flips(own[:, None], opp[:, None], candidates)).astype(np.float64)
+    counts += rng.random(counts.shape) * 0.5
+    counts[candidates == 0] = -1.0
+    return _BITS[np.argmax(counts, axis=1)]
+
+
+def choose_moves(policy, own, opp, moves, rng):
+    """Return one single-bit move per board under ``policy``."""
+    if policy == "random":
+        return _choose_random(moves, rng)
+    if policy == "maxflips":
+        return _choose_maxflips(own, opp, moves, rng)
+    raise ValueError(f"Unknown batch policy: {policy!r}")
+
+
+def _policy_name(name):
+    """Accept ``'maxflips'`` as well as the Board method name ``'make_maxflips_move'``."""
+    if name.startswith("make_") and name.endswith("_move"):
+        return name[len("make_"):-len("_move")]
+    return name
+
+
+def simulate(games, white_policy="random", black_policy="random", seed=None, alternate_first=True):
+    """Play ``games`` complete games at once and return the final disc counts.
+
+    Args:
+        games: number of games in the batch.
+        white_policy: policy for WHITE (``"random"`` or ``"maxflips"``).
+        black_policy: policy for BLACK.
+        seed: seed for the NumPy random generator.
+        alternate_first: like :mod:`game.tournament`, start even-numbered
+            games with BLACK to move; otherwise WHITE always starts, as on a
+            fresh :class:`~game.board.Board`.
+
+    Returns:
+        ``(white_counts, black_counts)`` as ``int64`` arrays of length ``games``.
+    """
+    white_policy, black_policy = _policy_name(white_policy), _policy_name(black_policy)
+    for policy in (white_policy, black_policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown batch policy: {policy!r}")
+    rng = np.random.default_rng(seed)
+
+    black = np.full(games, _START_BLACK, dtype=np.uint64)
+    white = np.full(games, _START_WHITE, dtype=np.uint64)
+    black_to_move = np.zeros(games, dtype=bool)
+    if alternate_first:
+        black_to_move[::2] = True
+    passes = np.zeros(games, dtype=np.int8)
+    live = np.arange(games)
+
+    while live.size:
+        b, w, btm = black[live], white[live], black_to_move[live]
+        own = np.where(btm, b, w)
+        opp = np.where(btm, w, b)
+        moves = legal_moves(own, opp)
+
+        has_move = moves != 0
+        move = np.zeros_like(own)
+        for policy, side in ((black_policy, btm), (white_policy, ~btm)):
+            rows = np.nonzero(side & has_move)[0]
+            if rows.size:
+                move[rows] = choose_moves(policy, own[rows], opp[rows], moves[rows], rng)
+
+        flipped = flips(own, opp, move)
+        own = own | move | flipped
+        opp = opp & ~flipped
+        black[live] = np.where(btm, own, opp)
+        white[live] = np.where(btm, opp, own)
+        black_to_move[live] = ~btm
+        passes[live] = np.where(has_move, 0, passes[live] + 1)
+
+        finished = (passes[live] >= 2) | ((black[live] | white[live]) == FULL)
+        live = live[~finished]
+
+    return popcount(white), popcount(black)
+
+
+def summarize(white_counts, black_counts):
+    """Aggregate final counts into the totals dict used by :mod:`game.tournament`."""
+    return {
+        "games": int(white_counts.size),
+        "white_wins": int(np.count_nonzero(white_counts > black_counts)),
+        "black_wins": int(np.count_nonzero(black_counts > white_counts)),
+        "ties": int(np.count_nonzero(white_counts == black_counts)),
+        "white_discs": int(white_counts.sum()),
+        "black_discs": int(black_counts.sum()),
+    }
@@ -0,0 +1,390 @@
+"""Bitboard engine for the BlacknWhite game.
+
+This module provides :class:`BitBoard`, a drop-in alternative to
+:class:`~game.board.Board` that stores the position as two 64-bit
+integers (one per color) instead of an 8x8 list of
+:class:`~game.square.Square` values.
+
+Square ``(row, col)`` maps to bit ``row * 8 + col``, so iterating the
+set bits of a mask from least to most significant visits squares in the
+same row-major order as :meth:`Board.open_squares`.
+
+Legal moves are found for all squares at once with Kogge-Stone
+occluded fills (:func:`legal_moves_mask`); flips are only computed for
+the squares that are actually asked about (:func:`flip_mask`).  Engines
+can use the mask-only API (:meth:`BitBoard.legal_mask`,
+:meth:`BitBoard.flip_mask`, :meth:`BitBoard.play`), while
+:meth:`BitBoard.open_moves` still returns the ``{"color", "moves"}``
+dict, with flips listed in the same ray order as :class:`Board`, so
+every strategy result stays identical between the two engines.
+
+Typical usage::
+
+    from game.bitboard import BitBoard
+    board = BitBoard()
+    moves = board.open_moves()
+"""
+from .board import POSITIONS, Board
+from .records import Move
+from .square import Square
+from .zobrist import DISC_KEYS, FLIP_KEYS, hash_masks, side_key
+
+FULL = 0xFFFFFFFFFFFFFFFF
+FILE_A = 0x0101010101010101
+FILE_H = 0x8080808080808080
+
+# (shift, mask) per direction, in the same order Board.open_moves walks
+# its rays: north, south, east, west, northeast, northwest, southeast,
+# southwest.  The mask clears bits that wrapped around a board edge.
+DIRECTIONS = (
+    (-8, FULL),
+    (8, FULL),
+    (1, FULL & ~FILE_A),
+    (-1, FULL & ~FILE_H),
+    (-7, FULL & ~FILE_A),
+    (-9, FULL & ~FILE_H),
+    (9, FULL & ~FILE_A),
+    (7, FULL & ~FILE_H),
+)
+
+
+def shift(bits, amount, mask):
+    """Shift ``bits`` by ``amount`` squares and clear wrapped bits with ``mask``."""
+    if amount > 0:
+        return (bits << amount) & mask
+    return (bits >> -amount) & mask
+
+
+def iter_bits(bits):
+    """Yield the index of every set bit in ``bits`` in ascending order."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def index_to_pos(index):
+    """Convert a bit index to a ``(row, col)`` tuple."""
+    return POSITIONS[index]
+
+
+def pos_to_bit(pos):
+    """Convert a ``(row, col)`` tuple to a single-bit mask."""
+    return 1 << (pos[0] * 8 + pos[1])
+
+
+def popcount(bits):
+    """Return the number of set bits in ``bits``."""
+    return bits.bit_count()
+
+
+def _occluded_fill(gen, pro, amount, mask):
+    """Kogge-Stone fill of ``gen`` through ``pro`` in one direction.
+
+    Returns ``gen`` plus every ``pro`` square reachable from it by an
+    unbroken run in the direction given by ``amount``/``mask``.
+    """
+    pro &= mask
+    if amount > 0:
+        gen |= pro & (gen << amount)
+        pro &= pro << amount
+        gen |= pro & (gen << (2 * amount))
+        pro &= pro << (2 * amount)
+        gen |= pro & (gen << (4 * amount))
+    else:
+        amount = -amount
+        gen |= pro & (gen >> amount)
+        pro &= pro >> amount
+        gen |= pro & (gen >> (2 * amount))
+        pro &= pro >> (2 * amount)
+        gen |= pro & (gen >> (4 * amount))
+    return gen
+
+
+def legal_moves_mask(own, opp):
+    """Return the mask of squares where ``own`` may legally play against ``opp``."""
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for amount, mask in DIRECTIONS:
+        run = _occluded_fill(own, opp, amount, mask) & opp
+        moves |= shift(run, amount, mask)
+    return moves & empty
+
+
+def flip_mask(own, opp, index):
+    """Return the mask of ``opp`` discs flipped by ``own`` playing at ``index``."""
+    bit = 1 << index
+    flips = 0
+    for amount, mask in DIRECTIONS:
+        run = 0
+        cur = shift(bit, amount, mask)
+        while cur & opp:
+            run |= cur
+            cur = shift(cur, amount, mask)
+        if cur & own:
+            flips |= run
+    return flips
+
+
+def _flip_list(own, opp, index):
+    """Return the flips for ``index`` as ``(row, col)`` tuples in Board ray order."""
+    bit = 1 << index
+    flip_list = []
+    for amount, mask in DIRECTIONS:
+        run = []
+        cur = shift(bit, amount, mask)
+        while cur & opp:
+            run.append(cur)
+            cur = shift(cur, amount, mask)
+        if run and cur & own:
+            flip_list.extend(index_to_pos(b.bit_length() - 1) for b in run)
+    return flip_list
+
+
+class BitBoard(Board):
+    """
+    Game board backed by two 64-bit masks plus side-to-move.
+
+    Exposes the same public API as :class:`Board`; the ``grid`` attribute
+    is available as a read-only list-of-lists view built on demand.
+    """
+    __slots__ = ("black", "white")
+
+    def __init__(self, rng=None):
+        """
+        Initialize the standard starting position.
+        WHITE is on (3,3) and (4,4), BLACK on (3,4) and (4,3); WHITE moves first.
+
+        Args:
+            rng: a :class:`random.Random` for the randomized strategies;
+                ``None`` (the default) uses the global :mod:`random` module.
+        """
+        self.rng = rng
+        self.size = 8
+        self.black = pos_to_bit((3, 4)) | pos_to_bit((4, 3))
+        self.white = pos_to_bit((3, 3)) | pos_to_bit((4, 4))
+        self.current_turn = Square.WHITE
+        self.pass_count = 0
+        self.consecutive_passes = 0
+        self.move_stack = []
+        self._moves_cache = None
+        self._moves_probes = 0
+        self._moves_hits = 0
+        self._rehash()
+
+    def _rehash(self):
+        """Recompute the disc part of the Zobrist key from the masks."""
+        self._disc_hash = hash_masks(self.black, self.white)
+
+    @property
+    def zobrist_key(self):
+        """The position's 64-bit Zobrist key, including the side to move."""
+        return self._disc_hash ^ side_key(self.current_turn)
+
+    @property
+    def grid(self):
+        """Return the position as an 8x8 list of lists of :class:`Square`."""
+        black, white = self.black, self.white
+        rows = []
+        for r in range(self.size):
+            row = []
+            for c in range(self.size):
+                bit = 1 << (r * 8 + c)
+                if black & bit:
+                    row.append(Square.BLACK)
+                elif white & bit:
+                    row.append(Square.WHITE)
+                else:
+                    row.append(Square.OPEN)
+            rows.append(row)
+        return rows
+
+    def masks(self):
+        """Return the position as ``(black, white)`` masks."""
+        return self.black, self.white
+
+    def _sides(self):
+        """Return ``(own, opponent)`` masks for the side to move."""
+        if self.current_turn == Square.BLACK:
+            return self.black, self.white
+        return self.white, self.black
+
+    def open_squares(self):
+        empty = ~(self.black | self.white) & FULL
+        return [index_to_pos(i) for i in iter_bits(empty)]
+
+    def open_count(self):
+        return 64 - popcount(self.black | self.white)
+
+    def count(self, square_type):
+        if square_type == Square.BLACK:
+            return popcount(self.black)
+        if square_type == Square.WHITE:
+            return popcount(self.white)
+        return self.open_count()
+
+    def legal_mask(self):
+        """Return the mask of legal move squares for the side to move."""
+        own, opp = self._sides()
+        return legal_moves_mask(own, opp)
+
+    def flip_mask(self, index):
+        """Return the mask of discs flipped by playing at bit ``index``."""
+        own, opp = self._sides()
+        return flip_mask(own, opp, index)
+
+    def play(self, index):
+        """Play the legal move at bit ``index`` and return its flip mask.
+
+        This is the allocation-free counterpart of :meth:`make_move` for
+        engines that work on :meth:`legal_mask` directly.
+        """
+        if self.game_over():
+            raise Exception("Game is over, cannot make a move.")
+        flips = self.flip_mask(index)
+        if not flips:
+            raise ValueError("No pieces to flip for this move.")
+        self.move_stack.append((1 << index, flips, self.current_turn, self.consecutive_passes))
+        self._apply(1 << index, flips)
+        return flips
+
+    def _generate_moves(self):
+        own, opp = self._sides()
+        moves = {}
+        for index in iter_bits(legal_moves_mask(own, opp)):
+            moves[index_to_pos(index)] = _flip_list(own, opp, index)
+        return {"color": self.current_turn, "moves": moves}
+
+    def _move_candidates(self, order):
+        legal = self.legal_mask()
+        if order is None:
+            return [index_to_pos(index) for index in iter_bits(legal)]
+        return (pos for pos in order if legal >> (pos[0] * 8 + pos[1]) & 1)
+
+    def _flips_at(self, pos):
+        own, opp = self._sides()
+        return _flip_list(own, opp, pos[0] * 8 + pos[1])
+
+    def iter_move_records(self, order=None):
+        if self.game_over():
+            raise Exception("Game is over, cannot make a move.")
+        own, opp = self._sides()
+        legal = legal_moves_mask(own, opp)
+        if order is None:
+            indices = iter_bits(legal)
+        else:
+            indices = (r * 8 + c for r, c in order if legal >> (r * 8 + c) & 1)
+        for index in indices:
+            yield Move(index, flip_mask(own, opp, index))
+
+    def get_flips(self, square_list):
+        if not square_list:
+            return []
+        own, opp = self._sides()
+        moves = []
+        for pos in square_list:
+            bit = pos_to_bit(pos)
+            if bit & opp:
+                moves.append(pos)
+            elif bit & own:
+                return moves
+            else:
+                break
+        return []
+
+    def make_move(self, pos, flips):
+        if self.game_over():
+            raise Exception("Game is over, cannot make a move.")
+        if not flips:
+            raise ValueError("No pieces to flip for this move.")
+        flipped = 0
+        for flip in flips:
+            flipped |= pos_to_bit(flip)
+        self.move_stack.append((pos_to_bit(pos), flipped, self.current_turn, self.consecutive_passes))
+        self._apply(pos_to_bit(pos), flipped)
+
+    def play_move(self, move):
+        if self.game_over():
+            raise Exception("Game is over, cannot make a move.")
+        if not move.flips:
+            raise ValueError("No pieces to flip for this move.")
+        placed = 1 << move.index
+        self.move_stack.append((placed, move.flips, self.current_turn, self.consecutive_passes))
+        self._apply(placed, move.flips)
+
+    def _apply(self, placed, flipped):
+        """Place the mover's disc on ``placed``, turn ``flipped`` over and switch turns."""
+        self._toggle_hash(placed, flipped, self.current_turn)
+        changed = placed | flipped
+        if self.current_turn == Square.BLACK:
+            self.black |= changed
+            self.white &= ~changed
+            self.current_turn = Square.WHITE
+        else:
+            self.white |= changed
+            self.black &= ~changed
+            self.current_turn = Square.BLACK
+        self.consecutive_passes = 0
+
+    def _toggle_hash(self, placed, flipped, mover):
+        """XOR a move by ``mover`` into (or back out of) the Zobrist key."""
+        key = self._disc_hash ^ DISC_KEYS[mover][placed.bit_length() - 1]
+        for index in iter_bits(flipped):
+            key ^= FLIP_KEYS[index]
+        self._disc_hash = key
+
+    def undo_move(self):
+        """Reverse the most recent move or pass; see :meth:`Board.undo_move`.
+
+        Returns:
+            The undone ``(pos, flips)`` as ``(row, col)`` tuples, or
+            ``(None, None)`` for a pass.
+        """
+        if not self.move_stack:
+            raise Exception("No move to undo.")
+        placed, flipped, turn, consecutive_passes = self.move_stack.pop()
+        if placed is None:
+            self.pass_count -= 1
+            pos = flips = None
+        else:
+            self._toggle_hash(placed, flipped, turn)
+            if turn == Square.BLACK:
+                self.black &= ~(placed | flipped)
+                self.white |= flipped
+            else:
+                self.white &= ~(placed | flipped)
+                self.black |= flipped
+            pos = index_to_pos(placed.bit_length() - 1)
+            flips = [index_to_pos(i) for i in iter_bits(flipped)]
+        self.current_turn = turn
+        self.consecutive_passes = consecutive_passes
+        return pos, flips
+
+    @classmethod
+    def from_masks(cls, black, white, current_turn=Square.WHITE, rng=None):
+        """Construct a BitBoard from ``black``/``white`` masks and the side to move."""
+        b = cls(rng=rng)
+        b.black = black
+        b.white = white
+        b.current_turn = current_turn
+        b._rehash()
+        return b
+
+    @classmethod
+    def from_dict(cls, data, rng=None):
+        """Construct a BitBoard instance from a dict produced by :meth:`to_dict`."""
+        b = cls(rng=rng)
+        b.black = 0
+        b.white = 0
+        for r, row in enumerate(data["grid"]):
+            for c, name in enumerate(row):
+                sq = Square[name]
+                if sq == Square.BLACK:
+                    b.black |= 1 << (r * 8 + c)
+                elif sq == Square.WHITE:
+                    b.white |= 1 << (r * 8 + c)
+        b._rehash()
+        b.current_turn = Square[data["current_turn"]]
+        b.pass_count = data.get("pass_count", 0)
+        b.consecutive_passes = data.get("consecutive_passes", 0)
+        return b
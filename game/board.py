@@ -2,8 +2,9 @@
 
 This module provides the :class:`Board` class which models the game
 state (an 8x8 grid of :class:`~game.square.Square` values), move
-generation, move application, and simple opponent strategies
-(`make_random_move`, `make_maxflips_move`, `make_smart_move`).
+generation, move application, and opponent strategies
+(`make_random_move`, `make_maxflips_move`, `make_smart_move`, and the
+alpha-beta `make_search_move` backed by :mod:`game.search`).
 
 Typical usage::
 
@@ -13,20 +14,162 @@ Typical usage::
 
 The implementation is intentionally small and self-contained to make it
 easy to test and extend.
+
+Move generation walks :data:`RAYS`, a table of every ray on the 8x8
+board built once at import, instead of rebuilding coordinate lists for
+each square on every call.
+
+A mask of the squares holding each :class:`Square` value is kept up to
+date on every grid write, so ``open_count``, ``count``, ``masks``,
+``game_over`` and ``winner`` are O(1) and ``open_squares`` never scans
+the full grid.
+
+Every ``make_move`` and ``pass_turn`` is recorded on
+:attr:`Board.move_stack` and can be reversed exactly with
+:meth:`Board.undo_move`, so look-ahead code can explore many positions
+on a single board without copying it::
+
+    board.make_move(pos, flips)
+    score = evaluate(board)
+    board.undo_move()
+
+The position's Zobrist key (:attr:`Board.zobrist_key`) is maintained the
+same way, so search code can look positions up in a transposition table
+without hashing the grid.
+
+:meth:`Board.open_moves` remembers its last result together with the
+Zobrist key it was computed for, so asking again about an unchanged
+position (a web request checking, applying and then reporting a move)
+costs a key comparison.  :meth:`Board.move_cache_stats` reports the hit
+rate.  Callers that may not need every move use :meth:`Board.iter_moves`
+instead, which finds legal squares and their flips one at a time, in an
+order of their choosing, and stops when they do::
+
+    for pos, flips in board.iter_moves(order=best_squares_first):
+        ...
+        break
+
+Boards use ``__slots__``, and every ``(row, col)`` they hand out is one
+of the shared :data:`POSITIONS` tuples.  Code that keeps many positions
+or moves around stores the compact records of :mod:`game.records`
+instead (:meth:`Board.state`, :meth:`Board.iter_move_records`).
+
+The randomized strategies draw from :attr:`Board.rng`.  It defaults to
+``None``, meaning the global :mod:`random` module (kept off the instance
+so boards still copy and pickle); pass a seeded :class:`random.Random` to
+make games reproducible and independent of other threads or processes::
+
+    board = Board(rng=random.Random(42))
+
+Besides the JSON-friendly :meth:`Board.to_dict`, a board packs into 21
+bytes with :meth:`Board.to_bytes` (see :data:`BOARD_BYTES_FORMAT`) for
+storage and wire transfer; ``to_bytes().hex()`` or base64 of it gives a
+text form::
+
+    data = board.to_bytes()
+    same = Board.from_bytes(data)
 """
 import random
 from .square import Square
+from .zobrist import DISC_KEYS, side_key
 import json
+import struct
+import time
+
+BOARD_SIZE = 8
+
+# The (row, col) tuple of every square, indexed by row * 8 + col.  Boards,
+# rays and move records hand these out instead of allocating their own.
+POSITIONS = tuple(divmod(index, BOARD_SIZE) for index in range(BOARD_SIZE * BOARD_SIZE))
+
+# Packed board layout, big-endian: format version, BLACK mask, WHITE mask
+# (bit = row * 8 + col), side to move (Square value), consecutive passes,
+# total passes.
+BOARD_BYTES_FORMAT = ">BQQBBH"
+BOARD_BYTES_VERSION = 1
+BOARD_BYTES_SIZE = struct.calcsize(BOARD_BYTES_FORMAT)
+
+# Ray directions as (row step, col step), in the order open_moves walks
+# them: north, south, east, west, northeast, northwest, southeast, southwest.
+DIRECTIONS = (
+    (-1, 0), (1, 0), (0, 1), (0, -1),
+    (-1, 1), (-1, -1), (1, 1), (1, -1),
+)
+
+
+def _build_rays():
+    """Return ``rays[row * 8 + col]``: the non-empty rays from each square.
+
+    Each ray is a tuple of ``(row, col)`` ordered outward from the square.
+    """
+    rays = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            square_rays = []
+            for dr, dc in DIRECTIONS:
+                r, c = row + dr, col + dc
+                ray = []
+                while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+                    ray.append(POSITIONS[r * BOARD_SIZE + c])
+                    r += dr
+                    c += dc
+                if ray:
+                    square_rays.append(tuple(ray))
+            rays.append(tuple(square_rays))
+    return tuple(rays)
+
+
+# Every ray from every square, shared by all Board instances.
+RAYS = _build_rays()
+
+
+class _GridRow(list):
+    """One row of :attr:`Board.grid` that reports cell writes to its board.
+
+    Reads are plain list reads; writes notify the owning board so its
+    square masks stay in sync even when callers
+    assign to ``board.grid[row][col]`` directly.
+    """
+    __slots__ = ("_board", "_row")
+
+    def __init__(self, board, row, values):
+        super().__init__(values)
+        self._board = board
+        self._row = row
+
+    def __setitem__(self, col, value):
+        if not isinstance(col, int):
+            super().__setitem__(col, value)
+            self._board._recount()
+            return
+        old = self[col]
+        if old is value:
+            return
+        super().__setitem__(col, value)
+        self._board._cell_changed(self._row, col % BOARD_SIZE, old, value)
+
 
 class Board:
     """
     Represents the game board.
     """
-    def __init__(self):
+    __slots__ = ("rng", "size", "_grid", "current_turn", "pass_count", "consecutive_passes", "move_stack",
+                 "_moves_cache", "_moves_probes", "_moves_hits", "_masks", "_disc_hash")
+
+    # Opening book consulted by make_smart_move and make_search_move
+    # before they think; see game.book.install.
+    book = None
+
+    def __init__(self, rng=None):
         """
         Initialize the board with the given size (default 8x8).
         All squares are set to Square.OPEN.
+
+        Args:
+            rng: a :class:`random.Random` used by the randomized strategies;
+                ``None`` (the default) uses the global :mod:`random` module.
         """
+        self.rng = rng
         self.size = 8
         self.grid = [[Square.OPEN for _ in range(self.size)] for _ in range(self.size)]
         self.current_turn = Square.WHITE
@@ -36,7 +179,43 @@ class Board:
         self.grid[4][4] = Square.WHITE
         self.pass_count = 0
         self.consecutive_passes = 0
+        self.move_stack = []
+        self._moves_cache = None  # (zobrist key, open_moves result)
+        self._moves_probes = 0
+        self._moves_hits = 0
+
+    @property
+    def grid(self):
+        """The 8x8 list of rows of :class:`Square` values."""
+        return self._grid
+
+    @grid.setter
+    def grid(self, rows):
+        self._grid = [_GridRow(self, r, row) for r, row in enumerate(rows)]
+        self._recount()
+
+    @property
+    def zobrist_key(self):
+        """The position's 64-bit Zobrist key, including the side to move."""
+        return self._disc_hash ^ side_key(self.current_turn)
+
+    def _recount(self):
+        """Rebuild the square masks and the hash from the grid."""
+        masks = {Square.OPEN: 0, Square.BLACK: 0, Square.WHITE: 0}  # bit row * 8 + col
+        self._disc_hash = 0
+        for r, row in enumerate(self._grid):
+            for c, sq in enumerate(row):
+                masks[sq] |= 1 << (r * BOARD_SIZE + c)
+                self._disc_hash ^= DISC_KEYS[sq][r * BOARD_SIZE + c]
+        self._masks = masks
 
+    def _cell_changed(self, row, col, old, new):
+        """Update the square masks and the hash for one grid write."""
+        index = row * BOARD_SIZE + col
+        self._disc_hash ^= DISC_KEYS[old][index] ^ DISC_KEYS[new][index]
+        masks = self._masks
+        masks[old] &= ~(1 << index)
+        masks[new] |= 1 << index
 
     def north_coords(self, pos):
         row, col = pos
@@ -108,30 +287,27 @@ class Board:
         return results
     
     def open_squares(self):
-        return [(r, c) for r in range(self.size) for c in range(self.size) if self.grid[r][c] == Square.OPEN]
+        squares = []
+        empty = self._masks[Square.OPEN]
+        while empty:
+            low = empty & -empty
+            squares.append(POSITIONS[low.bit_length() - 1])
+            empty ^= low
+        return squares
     
     def __str__(self):
         return '\n'.join(' '.join(square.name[0] for square in row) for row in self.grid)
 
     def open_count(self):
-        count = 0
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.grid[r][c] == Square.OPEN:
-                    count += 1
-        return count
+        return self._masks[Square.OPEN].bit_count()
     
     def count(self, square_type):
-        count = 0
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.grid[r][c] == square_type:
-                    count += 1
-        return count
+        return self._masks[square_type].bit_count()
 
     def pass_turn(self):
         if self.game_over():
             raise Exception("Game is over, cannot pass turn.")
+        self.move_stack.append((None, None, self.current_turn, self.consecutive_passes))
         self.pass_count += 1
         self.consecutive_passes += 1
         self.current_turn = Square.BLACK if self.current_turn == Square.WHITE else Square.WHITE
@@ -140,62 +316,167 @@ class Board:
         return self.consecutive_passes >= 2 or self.open_count() == 0
 
     def open_moves(self):
+        """Return ``{"color": side to move, "moves": {pos: flips}}``.
+
+        The result is cached until the position changes and shared
+        between callers, so treat it as read-only.
+        """
         if self.game_over():
             raise Exception("Game is over, cannot make a move.")
-        results = {"color": self.current_turn, "moves": {}}
+        key = self.zobrist_key
+        self._moves_probes += 1
+        cached = self._moves_cache
+        if cached is not None and cached[0] == key:
+            self._moves_hits += 1
+            return cached[1]
+        results = self._generate_moves()
+        self._moves_cache = (key, results)
+        return results
 
-        for sq in self.open_squares():
-            paths = [self.north_coords(sq), self.south_coords(sq), self.east_coords(sq), self.west_coords(sq),
-                          self.northeast_coords(sq), self.northwest_coords(sq), self.southeast_coords(sq),
-                          self.southwest_coords(sq)]
-            # foreach path, get the valid moves
-            flip_list = []
-            for path in paths:
-                flips = self.get_flips(path)
+    def move_cache_stats(self):
+        """Return ``open_moves`` cache counters: probes, hits and hit_rate."""
+        return {
+            "probes": self._moves_probes,
+            "hits": self._moves_hits,
+            "hit_rate": self._moves_hits / self._moves_probes if self._moves_probes else 0.0,
+        }
+
+    def iter_moves(self, order=None):
+        """Yield the legal ``(pos, flips)`` pairs one at a time.
+
+        ``order`` is a sequence of ``(row, col)`` squares to try, e.g. the
+        best squares first; squares it leaves out are skipped.  By default
+        moves come in row-major order, like :meth:`open_moves`.  A square's
+        flips are only worked out when the iteration reaches it, so a caller
+        that stops early (the ``'first'`` strategy, a search cutoff) never
+        pays for the moves it does not use.  Moves may be made and undone
+        between steps as long as the position is the same when iteration
+        resumes.
+        """
+        if self.game_over():
+            raise Exception("Game is over, cannot make a move.")
+        cached = self._moves_cache
+        if cached is not None and cached[0] == self.zobrist_key:
+            moves = cached[1]["moves"]
+            for pos in (moves if order is None else order):
+                flips = moves.get(pos)
                 if flips:
-                    flip_list.extend(flips)
+                    yield pos, flips
+            return
+        for pos in self._move_candidates(order):
+            flips = self._flips_at(pos)
+            if flips:
+                yield pos, flips
+
+    def _move_candidates(self, order):
+        """Return the squares :meth:`iter_moves` should try, in order."""
+        if order is None:
+            return self.open_squares()
+        empty = self._masks[Square.OPEN]
+        return (pos for pos in order if empty >> (pos[0] * BOARD_SIZE + pos[1]) & 1)
+
+    def _flips_at(self, pos):
+        """Return the discs the side to move flips by playing ``pos`` (empty if illegal)."""
+        grid = self.grid
+        turn = self.current_turn
+        opponent = Square.BLACK if turn == Square.WHITE else Square.WHITE
+        flip_list = []
+        for ray in RAYS[pos[0] * BOARD_SIZE + pos[1]]:
+            run = 0
+            for r, c in ray:
+                cell = grid[r][c]
+                if cell is opponent:
+                    run += 1
+                    continue
+                if cell is turn and run:
+                    flip_list.extend(ray[:run])
+                break
+        return flip_list
+
+    def iter_move_records(self, order=None):
+        """Like :meth:`iter_moves`, but yield compact :class:`~game.records.Move` records.
+
+        Play them with :meth:`play_move`.
+        """
+        from .records import Move
+        for pos, flips in self.iter_moves(order):
+            yield Move.from_pos(pos, flips)
+
+    def _generate_moves(self):
+        """Compute the ``open_moves`` result for the current position."""
+        # Shares _flips_at with iter_moves so the two generators cannot disagree.
+        results = {"color": self.current_turn, "moves": {}}
+        flips_at = self._flips_at
+        for sq in self.open_squares():
+            flip_list = flips_at(sq)
             if flip_list:
                 results["moves"][sq] = flip_list
 
         return results
-    
+
     def get_flips(self, square_list):
-        if not square_list or len(square_list) < 1:
+        if not square_list:
             return []
-        moves = []
-        anchor = False
-        for  pos in square_list:
-            sq = self.grid[pos[0]][pos[1]]
+        grid = self.grid
+        run = 0
+        for pos in square_list:
+            sq = grid[pos[0]][pos[1]]
 
             if sq == Square.OPEN:
                 break
             elif sq == self.current_turn:
-                anchor = True
+                if run:
+                    return list(square_list[:run])
                 break
-            else:
-                moves.append(pos)
+            run += 1
 
-        if anchor and moves:
-            return moves
         return []
-    
+
     def make_move(self, pos, flips):
         if self.game_over():
             raise Exception("Game is over, cannot make a move.")
         if not flips:
             raise ValueError("No pieces to flip for this move.")
+        self.move_stack.append((pos, flips, self.current_turn, self.consecutive_passes))
         self.grid[pos[0]][pos[1]] = self.current_turn
         for flip in flips:
             self.grid[flip[0]][flip[1]] = self.current_turn
         self.current_turn = Square.BLACK if self.current_turn == Square.WHITE else Square.WHITE
         self.consecutive_passes = 0
 
+    def play_move(self, move):
+        """Play a :class:`~game.records.Move`; undo it with :meth:`undo_move`."""
+        self.make_move(move.pos, move.flip_list())
+
+    def undo_move(self):
+        """Reverse the most recent :meth:`make_move` or :meth:`pass_turn`.
+
+        Restores the grid, ``current_turn``, ``pass_count`` and
+        ``consecutive_passes`` exactly.
+
+        Returns:
+            The undone ``(pos, flips)``, or ``(None, None)`` for a pass.
+        """
+        if not self.move_stack:
+            raise Exception("No move to undo.")
+        pos, flips, turn, consecutive_passes = self.move_stack.pop()
+        if pos is None:
+            self.pass_count -= 1
+        else:
+            opponent = Square.BLACK if turn == Square.WHITE else Square.WHITE
+            self.grid[pos[0]][pos[1]] = Square.OPEN
+            for flip in flips:
+                self.grid[flip[0]][flip[1]] = opponent
+        self.current_turn = turn
+        self.consecutive_passes = consecutive_passes
+        return pos, flips
+
     def make_random_move(self):
         moves = self.open_moves()
         if not moves["moves"]:
             self.pass_turn()
             return None, None
-        move_square = random.choice(list(moves['moves'].keys()))
+        move_square = (self.rng or random).choice(list(moves['moves'].keys()))
         move_flips = moves['moves'][move_square]    
         self.make_move(move_square, move_flips)
         return move_square, move_flips
@@ -209,7 +490,7 @@ class Board:
         best_move = None
         best_flips = []
         move_items = list(moves["moves"].items())
-        random.shuffle(move_items)
+        (self.rng or random).shuffle(move_items)
         for move_square, move_flips in move_items:
             if not best_move or len(move_flips) > len(best_flips):
                 best_move = move_square
@@ -222,6 +503,9 @@ class Board:
         if not moves["moves"]:
             self.pass_turn()
             return None, None
+        book_move = self._book_move()
+        if book_move is not None:
+            return book_move
         # Evaluate all possible moves and choose the best one
         ranked_moves = []
         move_items = list(moves["moves"].items())
@@ -257,6 +541,77 @@ class Board:
         self.make_move(best_move, best_flips)
         return best_move, best_flips
 
+    def _book_move(self):
+        """Play the :attr:`book` move for this position, if there is one.
+
+        Returns ``(pos, flips)``, or None when there is no book or the
+        position is not in it.
+        """
+        if self.book is None:
+            return None
+        pos = self.book.lookup(self)
+        if pos is None:
+            return None
+        flips = self.open_moves()["moves"][pos]
+        self.make_move(pos, flips)
+        return pos, flips
+
+    def make_search_move(self, time_limit=0.05, node_limit=None, tt=None, endgame_empties=None):
+        """Play the best move found by alpha-beta search within the budget.
+
+        With ``endgame_empties`` or fewer empty squares left the exact
+        :mod:`game.endgame` solver is tried first with half the budget;
+        if it cannot finish, the alpha-beta search gets what remains.
+
+        Args:
+            time_limit: wall-clock budget in seconds (default 50 ms).
+            node_limit: optional cap on the number of nodes searched.
+            tt: transposition table to use; defaults to the process-wide
+                :func:`game.search.shared_table`.
+            endgame_empties: solver threshold; defaults to the most
+                empties the solver should finish in its half of
+                ``time_limit`` (:func:`game.endgame.solver_empties`).
+        """
+        from .endgame import EndgameSolver, solver_empties
+        from .search import Searcher, SearchTimeout, shared_table
+
+        moves = self.open_moves()
+        if not moves["moves"]:
+            self.pass_turn()
+            return None, None
+        book_move = self._book_move()
+        if book_move is not None:
+            return book_move
+
+        if endgame_empties is None:
+            endgame_empties = solver_empties(time_limit / 2 if time_limit is not None else None)
+        if self.open_count() <= endgame_empties:
+            started = time.perf_counter()
+            solver = EndgameSolver(
+                time_limit=time_limit / 2 if time_limit is not None else None,
+                node_limit=node_limit // 2 if node_limit is not None else None,
+            )
+            try:
+                move, _ = solver.solve(self)
+            except SearchTimeout:
+                if time_limit is not None:
+                    time_limit = max(0.0, time_limit - (time.perf_counter() - started))
+                if node_limit is not None:
+                    node_limit -= solver.nodes
+            else:
+                self.make_move(move, moves["moves"][move])
+                return move, moves["moves"][move]
+
+        searcher = Searcher(time_limit=time_limit, node_limit=node_limit,
+                            tt=tt if tt is not None else shared_table())
+        result = searcher.search(self)
+        self.make_move(result.move, result.flips)
+        return result.move, result.flips
+
+    def masks(self):
+        """Return the position as ``(black, white)`` 64-bit masks (bit = row * 8 + col)."""
+        return self._masks[Square.BLACK], self._masks[Square.WHITE]
+
     def winner(self):
         white_count = self.count(Square.WHITE)
         black_count = self.count(Square.BLACK)
@@ -282,9 +637,9 @@ class Board:
         return json.dumps(self.to_dict())
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, rng=None):
         """Construct a Board instance from a dict produced by :meth:`to_dict`."""
-        b = cls()
+        b = cls(rng=rng)
         b.size = data.get("size", 8)
         b.grid = [[Square[sq] for sq in row] for row in data["grid"]]
         b.current_turn = Square[data["current_turn"]]
@@ -293,6 +648,56 @@ class Board:
         return b
 
     @classmethod
-    def from_json(cls, json_str):
+    def from_json(cls, json_str, rng=None):
         """Deserialize a JSON string back into a Board."""
-        return cls.from_dict(json.loads(json_str))
+        return cls.from_dict(json.loads(json_str), rng=rng)
+
+    def to_bytes(self):
+        """Pack the board into :data:`BOARD_BYTES_SIZE` bytes."""
+        black, white = self.masks()
+        return struct.pack(BOARD_BYTES_FORMAT, BOARD_BYTES_VERSION, black, white,
+                           self.current_turn.value, self.consecutive_passes, self.pass_count)
+
+    def state(self):
+        """Return the position as a compact :class:`~game.records.BoardState`."""
+        from .records import BoardState
+        return BoardState.from_board(self)
+
+    @classmethod
+    def from_state(cls, state, rng=None):
+        """Construct a board from a :class:`~game.records.BoardState`."""
+        return state.to_board(cls, rng=rng)
+
+    @classmethod
+    def from_masks(cls, black, white, current_turn=Square.WHITE, rng=None):
+        """Construct a board from ``black``/``white`` masks and the side to move."""
+        grid = [[Square.OPEN] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        for index in range(BOARD_SIZE * BOARD_SIZE):
+            if black >> index & 1:
+                grid[index // 8][index % 8] = Square.BLACK
+            elif white >> index & 1:
+                grid[index // 8][index % 8] = Square.WHITE
+        b = cls(rng=rng)
+        b.grid = grid
+        b.current_turn = current_turn
+        return b
+
+    @classmethod
+    def from_bytes(cls, data, rng=None):
+        """Construct a board from bytes produced by :meth:`to_bytes`.
+
+        Raises ``ValueError`` if ``data`` is not a valid packed board.
+        """
+        if len(data) != BOARD_BYTES_SIZE:
+            raise ValueError(f"Packed board must be {BOARD_BYTES_SIZE} bytes, got {len(data)}")
+        version, black, white, turn, consecutive_passes, pass_count = struct.unpack(BOARD_BYTES_FORMAT, data)
+        if version != BOARD_BYTES_VERSION:
+            raise ValueError(f"Unsupported packed board version: {version}")
+        if black & white:
+            raise ValueError("Packed board has overlapping masks")
+        if turn not in (Square.BLACK.value, Square.WHITE.value):
+            raise ValueError(f"Invalid side to move: {turn}")
+        b = cls.from_masks(black, white, Square(turn), rng=rng)
+        b.pass_count = pass_count
+        b.consecutive_passes = consecutive_passes
+        return b
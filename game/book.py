@@ -0,0 +1,315 @@
+"""Opening book for the BlacknWhite game.
+
+Openings repeat constantly, so instead of thinking about the first moves
+of every game the AI can look them up.  A book maps positions to a move
+and is built offline in one of two ways:
+
+- ``search``: every position reachable in the first ``plies`` moves is
+  searched to a fixed depth with :class:`~game.search.Searcher`;
+- ``selfplay``: many seeded self-play games (the :mod:`game.tournament`
+  harness behind ``test_stats.py``) are played and, per position, the
+  move with the best results for the side that played it is kept.
+
+Positions are folded under the 8 board symmetries with
+:func:`game.symmetry.canonical`, so a book stores each opening once.
+
+On disk a book is a small header followed by fixed-size records sorted
+by position (see :data:`RECORD_FORMAT`).  :meth:`OpeningBook.open` maps
+the file with :mod:`mmap` and binary-searches it in place, so opening
+even a large book costs nothing up front and processes share its pages.
+
+:meth:`Board.make_smart_move` and :meth:`Board.make_search_move` consult
+:attr:`Board.book` before thinking; :func:`install` sets it, and
+:func:`install_default` loads the file named by ``BLACKNWHITE_BOOK``.
+
+Usage::
+
+    python -m game.book --method search --plies 6 --depth 4 -o book.bin
+    python -m game.book --method selfplay --strategies smart random --games 20000 -o book.bin
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from .board import Board
+from .bitboard import BitBoard
+from .records import BoardState
+from .symmetry import INVERSE_MAPS, SQUARE_MAPS, canonical
+from .square import Square
+
+BOOK_ENV_VAR = "BLACKNWHITE_BOOK"
+
+MAGIC = b"BWBK"
+VERSION = 1
+# Header: magic, format version, record count.
+HEADER_FORMAT = ">4sHI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Record: canonical BLACK mask, WHITE mask, side to move (Square value),
+# move index (row * 8 + col) in the canonical frame.
+RECORD_FORMAT = ">QQBB"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+KEY_SIZE = RECORD_SIZE - 1
+
+
+class OpeningBook:
+    """A sorted table of ``canonical position -> move`` records.
+
+    ``data`` is any buffer holding a book file: bytes, or an mmap from
+    :meth:`open`.
+    """
+
+    def __init__(self, data):
+        if len(data) < HEADER_SIZE:
+            raise ValueError("Opening book is truncated")
+        magic, version, count = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC:
+            raise ValueError("Not an opening book file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported opening book version: {version}")
+        if len(data) < HEADER_SIZE + count * RECORD_SIZE:
+            raise ValueError("Opening book is truncated")
+        self._data = data
+        self._count = count
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map the book file at ``path``."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build an in-memory book from ``{canonical key: canonical move index}``."""
+        return cls(encode(entries))
+
+    def __len__(self):
+        return self._count
+
+    def entries(self):
+        """Return the book as ``{(black, white, turn): canonical move index}``."""
+        out = {}
+        for i in range(self._count):
+            black, white, turn, index = struct.unpack_from(RECORD_FORMAT, self._data, HEADER_SIZE + i * RECORD_SIZE)
+            out[(black, white, turn)] = index
+        return out
+
+    def _find(self, key):
+        target = struct.pack(RECORD_FORMAT[:-1], *key)
+        data = self._data
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER_SIZE + mid * RECORD_SIZE
+            probe = data[offset:offset + KEY_SIZE]
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return data[offset + KEY_SIZE]
+        return None
+
+    def lookup(self, board):
+        """Return the book move ``(row, col)`` for ``board``, or None."""
+        key, symmetry = canonical(board)
+        index = self._find(key)
+        if index is None:
+            return None
+        index = INVERSE_MAPS[symmetry][index]
+        pos = (index // 8, index % 8)
+        return pos if pos in board.open_moves()["moves"] else None
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+
+def encode(entries):
+    """Return the book file bytes for ``{canonical key: canonical move index}``."""
+    parts = [struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(entries))]
+    for key in sorted(entries):
+        parts.append(struct.pack(RECORD_FORMAT, *key, entries[key]))
+    return b"".join(parts)
+
+
+def write(entries, path):
+    """Write ``{canonical key: canonical move index}`` as a book file."""
+    with open(path, "wb") as f:
+        f.write(encode(entries))
+
+
+def _canonical_move(board, pos):
+    key, symmetry = canonical(board)
+    return key, SQUARE_MAPS[symmetry][pos[0] * 8 + pos[1]]
+
+
+def _start_positions():
+    """Both starting positions: WHITE to move (the default) and BLACK to move."""
+    white_first = BitBoard()
+    black_first = BitBoard()
+    black_first.current_turn = Square.BLACK
+    return [white_first, black_first]
+
+
+# ---------------------------------------------------------------------------
+# Building from search
+# ---------------------------------------------------------------------------
+
+def build_from_search(plies=6, depth=4, progress=None):
+    """Search every opening position up to ``plies`` moves deep.
+
+    Returns ``{canonical key: canonical move index}``.
+    """
+    from .search import Searcher
+
+    entries = {}
+    # Frontier positions are kept as compact BoardStates: there can be many.
+    frontier = [board.state() for board in _start_positions()]
+    for ply in range(plies):
+        next_frontier = {}
+        for state in frontier:
+            board = BitBoard.from_state(state)
+            moves = board.open_moves()["moves"]
+            if not moves:
+                continue
+            result = Searcher(max_depth=depth).search(board)
+            key, index = _canonical_move(board, result.move)
+            entries[key] = index
+            for pos, flips in moves.items():
+                board.make_move(pos, flips)
+                child = canonical(board)[0]
+                if child not in next_frontier and child not in entries:
+                    next_frontier[child] = BoardState(child[0], child[1], Square(child[2]))
+                board.undo_move()
+        frontier = list(next_frontier.values())
+        if progress is not None:
+            progress(ply + 1, len(entries))
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Building from self-play
+# ---------------------------------------------------------------------------
+
+def _selfplay_chunk(white_strategy, black_strategy, start, count, plies, seed):
+    """Play games and return ``{(key, index): [games, score]}`` for the opening moves.
+
+    ``score`` counts a win as 1 and a tie as 0.5 for the side that moved.
+    Strategies play as in :func:`game.tournament.play_game`, so ``search``
+    uses a node budget and a table of its own per game.
+    """
+    from .tournament import game_seed, search_table, strategy_mover
+
+    stats = defaultdict(lambda: [0, 0.0])
+    for game in range(start, start + count):
+        board = BitBoard(rng=random.Random(game_seed(seed, white_strategy, black_strategy, game)))
+        if game % 2 == 0:
+            board.current_turn = Square.BLACK
+        tt = search_table(white_strategy, black_strategy)
+        players = {
+            Square.WHITE: strategy_mover(board, white_strategy, tt),
+            Square.BLACK: strategy_mover(board, black_strategy, tt),
+        }
+        played = []
+        while not board.game_over():
+            turn = board.current_turn
+            before = board.masks(), turn
+            pos, _ = players[turn]()
+            if pos is not None and len(played) < plies:
+                played.append((before, pos))
+        winner = board.winner()
+        for ((black, white), turn), pos in played:
+            position = BitBoard.from_masks(black, white, turn)
+            entry = stats[_canonical_move(position, pos)]
+            entry[0] += 1
+            entry[1] += 1.0 if winner == turn else 0.5 if winner is None else 0.0
+    return dict(stats)
+
+
+def build_from_selfplay(strategies=("random",), games=10000, plies=8, min_games=20,
+                        seed=0, workers=1, chunk_size=500):
+    """Build a book from self-play games between ``strategies``.
+
+    Every ordered pairing plays ``games`` games; for each position seen in
+    the first ``plies`` moves the move with the best average result for
+    its mover is kept, counting only moves played at least ``min_games``
+    times.  Returns ``{canonical key: canonical move index}``.
+    """
+    tasks = [(w, b, start, min(chunk_size, games - start), plies, seed)
+             for w in strategies for b in strategies for start in range(0, games, chunk_size)]
+    stats = defaultdict(lambda: [0, 0.0])
+
+    def merge(chunk):
+        for move, (count, score) in chunk.items():
+            stats[move][0] += count
+            stats[move][1] += score
+
+    if workers == 1:
+        for task in tasks:
+            merge(_selfplay_chunk(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_selfplay_chunk, *zip(*tasks)):
+                merge(chunk)
+
+    best = {}
+    for (key, index), (count, score) in stats.items():
+        if count < min_games:
+            continue
+        rate = score / count
+        if key not in best or rate > best[key][0]:
+            best[key] = (rate, index)
+    return {key: index for key, (_, index) in best.items()}
+
+
+# ---------------------------------------------------------------------------
+# Installing
+# ---------------------------------------------------------------------------
+
+def install(book):
+    """Make every board consult ``book`` (None to stop using a book)."""
+    Board.book = book
+
+
+def install_default():
+    """Install the book named by ``BLACKNWHITE_BOOK``, if set, and return it."""
+    path = os.environ.get(BOOK_ENV_VAR)
+    if not path:
+        return None
+    book = OpeningBook.open(path)
+    install(book)
+    return book
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an opening book.")
+    parser.add_argument("--method", choices=("search", "selfplay"), default="search")
+    parser.add_argument("--plies", type=int, default=6, help="opening moves covered by the book")
+    parser.add_argument("--depth", type=int, default=4, help="search depth (search method)")
+    parser.add_argument("--strategies", nargs="+", default=["random"], help="self-play strategies")
+    parser.add_argument("--games", type=int, default=10000, help="games per pairing (selfplay method)")
+    parser.add_argument("--min-games", type=int, default=20, help="minimum games per kept move")
+    parser.add_argument("--seed", type=int, default=0, help="self-play base seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="self-play worker processes")
+    parser.add_argument("-o", "--output", required=True, help="book file to write")
+    args = parser.parse_args(argv)
+
+    if args.method == "search":
+        def progress(ply, count):
+            print(f"[ply {ply}] {count} positions", file=sys.stderr, flush=True)
+        entries = build_from_search(args.plies, args.depth, progress)
+    else:
+        entries = build_from_selfplay(args.strategies, args.games, args.plies, args.min_games,
+                                      args.seed, args.workers)
+    write(entries, args.output)
+    print(f"{len(entries)} positions, {HEADER_SIZE + len(entries) * RECORD_SIZE} bytes -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
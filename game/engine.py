@@ -0,0 +1,48 @@
+"""Board engine selection for the BlacknWhite game.
+
+Two interchangeable board implementations exist:
+
+- ``"grid"``: :class:`~game.board.Board`, the original 8x8 list-of-lists.
+- ``"bitboard"``: :class:`~game.bitboard.BitBoard`, two 64-bit masks.
+
+Callers that should not care which one they get use :func:`create_board`
+(or :func:`board_class` for ``from_dict``/``from_json``).  The engine is
+chosen by the ``engine`` argument, falling back to the
+``BLACKNWHITE_ENGINE`` environment variable and finally to ``"grid"``,
+so the web app, CLI and stats scripts can be switched without code
+changes::
+
+    BLACKNWHITE_ENGINE=bitboard python test_stats.py
+"""
+import os
+from .board import Board
+from .bitboard import BitBoard
+
+ENGINE_ENV_VAR = "BLACKNWHITE_ENGINE"
+DEFAULT_ENGINE = "grid"
+
+ENGINES = {
+    "grid": Board,
+    "bitboard": BitBoard,
+}
+
+
+def board_class(engine=None):
+    """Return the board class for ``engine`` (or the configured default).
+
+    Raises:
+        ValueError: if the engine name is not one of :data:`ENGINES`.
+    """
+    name = engine or os.environ.get(ENGINE_ENV_VAR) or DEFAULT_ENGINE
+    try:
+        return ENGINES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown board engine: {name!r}") from None
+
+
+def create_board(engine=None, rng=None):
+    """Create a new board in the starting position using ``engine``.
+
+    ``rng`` is passed through to the board for its randomized strategies.
+    """
+    return board_class(engine)(rng=rng)
@@ -0,0 +1,181 @@
+"""Process-wide cache of the moves strategies chose, keyed by position.
+
+Deterministic strategies (``first``, ``smart``) always answer a position
+the same way, and many web games pass through the same openings, so the
+chosen move is worth remembering across games and sessions.  Strategies
+whose answer depends on anything but the position, such as a wall-clock
+budget, must not be cached: whichever answer got in first would stick.
+
+By default positions are keyed exactly: ``(black, white)`` masks plus
+the side to move.  Strategies named in ``symmetric`` are folded under
+the 8 symmetries of the board (rotations and reflections, see
+:mod:`game.symmetry`): the key is the smallest mask pair over all 8
+transforms, and moves are stored in that canonical frame and mapped
+back on lookup, so a symmetric position is answered with the image of
+the move chosen in its twin.  Only fold strategies that break ties
+symmetrically too; ``first`` and ``smart`` break them in row-major
+order, so folding them would make a game's replies depend on which
+game filled the cache.
+
+The cache is a bounded LRU with optional TTL expiry.  The web app uses
+:func:`shared_cache`, sized from ``BLACKNWHITE_POSCACHE_SIZE`` (0 turns it
+off) and ``BLACKNWHITE_POSCACHE_TTL`` (seconds, unset for no expiry).
+
+Typical usage::
+
+    from game.poscache import play_cached
+    pos, flips = play_cached(board, "smart", board.make_smart_move)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .board import POSITIONS
+from .symmetry import INVERSE_MAPS, SQUARE_MAPS, canonical
+
+SIZE_ENV_VAR = "BLACKNWHITE_POSCACHE_SIZE"
+TTL_ENV_VAR = "BLACKNWHITE_POSCACHE_TTL"
+DEFAULT_SIZE = 65536
+
+
+class PositionCache:
+    """Bounded, thread-safe LRU of ``(position, strategy) -> move``.
+
+    Args:
+        max_entries: entries kept before the least recently used is evicted.
+        ttl: seconds an entry lives after it is stored, or None to keep it
+            until evicted.
+        symmetric: strategies whose positions are folded under the board's
+            symmetries; others are keyed by the exact position.
+    """
+
+    def __init__(self, max_entries=DEFAULT_SIZE, ttl=None, clock=time.monotonic, symmetric=()):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.symmetric = frozenset(symmetric)
+        self._entries = OrderedDict()  # (key, strategy) -> (expires, move index in the key's frame)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, board, strategy):
+        """Return the cached ``(row, col)`` for ``strategy`` on ``board``, or None.
+
+        The move is mapped back into ``board``'s orientation and checked
+        to be legal there.
+        """
+        found = self._lookup(board, strategy, *self.key(board, strategy))
+        return found[0] if found is not None else None
+
+    def key(self, board, strategy):
+        """Return ``(key, symmetry)`` for ``strategy`` on ``board``'s position.
+
+        ``symmetry`` takes ``board``'s squares into the key's frame; it is
+        the identity unless ``strategy`` is folded.
+        """
+        if strategy in self.symmetric:
+            return canonical(board)
+        black, white = board.masks()
+        return (black, white, board.current_turn.value), 0
+
+    def _lookup(self, board, strategy, key, symmetry):
+        """Return ``(pos, flips)`` of the cached move, or None if absent or illegal on ``board``."""
+        with self._lock:
+            self.probes += 1
+            entry = self._entries.get((key, strategy))
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= self.clock():
+                del self._entries[(key, strategy)]
+                return None
+            self._entries.move_to_end((key, strategy))
+            self.hits += 1
+        index = INVERSE_MAPS[symmetry][entry[1]]
+        black, white = board.masks()
+        if (black | white) >> index & 1:
+            return None
+        # Only the cached square is checked: generating every move would
+        # cost more than a cheap strategy such as 'first' takes to answer.
+        pos = POSITIONS[index]
+        flips = board._flips_at(pos)
+        return (pos, flips) if flips else None
+
+    def put(self, board, strategy, pos):
+        """Remember that ``strategy`` plays ``pos`` on ``board``'s position."""
+        key, symmetry = self.key(board, strategy)
+        self._store(key, strategy, SQUARE_MAPS[symmetry][pos[0] * 8 + pos[1]])
+
+    def _store(self, key, strategy, index):
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[(key, strategy)] = (expires, index)
+            self._entries.move_to_end((key, strategy))
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        self.probes = self.hits = self.stores = self.evictions = 0
+
+    def stats(self):
+        """Return a dict of the cache size and counters."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+def play_cached(board, strategy, play, cache=None):
+    """Play ``strategy``'s move on ``board``, answering from ``cache`` when possible.
+
+    ``play`` is called (and its result remembered) on a miss; it must make
+    the move on ``board`` and return ``(pos, flips)`` like the ``make_*_move``
+    strategies.  Passes are never cached.  Uses :func:`shared_cache` by
+    default; if that is disabled ``play`` is simply called.
+    """
+    if cache is None:
+        cache = shared_cache()
+        if cache is None:
+            return play()
+    key, symmetry = cache.key(board, strategy)
+    found = cache._lookup(board, strategy, key, symmetry)
+    if found is not None:
+        pos, flips = found
+        board.make_move(pos, flips)
+        return pos, flips
+    pos, flips = play()
+    if pos is not None:
+        cache._store(key, strategy, SQUARE_MAPS[symmetry][pos[0] * 8 + pos[1]])
+    return pos, flips
+
+
+_shared_cache = None
+
+
+def shared_cache():
+    """Return the process-wide cache, creating it on first use.
+
+    Returns None when ``BLACKNWHITE_POSCACHE_SIZE`` is 0.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        size = int(os.environ.get(SIZE_ENV_VAR, DEFAULT_SIZE))
+        ttl = os.environ.get(TTL_ENV_VAR)
+        _shared_cache = PositionCache(size, float(ttl) if ttl else None) if size > 0 else False
+    return _shared_cache if _shared_cache is not False else None
@@ -0,0 +1,211 @@
+"""Opt-in profiling of the board hot paths, strategies and searches.
+
+When enabled, the methods listed in :data:`TARGETS` are replaced on their
+classes by timing wrappers that count calls and cumulative wall-clock
+time per operation (``open_moves``, ``iter_moves``, ``flips_at``,
+``make_move``, ``make_smart_move``, ...); :class:`~game.search.Searcher` and
+:class:`~game.endgame.EndgameSolver` also report the nodes they visited.
+Times are inclusive: a strategy's time contains the ``open_moves`` and
+``make_move`` calls it makes, which are counted on their own as well.
+A generator such as ``iter_moves`` counts one call per iteration, timed
+over the steps its consumer actually took.
+
+When disabled, the original methods are put back, so profiling costs
+nothing unless it is on.  Counters are per process; tournaments played
+over a process pool merge their workers' counters into the parent (see
+:func:`game.tournament.run_tournament`).
+
+Typical usage::
+
+    from game import profiling
+
+    with profiling.profiled():
+        board.make_search_move()
+    print(profiling.format_table(profiling.snapshot()))
+
+``BLACKNWHITE_PROFILE=1`` turns it on for ``test_stats.py`` and the web
+app (``GET /api/profile``).
+"""
+import contextlib
+import functools
+import importlib
+import inspect
+import os
+import threading
+import time
+
+PROFILE_ENV_VAR = "BLACKNWHITE_PROFILE"
+
+_BOARD_METHODS = (
+    "open_moves", "_generate_moves", "iter_moves", "iter_move_records", "_flips_at", "get_flips",
+    "make_move", "play_move", "undo_move",
+    "make_random_move", "make_maxflips_move", "make_smart_move", "make_search_move",
+)
+
+# (module, class, methods) to instrument; methods a class does not define
+# itself are skipped, so an inherited method is only wrapped once.
+TARGETS = (
+    ("game.board", "Board", _BOARD_METHODS),
+    ("game.bitboard", "BitBoard", _BOARD_METHODS),
+    ("game.search", "Searcher", ("search",)),
+    ("game.endgame", "EndgameSolver", ("solve",)),
+)
+
+# Operation names that differ from the method name.
+_NAMES = {"_generate_moves": "generate_moves", "_flips_at": "flips_at", "solve": "endgame"}
+
+# Operations whose object has a ``nodes`` count to collect.
+_NODE_COUNTERS = {"search", "endgame"}
+
+_counters = {}  # name -> [calls, seconds, nodes]
+_lock = threading.Lock()
+_originals = []  # (class, method name, original function) while enabled
+
+
+def _record(name, seconds, nodes):
+    with _lock:
+        entry = _counters.get(name)
+        if entry is None:
+            entry = _counters[name] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += nodes
+
+
+def _wrap(name, method):
+    counts_nodes = name in _NODE_COUNTERS
+    clock = time.perf_counter
+    if inspect.isgeneratorfunction(method):
+        return _wrap_generator(name, method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = clock()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _record(name, clock() - started, self.nodes if counts_nodes else 0)
+
+    return wrapper
+
+
+def _wrap_generator(name, method):
+    clock = time.perf_counter
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        seconds = 0.0
+        steps = method(self, *args, **kwargs)
+        try:
+            while True:
+                started = clock()
+                try:
+                    item = next(steps)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += clock() - started
+                yield item
+        finally:
+            steps.close()
+            _record(name, seconds, 0)
+
+    return wrapper
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable():
+    """Instrument every method in :data:`TARGETS`; does nothing if already on."""
+    with _lock:
+        if _originals:
+            return
+        for module, class_name, methods in TARGETS:
+            cls = getattr(importlib.import_module(module), class_name)
+            for method in methods:
+                original = cls.__dict__.get(method)
+                if original is None:
+                    continue
+                _originals.append((cls, method, original))
+                setattr(cls, method, _wrap(_NAMES.get(method, method), original))
+
+
+def disable():
+    """Put the original methods back; the counters are kept."""
+    with _lock:
+        while _originals:
+            cls, method, original = _originals.pop()
+            setattr(cls, method, original)
+
+
+def enable_from_env():
+    """Enable profiling if ``BLACKNWHITE_PROFILE`` is set; return True if on."""
+    if env_enabled():
+        enable()
+    return is_enabled()
+
+
+def env_enabled():
+    """Return True if ``BLACKNWHITE_PROFILE`` asks for profiling."""
+    return os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+
+
+@contextlib.contextmanager
+def profiled():
+    """Enable profiling for the ``with`` block, restoring the previous state after."""
+    was_enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def reset():
+    """Zero every counter."""
+    with _lock:
+        _counters.clear()
+
+
+def snapshot():
+    """Return the counters as ``{operation: {"calls", "seconds", "us_per_call", ...}}``.
+
+    ``search`` and ``endgame`` also have ``nodes`` and ``nodes_per_sec``.
+    """
+    with _lock:
+        counters = {name: list(entry) for name, entry in _counters.items()}
+    out = {}
+    for name, (calls, seconds, nodes) in sorted(counters.items()):
+        entry = {"calls": calls, "seconds": seconds, "us_per_call": seconds / calls * 1e6 if calls else 0.0}
+        if name in _NODE_COUNTERS:
+            entry["nodes"] = nodes
+            entry["nodes_per_sec"] = nodes / seconds if seconds else 0.0
+        out[name] = entry
+    return out
+
+
+def merge(other):
+    """Add the counters of a :func:`snapshot` (e.g. from a worker process)."""
+    with _lock:
+        for name, entry in other.items():
+            mine = _counters.get(name)
+            if mine is None:
+                mine = _counters[name] = [0, 0.0, 0]
+            mine[0] += entry["calls"]
+            mine[1] += entry["seconds"]
+            mine[2] += entry.get("nodes", 0)
+
+
+HEADER = "Operation \tCalls \tSeconds \tus/call \tNodes/sec"
+
+
+def format_table(counters):
+    """Format a :func:`snapshot` as tab-separated rows under :data:`HEADER`."""
+    lines = [HEADER]
+    for name, entry in counters.items():
+        nps = f"{entry['nodes_per_sec']:.0f}" if "nodes_per_sec" in entry else ""
+        lines.append(f"{name} \t{entry['calls']} \t{entry['seconds']:.3f} \t{entry['us_per_call']:.1f} \t{nps}")
+    return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""Compact records of positions and moves for the BlacknWhite game.
+
+A :class:`~game.board.Board` carries a lot per instance: the grid (or
+the masks), piece counts, the move stack, the move cache and an RNG.
+Code that keeps many positions or moves around at once (book building,
+analysis, search frontiers) stores these slotted records instead and
+turns them back into boards when it needs to play on them::
+
+    state = board.state()                  # two masks, side to move, passes
+    same = BitBoard.from_state(state)
+
+    for move in board.iter_move_records():  # square index + flip mask
+        board.play_move(move)
+        ...
+        board.undo_move()
+
+Both keep the ``(row, col)`` API as a thin view: :attr:`Move.pos`,
+:meth:`Move.flip_list`, and a :class:`Move` unpacks like the
+``(pos, flips)`` pairs of :meth:`Board.iter_moves`.
+"""
+from .board import POSITIONS
+from .square import Square
+
+
+class Move:
+    """A move as its square's bit index (``row * 8 + col``) and the mask of discs it flips."""
+    __slots__ = ("index", "flips")
+
+    def __init__(self, index, flips):
+        self.index = index
+        self.flips = flips
+
+    @classmethod
+    def from_pos(cls, pos, flips):
+        """Build a move from a ``(row, col)`` square and its flipped squares."""
+        mask = 0
+        for r, c in flips:
+            mask |= 1 << (r * 8 + c)
+        return cls(pos[0] * 8 + pos[1], mask)
+
+    @property
+    def pos(self):
+        """The move's square as ``(row, col)``."""
+        return POSITIONS[self.index]
+
+    def flip_list(self):
+        """Return the flipped squares as ``(row, col)`` tuples in row-major order."""
+        flips = []
+        mask = self.flips
+        while mask:
+            low = mask & -mask
+            flips.append(POSITIONS[low.bit_length() - 1])
+            mask ^= low
+        return flips
+
+    def __iter__(self):
+        return iter((self.pos, self.flip_list()))
+
+    def __eq__(self, other):
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.index == other.index and self.flips == other.flips
+
+    def __hash__(self):
+        return hash((self.index, self.flips))
+
+    def __repr__(self):
+        return f"Move({self.pos}, flips={self.flips:#018x})"
+
+
+class BoardState:
+    """A position as ``black``/``white`` masks, the side to move and the pass counters."""
+    __slots__ = ("black", "white", "current_turn", "pass_count", "consecutive_passes")
+
+    def __init__(self, black, white, current_turn=Square.WHITE, pass_count=0, consecutive_passes=0):
+        self.black = black
+        self.white = white
+        self.current_turn = current_turn
+        self.pass_count = pass_count
+        self.consecutive_passes = consecutive_passes
+
+    @classmethod
+    def from_board(cls, board):
+        """Return the state of ``board``."""
+        black, white = board.masks()
+        return cls(black, white, board.current_turn, board.pass_count, board.consecutive_passes)
+
+    def to_board(self, cls=None, rng=None):
+        """Return a new board in this position.
+
+        ``cls`` is the board class to build, the configured engine's by
+        default (see :func:`game.engine.board_class`).
+        """
+        if cls is None:
+            from .engine import board_class
+            cls = board_class()
+        board = cls.from_masks(self.black, self.white, self.current_turn, rng=rng)
+        board.pass_count = self.pass_count
+        board.consecutive_passes = self.consecutive_passes
+        return board
+
+    def _key(self):
+        return self.black, self.white, self.current_turn, self.pass_count, self.consecutive_passes
+
+    def __eq__(self, other):
+        if not isinstance(other, BoardState):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (f"BoardState(black={self.black:#018x}, white={self.white:#018x}, "
+                f"current_turn={self.current_turn.name}, pass_count={self.pass_count}, "
+                f"consecutive_passes={self.consecutive_passes})")
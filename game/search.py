@@ -0,0 +1,245 @@
+"""Alpha-beta search strategy for the BlacknWhite game.
+
+This module provides :class:`Searcher`, a negamax search with alpha-beta
+pruning, iterative deepening and move ordering that runs on any board
+engine (:class:`~game.board.Board` or :class:`~game.bitboard.BitBoard`)
+through ``open_moves``/``make_move``/``undo_move``.
+
+The search is bounded by a wall-clock budget, a node budget, or both.
+Each iteration deepens by one ply; when the budget runs out the best
+move of the last completed iteration is returned, so a short budget
+still yields the deepest search that fits.
+
+Positions are cached in a :class:`~game.transposition.TranspositionTable`
+keyed by the board's incrementally maintained ``zobrist_key``; the
+stored best move is tried first when a position is seen again.
+
+Typical usage::
+
+    from game.search import Searcher
+    result = Searcher(time_limit=0.05).search(board)
+    board.make_move(result.move, result.flips)
+"""
+import time
+from collections import namedtuple
+
+from .square import Square
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# Static square weights, mirroring the square classes make_smart_move
+# uses: corners are prized, squares touching a corner are avoided.
+SQUARE_WEIGHTS = (
+    20, -5, 4, 3, 3, 4, -5, 20,
+    -5, -8, -2, -2, -2, -2, -8, -5,
+    4, -2, 1, 1, 1, 1, -2, 4,
+    3, -2, 1, 0, 0, 1, -2, 3,
+    3, -2, 1, 0, 0, 1, -2, 3,
+    4, -2, 1, 1, 1, 1, -2, 4,
+    -5, -8, -2, -2, -2, -2, -8, -5,
+    20, -5, 4, 3, 3, 4, -5, 20,
+)
+
+
+def _weight_masks():
+    """Group :data:`SQUARE_WEIGHTS` into ``(weight, mask)`` pairs."""
+    masks = {}
+    for index, weight in enumerate(SQUARE_WEIGHTS):
+        if weight:
+            masks[weight] = masks.get(weight, 0) | (1 << index)
+    return tuple(masks.items())
+
+
+WEIGHT_MASKS = _weight_masks()
+
+# Every square, highest weight first (row-major among equals): the order
+# moves are tried in.  FIRST_ORDERS[index] is the same with that square
+# moved to the front, for trying a transposition table move first.
+WEIGHT_ORDER = tuple(sorted(((i // 8, i % 8) for i in range(64)),
+                            key=lambda pos: SQUARE_WEIGHTS[pos[0] * 8 + pos[1]], reverse=True))
+FIRST_ORDERS = tuple(((i // 8, i % 8),) + tuple(pos for pos in WEIGHT_ORDER if pos != (i // 8, i % 8))
+                     for i in range(64))
+
+# Final positions are scored by disc differential scaled well above any
+# heuristic score, so a proven win always beats a good-looking position.
+DISC_SCALE = 1000
+INFINITY = 1 << 30
+
+# How many nodes to visit between clock checks.
+CHECK_INTERVAL = 32
+
+# Memory budget of the process-wide table used by shared_table().
+DEFAULT_TT_SIZE_MB = 8
+
+SearchResult = namedtuple("SearchResult", "move flips score depth nodes elapsed")
+
+_shared_table = None
+
+
+def shared_table():
+    """Return the process-wide transposition table, creating it on first use.
+
+    Searches in several threads use it at once without a lock; the
+    table rejects entries torn by concurrent writes.
+    """
+    global _shared_table
+    if _shared_table is None:
+        _shared_table = TranspositionTable(DEFAULT_TT_SIZE_MB)
+    return _shared_table
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget is exhausted."""
+
+
+def evaluate(board):
+    """Return a heuristic score of ``board`` for the side to move."""
+    black, white = board.masks()
+    own, opp = (black, white) if board.current_turn == Square.BLACK else (white, black)
+    score = 0
+    for weight, mask in WEIGHT_MASKS:
+        score += weight * ((own & mask).bit_count() - (opp & mask).bit_count())
+    return score
+
+
+def final_score(board):
+    """Return the exact result of a finished game for the side to move."""
+    opponent = Square.BLACK if board.current_turn == Square.WHITE else Square.WHITE
+    return (board.count(board.current_turn) - board.count(opponent)) * DISC_SCALE
+
+
+class Searcher:
+    """Negamax alpha-beta search with iterative deepening.
+
+    Args:
+        time_limit: wall-clock budget per search in seconds, or ``None``.
+        node_limit: maximum nodes visited per search, or ``None``.
+        max_depth: deepest iteration to attempt.
+        tt: a :class:`~game.transposition.TranspositionTable` to use, or
+            ``None`` to search without one.
+    """
+
+    def __init__(self, time_limit=None, node_limit=None, max_depth=64, tt=None):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.tt = tt
+        self.nodes = 0
+        self._deadline = None
+        self._next_check = 0
+
+    def search(self, board):
+        """Search ``board`` and return the best move found as a :class:`SearchResult`.
+
+        The board is used in place through make/undo and is left exactly
+        as it was.  A result ``depth`` of 0 means the budget ran out before
+        the first iteration finished and the move is the best by static
+        square weight.  Raises if the side to move has no legal move.
+        """
+        started = time.perf_counter()
+        self.nodes = 0
+        self._deadline = started + self.time_limit if self.time_limit is not None else None
+        self._next_check = 0
+        if self.tt is not None:
+            self.tt.new_search()
+
+        moves = board.open_moves()["moves"]
+        if not moves:
+            raise ValueError("No legal moves to search.")
+        order = sorted(moves, key=self._move_key, reverse=True)
+        best_move, best_score, completed = order[0], -INFINITY, 0
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._search_root(board, moves, order, depth)
+            except SearchTimeout:
+                break
+            best_move, best_score, completed = move, score, depth
+            # principal variation first on the next iteration
+            order.remove(move)
+            order.insert(0, move)
+            if depth >= board.open_count():
+                break  # the whole game tree fits, the result is exact
+
+        elapsed = time.perf_counter() - started
+        return SearchResult(best_move, moves[best_move], best_score, completed, self.nodes, elapsed)
+
+    def _search_root(self, board, moves, order, depth):
+        alpha, best_move = -INFINITY, order[0]
+        for pos in order:
+            board.make_move(pos, moves[pos])
+            try:
+                score = -self._negamax(board, depth - 1, -INFINITY, -alpha)
+            finally:
+                board.undo_move()
+            if score > alpha:
+                alpha, best_move = score, pos
+        return alpha, best_move
+
+    def _negamax(self, board, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_budget()
+        if board.game_over():
+            return final_score(board)
+        if depth <= 0:
+            return evaluate(board)
+
+        tt, key, tt_move = self.tt, None, None
+        if tt is not None:
+            key = board.zobrist_key
+            entry = tt.probe(key)
+            if entry is not None:
+                entry_depth, bound, score, tt_move = entry
+                if entry_depth >= depth:
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER and score >= beta:
+                        return score
+                    if bound == UPPER and score <= alpha:
+                        return score
+
+        # Moves are generated lazily, so a cutoff skips the rest of them.
+        order = WEIGHT_ORDER if tt_move is None else FIRST_ORDERS[tt_move]
+        alpha_orig, best, best_pos = alpha, -INFINITY, None
+        for pos, flips in board.iter_moves(order):
+            board.make_move(pos, flips)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha)
+            finally:
+                board.undo_move()
+            if score > best:
+                best, best_pos = score, pos
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_pos is None:
+            board.pass_turn()
+            try:
+                return -self._negamax(board, depth, -beta, -alpha)
+            finally:
+                board.undo_move()
+
+        if tt is not None:
+            if best <= alpha_orig:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            tt.store(key, depth, bound, best, best_pos[0] * 8 + best_pos[1])
+        return best
+
+    @staticmethod
+    def _move_key(pos):
+        return SQUARE_WEIGHTS[pos[0] * 8 + pos[1]]
+
+    def _check_budget(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        self._next_check = self.nodes + CHECK_INTERVAL
+        if self.node_limit is not None:
+            if self.nodes >= self.node_limit:
+                raise SearchTimeout()
+            self._next_check = min(self._next_check, self.node_limit)
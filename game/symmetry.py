@@ -0,0 +1,147 @@
+"""Symmetries of the 8x8 board: transforms, canonical positions and move mapping.
+
+The board has 8 symmetries, the rotations and reflections of the
+square.  Each is numbered by its index in :data:`SQUARE_MAPS`, which
+maps square ``row * 8 + col`` to the square it moves to:
+
+==  ======================  ===========================
+ 0  ``(r, c)``              identity
+ 1  ``(r, 7 - c)``          mirror left-right
+ 2  ``(7 - r, c)``          flip top-bottom
+ 3  ``(7 - r, 7 - c)``      rotate 180 degrees
+ 4  ``(c, r)``              transpose (main diagonal)
+ 5  ``(c, 7 - r)``          rotate 90 degrees clockwise
+ 6  ``(7 - c, r)``          rotate 90 degrees anticlockwise
+ 7  ``(7 - c, 7 - r)``      anti-diagonal
+==  ======================  ===========================
+
+Masks (bit = row * 8 + col, as in :meth:`Board.masks`) are transformed
+with a handful of shifts and swaps instead of one step per disc: a
+top-bottom flip reverses the mask's bytes, a left-right mirror reverses
+the bits within each byte, and a transpose is three delta swaps.  The
+other symmetries are compositions of those, and :func:`transforms`
+shares the intermediate steps, so all 8 images of a mask cost about as
+much as a few dozen integer operations.
+
+A position's canonical form is the smallest ``(black, white)`` pair over
+its 8 images (:func:`canonical_masks`, :func:`canonical`), so every
+symmetric variant of a position gets the same key.  Moves go into the
+canonical frame with :func:`map_square` and come back with
+:func:`unmap_square`::
+
+    from game.symmetry import canonical, map_square, unmap_square
+    key, symmetry = canonical(board)
+    stored = map_square(pos, symmetry)
+    ...
+    pos = unmap_square(stored, symmetry)
+"""
+from .board import POSITIONS
+
+SYMMETRIES = 8
+
+# The symmetry that undoes each symmetry.
+INVERSES = (0, 1, 2, 3, 4, 6, 5, 7)
+
+_BITS_1 = 0x5555555555555555
+_BITS_2 = 0x3333333333333333
+_BITS_4 = 0x0F0F0F0F0F0F0F0F
+_DIAG_1 = 0x5500550055005500
+_DIAG_2 = 0x3333000033330000
+_DIAG_4 = 0x0F0F0F0F00000000
+
+
+def flip_vertical(mask):
+    """Return ``mask`` with its rows in reverse order: ``(r, c) -> (7 - r, c)``."""
+    return int.from_bytes(mask.to_bytes(8, "little"), "big")
+
+
+def mirror_horizontal(mask):
+    """Return ``mask`` with its columns in reverse order: ``(r, c) -> (r, 7 - c)``."""
+    mask = ((mask >> 1) & _BITS_1) | ((mask & _BITS_1) << 1)
+    mask = ((mask >> 2) & _BITS_2) | ((mask & _BITS_2) << 2)
+    return ((mask >> 4) & _BITS_4) | ((mask & _BITS_4) << 4)
+
+
+def transpose(mask):
+    """Return ``mask`` flipped about the main diagonal: ``(r, c) -> (c, r)``."""
+    t = _DIAG_4 & (mask ^ (mask << 28))
+    mask ^= t ^ (t >> 28)
+    t = _DIAG_2 & (mask ^ (mask << 14))
+    mask ^= t ^ (t >> 14)
+    t = _DIAG_1 & (mask ^ (mask << 7))
+    return mask ^ t ^ (t >> 7)
+
+
+def transforms(mask):
+    """Return the images of ``mask`` under all 8 symmetries, in symmetry order."""
+    mirrored = mirror_horizontal(mask)
+    transposed = transpose(mask)
+    turned = mirror_horizontal(transposed)
+    return (mask, mirrored, flip_vertical(mask), flip_vertical(mirrored),
+            transposed, turned, flip_vertical(transposed), flip_vertical(turned))
+
+
+def transform(mask, symmetry):
+    """Return the image of ``mask`` under ``symmetry``."""
+    if symmetry >= 4:
+        mask = transpose(mask)
+    if symmetry & 1:
+        mask = mirror_horizontal(mask)
+    if symmetry & 2:
+        mask = flip_vertical(mask)
+    return mask
+
+
+def _square_maps():
+    """Return, per symmetry, the table mapping square index to its image."""
+    return tuple(tuple(transform(1 << index, symmetry).bit_length() - 1 for index in range(64))
+                 for symmetry in range(SYMMETRIES))
+
+
+SQUARE_MAPS = _square_maps()
+INVERSE_MAPS = tuple(SQUARE_MAPS[inverse] for inverse in INVERSES)
+
+
+def map_square(pos, symmetry):
+    """Return the image of square ``pos`` (``(row, col)``) under ``symmetry``."""
+    return POSITIONS[SQUARE_MAPS[symmetry][pos[0] * 8 + pos[1]]]
+
+
+def unmap_square(pos, symmetry):
+    """Return the square that ``symmetry`` takes to ``pos``; undoes :func:`map_square`."""
+    return POSITIONS[INVERSE_MAPS[symmetry][pos[0] * 8 + pos[1]]]
+
+
+def canonical_masks(black, white):
+    """Return ``((black, white), symmetry)`` for the smallest image of the masks.
+
+    ``symmetry`` takes the given masks to the canonical ones; on ties the
+    lowest symmetry wins.
+    """
+    images = list(zip(transforms(black), transforms(white)))
+    best = min(images)
+    return best, images.index(best)
+
+
+def canonical(board):
+    """Return ``(key, symmetry)`` for ``board``'s position.
+
+    ``key`` is ``(black, white, side to move)`` in the canonical frame, the
+    same for all 8 symmetric variants of a position; ``symmetry`` takes
+    this board's squares into that frame.
+    """
+    (black, white), symmetry = canonical_masks(*board.masks())
+    return (black, white, board.current_turn.value), symmetry
+
+
+def transform_board(board, symmetry):
+    """Return a new board of ``board``'s class with every disc moved by ``symmetry``.
+
+    The side to move and the pass counters are kept; the move history is not.
+    """
+    black, white = board.masks()
+    out = type(board).from_masks(transform(black, symmetry), transform(white, symmetry),
+                                 board.current_turn, rng=board.rng)
+    out.pass_count = board.pass_count
+    out.consecutive_passes = board.consecutive_passes
+    return out
@@ -0,0 +1,241 @@
+"""Parallel self-play tournament runner for the BlacknWhite game.
+
+Plays every pairing of the chosen strategies against each other and
+reports wins, losses, ties and average final disc counts, the same
+table ``test_stats.py`` has always printed.
+
+Games are split into chunks and fanned out over a
+:class:`~concurrent.futures.ProcessPoolExecutor`.  Every game gets its
+own :class:`random.Random` seeded from ``(seed, white strategy, black
+strategy, game index)`` alone, so the results are identical whatever
+the worker count or chunk size.  The ``search`` strategy plays here with
+a node budget (:data:`SEARCH_NODES`) and a fresh transposition table per
+game instead of its usual wall-clock budget, so its games are just as
+reproducible.  Running totals are printed as chunks finish.
+
+With ``--profile`` every worker runs with :mod:`game.profiling` on and
+their counters are merged and printed after the results.
+
+Usage::
+
+    python -m game.tournament --games 5000 --workers 32
+    python -m game.tournament --strategies smart search --games 200 --engine bitboard
+    python -m game.tournament --strategies search --games 20 --profile
+"""
+import argparse
+import contextlib
+import functools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import profiling
+from .engine import create_board
+from .square import Square
+from .transposition import TranspositionTable
+
+STRATEGIES = ("smart", "random", "maxflips")
+
+# Node budget per 'search' move in tournament games, in place of a time limit.
+SEARCH_NODES = 2000
+
+# Transposition table size for each tournament game played with 'search'.
+SEARCH_TT_SIZE_MB = 1
+
+
+def strategy_method(name):
+    """Return the Board method name for a strategy (``'smart'`` -> ``'make_smart_move'``)."""
+    if name.startswith("make_"):
+        return name
+    return f"make_{name}_move"
+
+
+def game_seed(seed, white_strategy, black_strategy, index):
+    """Return the deterministic seed for one game of a pairing."""
+    return f"{seed}/{strategy_method(white_strategy)}/{strategy_method(black_strategy)}/{index}"
+
+
+def search_table(*strategies):
+    """Return a fresh transposition table for one game if a strategy searches, else None."""
+    if "make_search_move" in map(strategy_method, strategies):
+        return TranspositionTable(SEARCH_TT_SIZE_MB)
+    return None
+
+
+def strategy_mover(board, name, tt=None):
+    """Return a callable that plays ``board``'s next move with strategy ``name``.
+
+    ``search`` is bound to :data:`SEARCH_NODES` nodes and the table ``tt``
+    with no time limit, so its moves do not depend on machine speed or load.
+    """
+    method = strategy_method(name)
+    move = getattr(board, method)
+    if method == "make_search_move":
+        return functools.partial(move, time_limit=None, node_limit=SEARCH_NODES, tt=tt)
+    return move
+
+
+def play_game(white_strategy, black_strategy, index, seed=0, engine=None):
+    """Play one game and return the final ``(white_count, black_count)``.
+
+    Even-numbered games start with BLACK to move, odd ones with WHITE.
+    """
+    rng = random.Random(game_seed(seed, white_strategy, black_strategy, index))
+    board = create_board(engine, rng=rng)
+    if index % 2 == 0:
+        board.current_turn = Square.BLACK
+    tt = search_table(white_strategy, black_strategy)
+    white_move = strategy_mover(board, white_strategy, tt)
+    black_move = strategy_mover(board, black_strategy, tt)
+    while not board.game_over():
+        if board.current_turn == Square.WHITE:
+            white_move()
+        else:
+            black_move()
+    return board.count(Square.WHITE), board.count(Square.BLACK)
+
+
+def new_totals():
+    """Return an empty aggregate for one pairing."""
+    return {"games": 0, "white_wins": 0, "black_wins": 0, "ties": 0, "white_discs": 0, "black_discs": 0}
+
+
+def merge_totals(totals, other):
+    """Add the counts of ``other`` into ``totals`` and return it."""
+    for key in totals:
+        totals[key] += other[key]
+    return totals
+
+
+def play_chunk(white_strategy, black_strategy, start, count, seed=0, engine=None):
+    """Play games ``start .. start + count - 1`` of a pairing and aggregate them."""
+    totals = new_totals()
+    for index in range(start, start + count):
+        white_count, black_count = play_game(white_strategy, black_strategy, index, seed, engine)
+        totals["games"] += 1
+        totals["white_discs"] += white_count
+        totals["black_discs"] += black_count
+        if white_count > black_count:
+            totals["white_wins"] += 1
+        elif black_count > white_count:
+            totals["black_wins"] += 1
+        else:
+            totals["ties"] += 1
+    return totals
+
+
+def profiled_chunk(white_strategy, black_strategy, start, count, seed=0, engine=None):
+    """Run :func:`play_chunk` in a worker with profiling on.
+
+    Returns ``(totals, counters)``, the counters being a
+    :func:`game.profiling.snapshot` of this chunk alone.
+    """
+    profiling.reset()
+    with profiling.profiled():
+        totals = play_chunk(white_strategy, black_strategy, start, count, seed, engine)
+    return totals, profiling.snapshot()
+
+
+def make_chunks(pairings, games, chunk_size):
+    """Return ``(white, black, start, count)`` tasks covering every game."""
+    tasks = []
+    for white_strategy, black_strategy in pairings:
+        for start in range(0, games, chunk_size):
+            tasks.append((white_strategy, black_strategy, start, min(chunk_size, games - start)))
+    return tasks
+
+
+def format_row(white_strategy, black_strategy, totals):
+    """Format one pairing's totals as a tab-separated results row."""
+    games = totals["games"] or 1
+    return (
+        f"{strategy_method(white_strategy)} \t{strategy_method(black_strategy)} \t{totals['games']} "
+        f"\t{totals['white_wins']} \t{totals['black_wins']} \t{totals['ties']} "
+        f"\t{totals['white_discs'] / games:.2f} \t{totals['black_discs'] / games:.2f}"
+    )
+
+
+HEADER = "White Strategy \tBlack Strategy \tGames \tWhite Wins \tBlack Wins \tTies \tWhite Avg \tBlack Avg"
+
+
+def run_tournament(strategies=STRATEGIES, games=5000, workers=None, chunk_size=250,
+                   seed=0, engine=None, progress=None, profile=False):
+    """Play every ordered pairing of ``strategies`` and return the totals.
+
+    Args:
+        strategies: strategy names (``'smart'`` or ``'make_smart_move'``).
+        games: games per pairing.
+        workers: worker processes; ``1`` plays in this process and
+            ``None`` uses every CPU.
+        chunk_size: games per task sent to a worker.
+        seed: base seed; the same seed always gives the same results.
+        engine: board engine name passed to :func:`game.engine.create_board`.
+        progress: optional callable ``(white, black, totals)`` invoked with
+            the running totals of a pairing each time one of its chunks
+            finishes.
+        profile: play with :mod:`game.profiling` on; the counters of
+            every worker are merged into this process's, so read them
+            with :func:`game.profiling.snapshot` afterwards.
+
+    Returns:
+        A dict mapping ``(white, black)`` to that pairing's totals, in
+        pairing order.
+    """
+    pairings = [(w, b) for w in strategies for b in strategies]
+    results = {pairing: new_totals() for pairing in pairings}
+    tasks = make_chunks(pairings, games, chunk_size)
+
+    def record(task, totals):
+        white_strategy, black_strategy = task[0], task[1]
+        merge_totals(results[(white_strategy, black_strategy)], totals)
+        if progress is not None:
+            progress(white_strategy, black_strategy, results[(white_strategy, black_strategy)])
+
+    if workers == 1:
+        with profiling.profiled() if profile else contextlib.nullcontext():
+            for task in tasks:
+                record(task, play_chunk(*task, seed, engine))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(profiled_chunk if profile else play_chunk, *task, seed, engine): task
+                   for task in tasks}
+        for future in as_completed(futures):
+            if profile:
+                totals, counters = future.result()
+                profiling.merge(counters)
+            else:
+                totals = future.result()
+            record(futures[future], totals)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a self-play tournament between Board strategies.")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES),
+                        help="strategy names, e.g. smart random maxflips search")
+    parser.add_argument("--games", type=int, default=5000, help="games per pairing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (1 = no pool)")
+    parser.add_argument("--chunk-size", type=int, default=250, help="games per task")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for reproducible runs")
+    parser.add_argument("--engine", default=None, help="board engine: grid or bitboard")
+    parser.add_argument("--quiet", action="store_true", help="only print the final table")
+    parser.add_argument("--profile", action="store_true", help="also print per-operation call counts and timings")
+    args = parser.parse_args(argv)
+
+    def progress(white_strategy, black_strategy, totals):
+        print(f"[running] {format_row(white_strategy, black_strategy, totals)}", file=sys.stderr, flush=True)
+
+    results = run_tournament(args.strategies, args.games, args.workers, args.chunk_size,
+                             args.seed, args.engine, None if args.quiet else progress, args.profile)
+    print(HEADER)
+    for (white_strategy, black_strategy), totals in results.items():
+        print(format_row(white_strategy, black_strategy, totals))
+    if args.profile:
+        print()
+        print(profiling.format_table(profiling.snapshot()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Fixed-size transposition table for the BlacknWhite search.
+
+Entries live in two preallocated ``array`` buffers -- a 64-bit check
+word and one packed 64-bit word of data -- so the table's memory is
+fixed at construction time (16 bytes per slot) no matter how many
+positions are stored.
+
+The check word is the Zobrist key XOR the data word.  Threads that
+search with one shared table (see :func:`game.search.shared_table`)
+take no lock, so a reader can see one entry's check word next to
+another entry's data; the pair then fails the check and reads as a
+miss instead of a wrong score or move.
+
+Each slot holds the search depth, the bound type (exact, lower or
+upper), the score and the best move of one position.  A new entry
+replaces the resident one when the slot is empty, holds the same
+position, was written by an earlier search, or was searched no deeper
+than the new one.
+
+Typical usage::
+
+    tt = TranspositionTable(size_mb=16)
+    entry = tt.probe(board.zobrist_key)
+    ...
+    tt.store(board.zobrist_key, depth, EXACT, score, move_index)
+    print(tt.stats())
+"""
+from array import array
+
+EMPTY, EXACT, LOWER, UPPER = 0, 1, 2, 3
+
+# Bytes per slot: one key word plus one data word.
+SLOT_BYTES = 16
+
+NO_MOVE = 64
+_SCORE_OFFSET = 1 << 31
+
+# Packed data word layout (low to high bits):
+# move (7) | bound (2) | depth (8) | generation (8) | score + offset (32)
+_MOVE_MASK, _BOUND_SHIFT, _DEPTH_SHIFT, _GEN_SHIFT, _SCORE_SHIFT = 0x7F, 7, 9, 17, 25
+
+
+class TranspositionTable:
+    """Bounded hash table of search results keyed by Zobrist key.
+
+    Args:
+        size_mb: memory budget in megabytes; the slot count is the largest
+            power of two that fits.
+    """
+
+    def __init__(self, size_mb=16):
+        if size_mb <= 0:
+            raise ValueError("Transposition table size must be positive.")
+        slots = 1
+        while slots * 2 * SLOT_BYTES <= size_mb * 1024 * 1024:
+            slots *= 2
+        self.size = slots
+        self._mask = slots - 1
+        self._keys = array("Q", bytes(8 * slots))
+        self._data = array("Q", bytes(8 * slots))
+        self._generation = 1
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the probe/hit/store counters."""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        """Mark entries written so far as older than the next search's."""
+        self._generation = self._generation % 255 + 1
+
+    def clear(self):
+        """Empty every slot."""
+        self._keys = array("Q", bytes(8 * self.size))
+        self._data = array("Q", bytes(8 * self.size))
+
+    def probe(self, key):
+        """Return ``(depth, bound, score, move)`` stored for ``key``, or ``None``.
+
+        ``move`` is a square index (``row * 8 + col``) or ``None``.
+        """
+        self.probes += 1
+        slot = key & self._mask
+        data = self._data[slot]
+        if not data or self._keys[slot] ^ data != key:
+            return None
+        self.hits += 1
+        move = data & _MOVE_MASK
+        return (
+            (data >> _DEPTH_SHIFT) & 0xFF,
+            (data >> _BOUND_SHIFT) & 0x3,
+            (data >> _SCORE_SHIFT) - _SCORE_OFFSET,
+            None if move == NO_MOVE else move,
+        )
+
+    def store(self, key, depth, bound, score, move=None):
+        """Record a search result for ``key``, subject to the replacement policy."""
+        slot = key & self._mask
+        old = self._data[slot]
+        if old:
+            same = self._keys[slot] ^ old == key
+            stale = (old >> _GEN_SHIFT) & 0xFF != self._generation
+            if not (same or stale or depth >= (old >> _DEPTH_SHIFT) & 0xFF):
+                return
+            if not same:
+                self.replacements += 1
+        self.stores += 1
+        data = (
+            (NO_MOVE if move is None else move)
+            | bound << _BOUND_SHIFT
+            | min(depth, 0xFF) << _DEPTH_SHIFT
+            | self._generation << _GEN_SHIFT
+            | (score + _SCORE_OFFSET) << _SCORE_SHIFT
+        )
+        self._keys[slot] = key ^ data
+        self._data[slot] = data
+
+    def stats(self):
+        """Return usage counters, including ``hit_rate``, as a dict."""
+        return {
+            "size": self.size,
+            "size_mb": self.size * SLOT_BYTES / (1024 * 1024),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "replacements": self.replacements,
+        }
@@ -0,0 +1,48 @@
+"""Zobrist hashing for BlacknWhite positions.
+
+A position's key is the XOR of one random 64-bit number per occupied
+square and color, plus :data:`SIDE_KEY` when BLACK is to move.  Because
+XOR is its own inverse, boards keep the key up to date by XOR-ing in
+and out only the squares a move or undo touches.
+
+The tables are generated from a fixed seed, so keys are identical in
+every process and can be stored alongside cached results.
+"""
+import random
+
+from .square import Square
+
+_rng = random.Random(0x5EED_B1AC_1A11)
+
+# DISC_KEYS[color][index] for color BLACK and WHITE, index = row * 8 + col.
+DISC_KEYS = {
+    Square.OPEN: (0,) * 64,
+    Square.BLACK: tuple(_rng.getrandbits(64) for _ in range(64)),
+    Square.WHITE: tuple(_rng.getrandbits(64) for _ in range(64)),
+}
+
+# XOR of both colors' keys: turning a disc over on ``index``.
+FLIP_KEYS = tuple(b ^ w for b, w in zip(DISC_KEYS[Square.BLACK], DISC_KEYS[Square.WHITE]))
+
+SIDE_KEY = _rng.getrandbits(64)
+
+del _rng
+
+
+def hash_masks(black, white):
+    """Return the disc part of the key for ``black``/``white`` masks."""
+    key = 0
+    black_keys = DISC_KEYS[Square.BLACK]
+    white_keys = DISC_KEYS[Square.WHITE]
+    for index in range(64):
+        bit = 1 << index
+        if black & bit:
+            key ^= black_keys[index]
+        elif white & bit:
+            key ^= white_keys[index]
+    return key
+
+
+def side_key(turn):
+    """Return the side-to-move part of the key."""
+    return SIDE_KEY if turn == Square.BLACK else 0
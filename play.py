@@ -16,7 +16,8 @@ Usage:
     python play.py
 
 Dependencies:
-    - game.board.Board
+    - game.engine.create_board (set BLACKNWHITE_ENGINE=bitboard for the
+      bitboard engine)
     - game.square.Square
 
 Opponent strategy mapping:
@@ -24,14 +25,18 @@ Opponent strategy mapping:
     'random'  : Board.make_random_move()
     'maxflips': Board.make_maxflips_move()
     'smart'   : Board.make_smart_move()
+    'search'  : Board.make_search_move() (alpha-beta, SEARCH_TIME_LIMIT per move)
 
 This file only updates documentation and user-facing CLI prompts; it does
 not change game logic or Board APIs.
 """
 import sys
-from game.board import Board
+from game.engine import create_board
 from game.square import Square
 
+# Per-move thinking time for the 'search' strategy, in seconds.
+SEARCH_TIME_LIMIT = 1.0
+
 
 def print_board(board):
     """Print the board to stdout in a human-readable ASCII format.
@@ -62,12 +67,13 @@ def get_opponent_move(board, strategy):
     """Select and apply an opponent move using the chosen strategy.
 
     The function calls the corresponding `Board` helper for the strategy
-    (when available). For the fallback 'first' strategy it queries
-    `board.open_moves()` and picks the first available move.
+    (when available). For the fallback 'first' strategy it takes the first
+    move from `board.iter_moves()`, without generating the others.
 
     Args:
         board: Board instance whose turn is the opponent's.
-        strategy: strategy name (one of 'first', 'random', 'maxflips', 'smart').
+        strategy: strategy name (one of 'first', 'random', 'maxflips', 'smart',
+            'search').
 
     Returns:
         A tuple (move_square, move_flips) describing the move that was made,
@@ -80,14 +86,13 @@ def get_opponent_move(board, strategy):
         move_square, move_flips = board.make_maxflips_move()
     elif strategy == 'smart':
         move_square, move_flips = board.make_smart_move()
+    elif strategy == 'search':
+        move_square, move_flips = board.make_search_move(time_limit=SEARCH_TIME_LIMIT)
     else:  # default to 'first' (pick first available)
-        moves = board.open_moves()
-        # `moves` is expected to be a dict with a 'moves' key mapping squares to flip lists
-        if not moves['moves']:
+        move_square, move_flips = next(board.iter_moves(), (None, None))
+        if move_square is None:
             board.pass_turn()
             return None, None
-        move_square = list(moves['moves'].keys())[0]
-        move_flips = moves['moves'][move_square]
         board.make_move(move_square, move_flips)
     return move_square, move_flips
 
@@ -107,13 +112,13 @@ def main():
     player_color = Square.BLACK if color == 'B' else Square.WHITE
     opponent_color = Square.WHITE if player_color == Square.BLACK else Square.BLACK
 
-    print("Opponent strategies: first, random, maxflips, smart")
+    print("Opponent strategies: first, random, maxflips, smart, search")
     strategy = input("Choose opponent strategy: ").strip().lower()
-    if strategy not in ('first', 'random', 'maxflips', 'smart'):
+    if strategy not in ('first', 'random', 'maxflips', 'smart', 'search'):
         strategy = 'random'
         print("Unknown strategy, defaulting to 'random'.")
 
-    board = Board()
+    board = create_board()
 
     while not board.game_over():
         print_board(board)
@@ -4,8 +4,13 @@ Board() initialises with current_turn = WHITE, so when the player starts as
 WHITE it is immediately their turn; when they start as BLACK the AI (WHITE)
 must move first.
 """
+import base64
+
 import pytest
 
+from game.board import Board
+from game.square import Square
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -57,6 +62,51 @@ class TestGetBoard:
         assert data['strategy'] is None
 
 
+# ---------------------------------------------------------------------------
+# Compact response format
+# ---------------------------------------------------------------------------
+
+class TestCompactFormat:
+    def _decode(self, data):
+        return Board.from_bytes(base64.b64decode(data['board']))
+
+    def test_query_param_selects_compact(self, client):
+        start(client, 'WHITE')
+        full = board(client)
+        compact = client.get('/api/board?format=compact').get_json()
+        assert self._decode(compact).to_dict() == full['board']
+        assert compact['strategy'] == full['strategy']
+
+    def test_accept_header_selects_compact(self, client):
+        start(client, 'WHITE')
+        res = client.get('/api/board', headers={'Accept': 'application/vnd.blacknwhite.compact+json'})
+        assert isinstance(res.get_json()['board'], str)
+        assert 'Accept' in res.headers['Vary']
+
+    def test_plain_json_by_default(self, client):
+        res = client.get('/api/board', headers={'Accept': 'application/json'})
+        assert isinstance(res.get_json()['board'], dict)
+
+    def test_valid_moves_mask(self, client):
+        start(client, 'WHITE')
+        full = board(client)
+        mask = int(client.get('/api/board?format=compact').get_json()['valid_moves'], 16)
+        assert sorted(divmod(i, 8) for i in range(64) if mask >> i & 1) == \
+            sorted(tuple(m) for m in full['valid_moves'])
+
+    def test_compact_is_much_smaller(self, client):
+        start(client, 'WHITE')
+        full = client.get('/api/board').data
+        compact = client.get('/api/board?format=compact').data
+        assert len(compact) * 4 < len(full)
+
+    def test_post_routes_honour_format(self, client):
+        res = client.post('/api/start?format=compact', json={'color': 'BLACK', 'strategy': 'first'})
+        assert isinstance(res.get_json()['board'], str)
+        res = client.post('/api/opponentmove?format=compact')
+        assert self._decode(res.get_json()).current_turn == Square.BLACK
+
+
 # ---------------------------------------------------------------------------
 # POST /api/start
 # ---------------------------------------------------------------------------
@@ -76,7 +126,7 @@ class TestStart:
         assert data['strategy'] == 'smart'
 
     def test_all_valid_strategies(self, client):
-        for strat in ('random', 'maxflips', 'smart', 'first'):
+        for strat in ('random', 'maxflips', 'smart', 'search', 'first'):
             res = start(client, 'WHITE', strat)
             assert res.get_json()['strategy'] == strat
 
@@ -84,6 +134,14 @@ class TestStart:
         data = start(client, 'WHITE', 'telepathy').get_json()
         assert data['strategy'] == 'first'
 
+    def test_seed_is_recorded(self, client):
+        data = client.post('/api/start', json={'color': 'WHITE', 'strategy': 'random', 'seed': 42}).get_json()
+        assert data['seed'] == 42
+        assert board(client)['seed'] == 42
+
+    def test_seed_is_drawn_when_missing(self, client):
+        assert isinstance(start(client).get_json()['seed'], int)
+
     def test_invalid_color_defaults_to_black(self, client):
         data = start(client, 'RED', 'random').get_json()
         assert data['color'] == 'BLACK'
@@ -224,8 +282,16 @@ class TestOpponentMove:
         # Now it's BLACK's (player's) turn — valid_moves should be populated
         assert len(board(client)['valid_moves']) > 0
 
+    def test_same_seed_replays_same_ai_moves(self, client):
+        grids = []
+        for _ in range(2):
+            client.post('/api/start', json={'color': 'BLACK', 'strategy': 'random', 'seed': 7})
+            client.post('/api/opponentmove')
+            grids.append(board(client)['board']['grid'])
+        assert grids[0] == grids[1]
+
     def test_all_strategies_work(self, client):
-        for strat in ('random', 'maxflips', 'smart', 'first'):
+        for strat in ('random', 'maxflips', 'smart', 'search', 'first'):
             start(client, 'BLACK', strat)
             res = client.post('/api/opponentmove')
             assert res.status_code == 200, f"strategy {strat!r} failed"
@@ -274,6 +340,11 @@ class TestIndexPage:
         assert res.status_code == 200
         assert b'BlacknWhite' in res.data
 
+    def test_offers_every_ui_strategy(self, client):
+        res = client.get('/')
+        for strategy in ('random', 'maxflips', 'smart', 'search'):
+            assert f'<option value="{strategy}"'.encode() in res.data
+
     def test_references_game_js(self, client):
         res = client.get('/')
         assert b'game.js' in res.data
@@ -0,0 +1,139 @@
+"""Tests for the ASGI serving mode in web/asgi.py.
+
+Runs the same requests as the Flask tests against the Starlette app and
+checks that both answer identically.
+"""
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient
+
+from web import asgi
+from web.app import app as flask_app
+
+
+@pytest.fixture
+def aclient():
+    with TestClient(asgi.app) as c:
+        yield c
+
+
+@pytest.fixture
+def fclient():
+    flask_app.config['TESTING'] = True
+    with flask_app.test_client() as c:
+        yield c
+    flask_app.config['TESTING'] = False
+
+
+def both(aclient, fclient, method, url, **kwargs):
+    """Send the same request to both apps and return ``(asgi, flask)`` (status, json) pairs."""
+    a = aclient.request(method, url, **kwargs)
+    f = getattr(fclient, method.lower())(url, **kwargs)
+    return (a.status_code, a.json()), (f.status_code, f.get_json())
+
+
+# ---------------------------------------------------------------------------
+# Contract
+# ---------------------------------------------------------------------------
+
+class TestSameContract:
+    def test_default_board(self, aclient, fclient):
+        a, f = both(aclient, fclient, 'GET', '/api/board')
+        assert a[0] == 200
+        assert {**a[1], 'seed': None} == {**f[1], 'seed': None}
+
+    def test_game_replays_identically(self, aclient, fclient):
+        start = {'color': 'BLACK', 'strategy': 'random', 'seed': 11}
+        a, f = both(aclient, fclient, 'POST', '/api/start', json=start)
+        assert a == f
+        for _ in range(3):
+            a, f = both(aclient, fclient, 'POST', '/api/opponentmove')
+            assert a == f
+            move = a[1]['valid_moves'][0]
+            a, f = both(aclient, fclient, 'POST', '/api/move', json={'row': move[0], 'col': move[1]})
+            assert a == f
+
+    @pytest.mark.parametrize('method,url,body', [
+        ('POST', '/api/pass', None),
+        ('POST', '/api/move', {'row': 0, 'col': 0}),
+        ('POST', '/api/opponentmove', None),
+    ])
+    def test_errors_without_game(self, aclient, fclient, method, url, body):
+        a, f = both(aclient, fclient, method, url, json=body)
+        assert a == f == (400, {'error': 'No game in progress'})
+
+    def test_move_validation(self, aclient, fclient):
+        both(aclient, fclient, 'POST', '/api/start', json={'color': 'WHITE', 'strategy': 'first', 'seed': 1})
+        for body in ({'row': 0}, {'row': 9, 'col': 0}, {'row': 0, 'col': 0}):
+            a, f = both(aclient, fclient, 'POST', '/api/move', json=body)
+            assert a == f
+            assert a[0] == 400
+
+    def test_compact_format(self, aclient, fclient):
+        both(aclient, fclient, 'POST', '/api/start', json={'color': 'WHITE', 'strategy': 'first', 'seed': 1})
+        a, f = both(aclient, fclient, 'GET', '/api/board?format=compact')
+        assert a == f
+        assert isinstance(a[1]['board'], str)
+
+    def test_reset(self, aclient):
+        aclient.post('/api/start', json={'color': 'WHITE', 'strategy': 'smart'})
+        assert aclient.post('/api/reset').json()['color'] is None
+        assert aclient.post('/api/pass').status_code == 400
+
+    def test_serves_page_and_static(self, aclient):
+        assert 'game.js' in aclient.get('/').text
+        assert aclient.get('/static/game.js').status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+
+class TestPool:
+    def test_search_move_runs_in_pool(self, aclient):
+        from game.poscache import shared_cache
+        shared_cache().clear()
+        start = {'color': 'WHITE', 'strategy': 'search', 'seed': 3}
+        aclient.post('/api/start', json=start)
+        move = aclient.get('/api/board').json()['valid_moves'][0]
+        aclient.post('/api/move', json={'row': move[0], 'col': move[1]})
+        res = aclient.post('/api/opponentmove')
+        assert res.status_code == 200
+        data = res.json()
+        assert data['board']['current_turn'] == 'WHITE'
+        assert sum(cell != 'OPEN' for row in data['board']['grid'] for cell in row) == 6
+        assert asgi.ai_pool._executor is not None
+
+    def test_wrong_turn_is_rejected_before_pool(self, aclient):
+        aclient.post('/api/start', json={'color': 'WHITE', 'strategy': 'search'})
+        res = aclient.post('/api/opponentmove')
+        assert res.status_code == 400
+        assert res.json() == {'error': "Not opponent's turn"}
+
+    def test_submit_waits_for_a_free_slot(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        pool = asgi.AiPool(workers=1, queue_per_worker=0)
+        pool._executor = ThreadPoolExecutor(1)
+        release = threading.Event()
+        first = pool.submit(release.wait)
+        second = []
+        waiter = threading.Thread(target=lambda: second.append(pool.submit(int, 7)))
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+        release.set()
+        waiter.join(5)
+        assert first.result() is True
+        assert second[0].result() == 7
+        pool.shutdown()
+
+    def test_choose_reply_is_pure(self):
+        from game.board import Board
+        from web.core import choose_reply
+        packed = Board().to_bytes()
+        assert choose_reply(packed, 'first', 's') == (2, 4)
+        assert choose_reply(packed, 'random', 's') == choose_reply(packed, 'random', 's')
@@ -0,0 +1,112 @@
+"""Unit tests for game/batch.py."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.bitboard import BitBoard
+from game.batch import simulate, summarize, legal_moves, flips, popcount, choose_moves
+
+
+def random_positions(count, plies=20, seed=3):
+    """Return BitBoards reached by random play, one per game."""
+    boards = []
+    for i in range(count):
+        b = BitBoard(rng=random.Random(f"{seed}/{i}"))
+        for _ in range(plies):
+            if b.game_over():
+                break
+            b.make_random_move()
+        boards.append(b)
+    return boards
+
+
+def own_opp(boards):
+    own = np.array([b._sides()[0] for b in boards], dtype=np.uint64)
+    opp = np.array([b._sides()[1] for b in boards], dtype=np.uint64)
+    return own, opp
+
+
+# ---------------------------------------------------------------------------
+# Move generation
+# ---------------------------------------------------------------------------
+
+class TestMoveGeneration:
+    def test_legal_moves_match_bitboard(self):
+        boards = random_positions(50)
+        own, opp = own_opp(boards)
+        moves = legal_moves(own, opp)
+        assert [int(m) for m in moves] == [b.legal_mask() for b in boards]
+
+    def test_flips_match_bitboard(self):
+        boards = random_positions(50)
+        own, opp = own_opp(boards)
+        for i, b in enumerate(boards):
+            for index in range(64):
+                if b.legal_mask() >> index & 1:
+                    move = np.array([1 << index], dtype=np.uint64)
+                    assert int(flips(own[i:i + 1], opp[i:i + 1], move)[0]) == b.flip_mask(index)
+
+    def test_popcount(self):
+        values = np.array([0, 1, 0xFF, 0xFFFFFFFFFFFFFFFF], dtype=np.uint64)
+        assert list(popcount(values)) == [0, 1, 8, 64]
+
+
+class TestPolicies:
+    def test_random_picks_legal_move(self):
+        boards = random_positions(50)
+        own, opp = own_opp(boards)
+        moves = legal_moves(own, opp)
+        rows = moves != 0
+        chosen = choose_moves("random", own[rows], opp[rows], moves[rows], np.random.default_rng(0))
+        assert np.all(popcount(chosen) == 1)
+        assert np.all(chosen & moves[rows] == chosen)
+
+    def test_maxflips_picks_a_maximum(self):
+        boards = [b for b in random_positions(50) if b.legal_mask()]
+        own, opp = own_opp(boards)
+        moves = legal_moves(own, opp)
+        chosen = choose_moves("maxflips", own, opp, moves, np.random.default_rng(0))
+        for b, move in zip(boards, chosen):
+            index = int(move).bit_length() - 1
+            best = max(b.flip_mask(i).bit_count() for i in range(64) if b.legal_mask() >> i & 1)
+            assert b.flip_mask(index).bit_count() == best
+
+    def test_unknown_policy_raises(self):
+        with pytest.raises(ValueError):
+            simulate(1, "smart", "random")
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+class TestSimulate:
+    def test_games_end(self):
+        white, black = simulate(200, "random", "random", seed=1)
+        assert white.shape == black.shape == (200,)
+        assert np.all(white + black <= 64)
+        assert np.all(white + black >= 5)
+
+    def test_seed_is_reproducible(self):
+        a = simulate(100, "maxflips", "random", seed=7)
+        b = simulate(100, "maxflips", "random", seed=7)
+        assert np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1])
+
+    def test_accepts_board_method_names(self):
+        a = simulate(20, "make_maxflips_move", "make_random_move", seed=2)
+        b = simulate(20, "maxflips", "random", seed=2)
+        assert np.array_equal(a[0], b[0])
+
+    def test_maxflips_beats_random(self):
+        totals = summarize(*simulate(2000, "maxflips", "random", seed=0))
+        assert totals["white_wins"] > totals["black_wins"]
+
+    def test_summary_matches_tournament_totals(self):
+        white = np.array([40, 20, 32])
+        black = np.array([24, 44, 32])
+        assert summarize(white, black) == {
+            "games": 3, "white_wins": 1, "black_wins": 1, "ties": 1,
+            "white_discs": 92, "black_discs": 100,
+        }
@@ -0,0 +1,73 @@
+"""Tests for the benchmark suite in benchmarks/suite.py."""
+import json
+import os
+
+import pytest
+
+from benchmarks import suite
+
+
+def document(**timings):
+    return {"results": {name: {"us_per_op": us, "ops": 1} for name, us in timings.items()}}
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+class TestCorpus:
+    @pytest.mark.parametrize('engine', ['grid', 'bitboard'])
+    def test_positions_are_live(self, engine):
+        boards = suite.corpus(engine)
+        assert len(boards) == len(suite.POSITIONS)
+        for board, (discs, _, _, turn) in zip(boards, suite.POSITIONS):
+            assert 64 - board.open_count() == discs
+            assert board.current_turn.name == turn
+            assert not board.game_over()
+            assert board.open_moves()["moves"]
+
+
+# ---------------------------------------------------------------------------
+# Running and comparing
+# ---------------------------------------------------------------------------
+
+class TestRun:
+    def test_results_document(self):
+        doc = suite.run(repeat=1, only=["make_move", "to_bytes"])
+        assert set(doc["results"]) == {"make_move", "board.to_bytes"}
+        assert doc["meta"]["positions"] == len(suite.POSITIONS)
+        assert all(r["us_per_op"] > 0 and r["ops"] > 0 for r in doc["results"].values())
+
+    def test_api_reports_each_endpoint(self):
+        doc = suite.run(repeat=1, only=["api"])
+        assert {"api POST /api/start", "api POST /api/move", "api POST /api/opponentmove"} <= set(doc["results"])
+
+    def test_loaders_follow_the_engine(self, monkeypatch):
+        from game.board import Board
+        from game.engine import ENGINE_ENV_VAR
+        monkeypatch.delenv(ENGINE_ENV_VAR, raising=False)
+        built = []
+        init = Board.__init__
+        monkeypatch.setattr(Board, '__init__', lambda self, rng=None: built.append(type(self)) or init(self, rng))
+        doc = suite.run('bitboard', repeat=1, only=['board.from_json', 'board.from_bytes', 'state.from_json', 'api'])
+        assert {'board.from_json', 'board.from_bytes', 'state.from_json'} <= set(doc['results'])
+        assert built == []
+        assert ENGINE_ENV_VAR not in os.environ
+
+    def test_compare_flags_regressions(self):
+        rows = suite.compare(document(a=20.0, b=10.0, new=1.0), document(a=10.0, b=9.0, gone=1.0), threshold=0.25)
+        assert [(name, regressed) for name, _, _, _, regressed in rows] == [("a", True), ("b", False)]
+        assert rows[0][3] == 2.0
+
+    def test_main_fails_on_regression(self, tmp_path, capsys):
+        baseline = tmp_path / "baseline.json"
+        current = suite.run(repeat=1, only=["to_bytes"])
+        current["results"]["board.to_bytes"]["us_per_op"] /= 100
+        baseline.write_text(json.dumps(current))
+        assert suite.main(["--repeat", "1", "--only", "to_bytes", "--baseline", str(baseline)]) == 1
+        assert "REGRESSION" in capsys.readouterr().err
+
+    def test_main_writes_results(self, tmp_path):
+        output = tmp_path / "results.json"
+        assert suite.main(["--repeat", "1", "--only", "to_bytes", "-o", str(output)]) == 0
+        assert "board.to_bytes" in json.loads(output.read_text())["results"]
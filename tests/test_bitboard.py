@@ -0,0 +1,211 @@
+"""Unit tests for game/bitboard.py and game/engine.py.
+
+BitBoard must be a drop-in replacement for Board: every public query and
+every strategy must produce the same results on the same position.
+"""
+import random
+
+import pytest
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard, iter_bits, index_to_pos, pos_to_bit
+from game.engine import board_class, create_board, ENGINE_ENV_VAR
+
+
+def play_in_lockstep(seed, strategy='make_random_move'):
+    """Play one game on both engines with identically seeded RNGs.
+
+    Yields ``(grid_board, bit_board)`` after every ply.
+    """
+    grid, bits = Board(rng=random.Random(seed)), BitBoard(rng=random.Random(seed))
+    while not grid.game_over():
+        getattr(grid, strategy)()
+        getattr(bits, strategy)()
+        yield grid, bits
+
+
+# ---------------------------------------------------------------------------
+# Starting position
+# ---------------------------------------------------------------------------
+
+class TestBitBoardInit:
+    def test_grid_matches_board(self):
+        assert BitBoard().grid == Board().grid
+
+    def test_starting_turn_is_white(self):
+        assert BitBoard().current_turn == Square.WHITE
+
+    def test_counts(self):
+        b = BitBoard()
+        assert b.open_count() == 60
+        assert b.count(Square.WHITE) == 2
+        assert b.count(Square.BLACK) == 2
+
+    def test_is_a_board(self):
+        assert isinstance(BitBoard(), Board)
+
+
+# ---------------------------------------------------------------------------
+# Equivalence with Board
+# ---------------------------------------------------------------------------
+
+class TestEquivalence:
+    def test_opening_moves_identical(self):
+        assert BitBoard().open_moves() == Board().open_moves()
+
+    @pytest.mark.parametrize('strategy', ['make_random_move', 'make_maxflips_move', 'make_smart_move'])
+    def test_full_games_identical(self, strategy):
+        for grid, bits in play_in_lockstep(7, strategy):
+            assert bits.to_dict() == grid.to_dict()
+            if not grid.game_over():
+                assert bits.open_moves() == grid.open_moves()
+        assert bits.winner() == grid.winner()
+
+    def test_get_flips_identical(self):
+        grid, bits = Board(), BitBoard()
+        for sq in grid.open_squares():
+            for path in (grid.north_coords(sq), grid.east_coords(sq), grid.southwest_coords(sq)):
+                assert bits.get_flips(path) == grid.get_flips(path)
+
+    def test_undo_matches_board(self):
+        grid, bits = Board(rng=random.Random(1)), BitBoard(rng=random.Random(1))
+        while not grid.game_over():
+            grid.make_random_move()
+            bits.make_random_move()
+        while grid.move_stack:
+            bit_pos, bit_flips = bits.undo_move()
+            grid_pos, grid_flips = grid.undo_move()
+            assert bit_pos == grid_pos
+            assert sorted(bit_flips or []) == sorted(grid_flips or [])
+            assert bits.to_dict() == grid.to_dict()
+        assert bits.to_dict() == BitBoard().to_dict()
+
+    def test_undo_play(self):
+        b = BitBoard()
+        b.play(2 * 8 + 4)
+        b.undo_move()
+        assert b.to_dict() == BitBoard().to_dict()
+
+    def test_pass_and_game_over(self):
+        b = BitBoard()
+        b.pass_turn()
+        assert b.current_turn == Square.BLACK
+        assert not b.game_over()
+        b.pass_turn()
+        assert b.game_over()
+        with pytest.raises(Exception):
+            b.open_moves()
+
+
+# ---------------------------------------------------------------------------
+# Mask-only move generation
+# ---------------------------------------------------------------------------
+
+class TestMaskApi:
+    def test_opening_legal_mask(self):
+        mask = BitBoard().legal_mask()
+        assert sorted(index_to_pos(i) for i in iter_bits(mask)) == [(2, 4), (3, 5), (4, 2), (5, 3)]
+
+    def test_legal_mask_matches_open_moves_all_game(self):
+        for grid, bits in play_in_lockstep(11, 'make_maxflips_move'):
+            if grid.game_over():
+                break
+            moves = grid.open_moves()['moves']
+            assert [index_to_pos(i) for i in iter_bits(bits.legal_mask())] == list(moves)
+            for pos, flips in moves.items():
+                expected = 0
+                for flip in flips:
+                    expected |= pos_to_bit(flip)
+                assert bits.flip_mask(pos[0] * 8 + pos[1]) == expected
+
+    def test_play_applies_move(self):
+        b = BitBoard()
+        flips = b.play(2 * 8 + 4)
+        assert flips == pos_to_bit((3, 4))
+        assert b.grid[2][4] == Square.WHITE
+        assert b.grid[3][4] == Square.WHITE
+        assert b.current_turn == Square.BLACK
+
+    def test_play_illegal_square_raises(self):
+        with pytest.raises(ValueError):
+            BitBoard().play(0)
+
+    def test_play_invalidates_move_cache(self):
+        b = BitBoard()
+        b.open_moves()
+        b.play(2 * 8 + 4)
+        assert b.open_moves() == BitBoard.from_dict(b.to_dict()).open_moves()
+        assert b.move_cache_stats()['hits'] == 0
+
+
+# ---------------------------------------------------------------------------
+# Lazy move iteration
+# ---------------------------------------------------------------------------
+
+class TestIterMoves:
+    @pytest.mark.parametrize('seed', range(5))
+    def test_same_as_board(self, seed):
+        board, bitboard = Board(rng=random.Random(seed)), BitBoard(rng=random.Random(seed))
+        for _ in range(20):
+            board.make_random_move()
+            bitboard.make_random_move()
+        order = sorted((i // 8, i % 8) for i in range(64))[::-1]
+        assert list(bitboard.iter_moves()) == list(board.iter_moves())
+        assert list(bitboard.iter_moves(order)) == list(board.iter_moves(order))
+
+    def test_only_legal_squares_are_tried(self, monkeypatch):
+        b = BitBoard()
+        calls = []
+        flips_at = BitBoard._flips_at
+        monkeypatch.setattr(BitBoard, '_flips_at', lambda self, pos: calls.append(pos) or flips_at(self, pos))
+        assert next(b.iter_moves()) == ((2, 4), [(3, 4)])
+        assert calls == [(2, 4)]
+
+
+# ---------------------------------------------------------------------------
+# Serialisation
+# ---------------------------------------------------------------------------
+
+class TestBitBoardSerialization:
+    def test_roundtrip_through_board(self):
+        for grid, bits in play_in_lockstep(3):
+            pass
+        assert Board.from_dict(bits.to_dict()).to_dict() == grid.to_dict()
+        assert BitBoard.from_dict(grid.to_dict()).to_dict() == bits.to_dict()
+
+    def test_json_roundtrip(self):
+        b = BitBoard()
+        b.make_move((2, 4), [(3, 4)])
+        b2 = BitBoard.from_json(b.to_json())
+        assert isinstance(b2, BitBoard)
+        assert b2.grid[2][4] == Square.WHITE
+        assert b2.current_turn == Square.BLACK
+
+    def test_bytes_match_board(self):
+        for grid, bits in play_in_lockstep(3):
+            assert bits.to_bytes() == grid.to_bytes()
+        restored = BitBoard.from_bytes(grid.to_bytes())
+        assert isinstance(restored, BitBoard)
+        assert restored.masks() == bits.masks()
+        assert restored.zobrist_key == bits.zobrist_key
+
+
+# ---------------------------------------------------------------------------
+# Engine selection
+# ---------------------------------------------------------------------------
+
+class TestEngineSelection:
+    def test_default_is_grid(self, monkeypatch):
+        monkeypatch.delenv(ENGINE_ENV_VAR, raising=False)
+        assert type(create_board()) is Board
+
+    def test_explicit_engine(self):
+        assert type(create_board('bitboard')) is BitBoard
+
+    def test_environment_variable(self, monkeypatch):
+        monkeypatch.setenv(ENGINE_ENV_VAR, 'bitboard')
+        assert board_class() is BitBoard
+
+    def test_unknown_engine_raises(self):
+        with pytest.raises(ValueError):
+            create_board('quantum')
@@ -0,0 +1,172 @@
+"""Unit tests for game/book.py and the strategies' use of a book."""
+import pytest
+
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard
+from game.book import (OpeningBook, RECORD_SIZE, HEADER_SIZE, build_from_search,
+                       build_from_selfplay, encode, install, install_default, write)
+from game.poscache import canonical
+
+
+@pytest.fixture
+def small_book():
+    return OpeningBook.from_entries(build_from_search(plies=3, depth=2))
+
+
+@pytest.fixture
+def installed(small_book):
+    install(small_book)
+    yield small_book
+    install(None)
+
+
+def mirrored(board):
+    """Return ``board`` reflected left to right."""
+    out = Board()
+    for r in range(8):
+        for c in range(8):
+            out.grid[r][7 - c] = board.grid[r][c]
+    out.current_turn = board.current_turn
+    return out
+
+
+# ---------------------------------------------------------------------------
+# File format
+# ---------------------------------------------------------------------------
+
+class TestBookFile:
+    def test_records_are_fixed_size(self):
+        entries = build_from_search(plies=2, depth=1)
+        assert len(encode(entries)) == HEADER_SIZE + len(entries) * RECORD_SIZE
+
+    def test_write_and_mmap(self, tmp_path):
+        entries = build_from_search(plies=3, depth=2)
+        path = tmp_path / 'book.bin'
+        write(entries, path)
+        book = OpeningBook.open(path)
+        try:
+            assert len(book) == len(entries)
+            assert book.entries() == entries
+        finally:
+            book.close()
+
+    @pytest.mark.parametrize('data', [b'', b'NOPE' + bytes(6), b'BWBK\x00\x09' + bytes(4),
+                                      b'BWBK\x00\x01\x00\x00\x00\x05'])
+    def test_rejects_bad_files(self, data):
+        with pytest.raises(ValueError):
+            OpeningBook(data)
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+
+class TestLookup:
+    def test_start_position_is_in_book(self, small_book):
+        b = Board()
+        assert small_book.lookup(b) in b.open_moves()['moves']
+
+    def test_black_to_move_start_is_in_book(self, small_book):
+        b = Board()
+        b.current_turn = Square.BLACK
+        assert small_book.lookup(b) in b.open_moves()['moves']
+
+    def test_unknown_position_misses(self, small_book):
+        b = Board()
+        for _ in range(10):
+            b.make_smart_move()
+        assert small_book.lookup(b) is None
+
+    def test_symmetric_positions_map_move(self, small_book):
+        b = Board()
+        b.make_move((2, 4), b.open_moves()['moves'][(2, 4)])
+        twin = mirrored(b)
+        pos = small_book.lookup(b)
+        assert small_book.lookup(twin) == (pos[0], 7 - pos[1])
+
+    def test_bitboard_lookup(self, small_book):
+        assert small_book.lookup(BitBoard()) == small_book.lookup(Board())
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+class TestBuild:
+    def test_search_book_covers_folded_openings(self):
+        entries = build_from_search(plies=2, depth=1)
+        # one start position per side to move, then their folded replies
+        assert canonical(Board())[0] in entries
+        assert len(entries) == 4
+
+    def test_search_moves_are_legal(self):
+        for (black, white, turn), index in build_from_search(plies=3, depth=1).items():
+            b = BitBoard.from_masks(black, white, Square(turn))
+            assert b.legal_mask() >> index & 1
+
+    def test_selfplay_is_reproducible(self):
+        a = build_from_selfplay(games=40, plies=2, min_games=1, seed=3)
+        b = build_from_selfplay(games=40, plies=2, min_games=1, seed=3)
+        assert a == b
+        assert canonical(Board())[0] in a
+
+    def test_search_selfplay_uses_a_table_per_game(self, monkeypatch):
+        import game.search
+        from game.book import _selfplay_chunk
+        first = _selfplay_chunk('search', 'random', 0, 1, 2, 3)
+
+        def shared_table():
+            raise AssertionError("self-play used the process-wide table")
+
+        monkeypatch.setattr(game.search, 'shared_table', shared_table)
+        assert _selfplay_chunk('search', 'random', 0, 1, 2, 3) == first
+
+    def test_selfplay_min_games_filters(self):
+        assert build_from_selfplay(games=10, plies=4, min_games=1000) == {}
+
+
+# ---------------------------------------------------------------------------
+# Strategies
+# ---------------------------------------------------------------------------
+
+class TestStrategiesUseBook:
+    def test_smart_plays_book_move(self, installed):
+        b = Board()
+        expected = installed.lookup(b)
+        pos, flips = b.make_smart_move()
+        assert pos == expected
+        assert flips == Board().open_moves()['moves'][expected]
+
+    def test_search_plays_book_move_without_searching(self, installed):
+        b = BitBoard()
+        expected = installed.lookup(b)
+        pos, _ = b.make_search_move(node_limit=1)
+        assert pos == expected
+
+    def test_out_of_book_falls_back(self, installed):
+        b = Board()
+        for _ in range(8):
+            b.make_random_move()
+        if b.game_over() or not b.open_moves()['moves']:
+            pytest.skip("no move to play")
+        assert installed.lookup(b) is None
+        pos, _ = b.make_smart_move()
+        assert pos is not None
+
+    def test_install_default_reads_env(self, tmp_path, monkeypatch):
+        path = tmp_path / 'book.bin'
+        write(build_from_search(plies=1, depth=1), path)
+        monkeypatch.setenv('BLACKNWHITE_BOOK', str(path))
+        try:
+            book = install_default()
+            assert Board.book is book
+            assert len(book) == 2
+        finally:
+            install(None)
+            book.close()
+
+    def test_install_default_without_env(self, monkeypatch):
+        monkeypatch.delenv('BLACKNWHITE_BOOK', raising=False)
+        assert install_default() is None
+        assert Board.book is None
@@ -0,0 +1,112 @@
+"""Unit tests for game/endgame.py."""
+import random
+
+import pytest
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard
+from game.endgame import ENDGAME_EMPTIES, EndgameSolver, solve, solver_empties
+from game.search import SearchTimeout
+
+
+def endgame_position(empties, seed, cls=BitBoard):
+    """Return a board with ``empties`` empty squares and a move to play."""
+    while True:
+        random.seed(seed)
+        b = cls()
+        while b.open_count() > empties and not b.game_over():
+            b.make_random_move()
+        if not b.game_over() and b.open_count() == empties and b.open_moves()['moves']:
+            return b
+        seed += 1000
+
+
+def minimax(board):
+    """Plain exhaustive negamax over the Board API, as a reference."""
+    if board.game_over():
+        mover = board.current_turn
+        other = Square.BLACK if mover == Square.WHITE else Square.WHITE
+        return board.count(mover) - board.count(other)
+    moves = board.open_moves()['moves']
+    if not moves:
+        board.pass_turn()
+        score = -minimax(board)
+        board.undo_move()
+        return score
+    best = -65
+    for pos, flips in moves.items():
+        board.make_move(pos, flips)
+        best = max(best, -minimax(board))
+        board.undo_move()
+    return best
+
+
+class TestSolve:
+    @pytest.mark.parametrize('seed', range(4))
+    def test_matches_exhaustive_search(self, seed):
+        b = endgame_position(6, seed)
+        move, score = solve(b)
+        assert score == minimax(b)
+        b.make_move(move, b.open_moves()['moves'][move])
+        assert -minimax(b) == score
+
+    def test_engines_agree(self):
+        bits = endgame_position(8, 3)
+        grid = Board.from_dict(bits.to_dict())
+        assert solve(grid) == solve(bits)
+
+    def test_board_is_unchanged(self):
+        b = endgame_position(8, 5)
+        before = b.to_dict()
+        solve(b)
+        assert b.to_dict() == before
+
+    def test_game_over_returns_final_differential(self):
+        b = Board()
+        b.consecutive_passes = 2
+        assert solve(b) == (None, 0)
+
+    def test_node_limit_raises(self):
+        with pytest.raises(SearchTimeout):
+            EndgameSolver(node_limit=10).solve(endgame_position(12, 1))
+
+
+class TestSearchStrategyUsesSolver:
+    def test_plays_solver_move_near_the_end(self):
+        b = endgame_position(6, 2)
+        move, _ = solve(b)
+        played, _ = b.make_search_move(time_limit=None)
+        assert played == move
+
+    def test_falls_back_to_search_when_budget_too_small(self):
+        b = endgame_position(12, 4)
+        moves = b.open_moves()['moves']
+        played, flips = b.make_search_move(time_limit=None, node_limit=20)
+        assert played in moves
+        assert flips == moves[played]
+
+    def test_threshold_follows_the_budget(self):
+        assert solver_empties(None) == ENDGAME_EMPTIES
+        assert solver_empties(0.001) == 0
+        assert solver_empties(0.025) < solver_empties(0.5) <= ENDGAME_EMPTIES
+
+    @pytest.mark.parametrize('seed', range(4))
+    def test_solver_finishes_within_web_budget_at_threshold(self, seed):
+        from web.core import SEARCH_TIME_LIMIT
+        empties = solver_empties(SEARCH_TIME_LIMIT / 2)
+        assert empties >= 6
+        b = endgame_position(empties, seed)
+        # Allow the whole move budget, twice the solver's share, for slow machines.
+        EndgameSolver(time_limit=SEARCH_TIME_LIMIT).solve(b)
+
+    def test_web_budget_skips_solver_above_threshold(self, monkeypatch):
+        from web.core import SEARCH_TIME_LIMIT
+        import game.endgame
+        b = endgame_position(solver_empties(SEARCH_TIME_LIMIT / 2) + 1, 1)
+
+        def fail(self, board):
+            raise AssertionError("solver tried")
+
+        monkeypatch.setattr(game.endgame.EndgameSolver, 'solve', fail)
+        played, _ = b.make_search_move(time_limit=SEARCH_TIME_LIMIT)
+        assert played is not None
@@ -0,0 +1,294 @@
+"""Tests for background AI jobs (web/jobs.py) and the /api/jobs routes."""
+import json
+from concurrent.futures import Future
+
+import pytest
+
+from web.core import ApiError, GameState
+from web.jobs import DONE, ERROR, PENDING, STALE, JobManager
+from web.store import MemoryStore
+
+
+class ManualExecutor:
+    """Runs submitted calls only when :meth:`run` is called."""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.calls.append((future, fn, args))
+        return future
+
+    def run(self):
+        for future, fn, args in self.calls:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        self.calls = []
+
+
+def ai_turn_state(strategy='random'):
+    """A game where the AI (WHITE, which moves first) is to move."""
+    return GameState(strategy=strategy, color='BLACK', seed=5)
+
+
+def start(client, color='BLACK', strategy='random'):
+    return client.post('/api/start', json={'color': color, 'strategy': strategy, 'seed': 5})
+
+
+# ---------------------------------------------------------------------------
+# JobManager
+# ---------------------------------------------------------------------------
+
+class TestJobManager:
+    def setup_method(self):
+        self.store = MemoryStore()
+        self.executor = ManualExecutor()
+        self.jobs = JobManager(self.store, executor=self.executor)
+
+    def test_job_applies_move_when_done(self):
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        job = self.jobs.submit('s1', state)
+        assert job.status == PENDING
+        assert not job.wait(0)
+        self.executor.run()
+        assert job.wait(0)
+        assert job.status == DONE
+        assert job.move is not None
+        stored = self.store.load('s1')
+        assert stored.board.current_turn.name == 'BLACK'
+        assert stored.board.to_dict()['grid'][job.move[0]][job.move[1]] == 'WHITE'
+
+    def test_move_matches_synchronous_reply(self):
+        from web.core import opponent_move
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        job = self.jobs.submit('s1', state)
+        self.executor.run()
+        expected = ai_turn_state()
+        opponent_move(expected)
+        assert self.store.load('s1').board.to_bytes() == expected.board.to_bytes()
+        assert job.status == DONE
+
+    def test_game_changed_makes_job_stale(self):
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        job = self.jobs.submit('s1', state)
+        changed = ai_turn_state()
+        changed.board.make_random_move()
+        self.store.save('s1', changed)
+        self.executor.run()
+        assert job.status == STALE
+        assert job.move is None
+        assert self.store.load('s1') is changed
+        assert changed.board.current_turn.name == 'BLACK'
+
+    def test_finish_waits_for_the_session_lock(self):
+        import threading
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        job = self.jobs.submit('s1', state)
+        runner = threading.Thread(target=self.executor.run)
+        with self.jobs.locks.get('s1'):
+            runner.start()
+            assert not job.wait(0.1)
+            # A request handler plays the AI's move meanwhile.
+            state.board.make_random_move()
+        runner.join(5)
+        assert job.status == STALE
+        assert state.board.current_turn.name == 'BLACK'
+
+    def test_deleted_game_makes_job_stale(self):
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        job = self.jobs.submit('s1', state)
+        self.store.delete('s1')
+        self.executor.run()
+        assert job.status == STALE
+
+    def test_failure_ends_in_error(self, monkeypatch):
+        import web.jobs
+        state = ai_turn_state()
+        self.store.save('s1', state)
+
+        def broken(*args):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(web.jobs, 'choose_reply', broken)
+        job = self.jobs.submit('s1', state)
+        self.executor.run()
+        assert job.status == ERROR
+        assert job.wait(0)
+
+    def test_not_ai_turn_is_rejected(self):
+        state = GameState(strategy='random', color='WHITE')
+        with pytest.raises(ApiError, match="Not opponent's turn"):
+            self.jobs.submit('s1', state)
+
+    def test_get_checks_session(self):
+        state = ai_turn_state()
+        job = self.jobs.submit('s1', state)
+        assert self.jobs.get(job.id, 's1') is job
+        assert self.jobs.get(job.id, 's2') is None
+        assert self.jobs.get('nope', 's1') is None
+
+    def test_finished_jobs_expire(self):
+        now = [0.0]
+        jobs = JobManager(self.store, executor=self.executor, ttl=10, clock=lambda: now[0])
+        state = ai_turn_state()
+        self.store.save('s1', state)
+        old = jobs.submit('s1', state)
+        self.executor.run()
+        now[0] = 11.0
+        jobs.submit('s2', ai_turn_state())
+        assert jobs.get(old.id, 's1') is None
+
+    def test_cached_move_is_played_from_the_executor(self, monkeypatch):
+        import web.jobs
+        from game.poscache import shared_cache
+        cache = shared_cache()
+        cache.clear()
+        state = ai_turn_state('first')
+        cache.put(state.board, 'first', (2, 4))
+        self.store.save('s1', state)
+        monkeypatch.setattr(web.jobs, 'choose_reply', None)
+        job = self.jobs.submit('s1', state)
+        assert job.status == PENDING
+        assert state.board.current_turn.name == 'WHITE'
+        self.executor.run()
+        assert job.status == DONE
+        assert job.move == (2, 4)
+
+
+# ---------------------------------------------------------------------------
+# Flask routes
+# ---------------------------------------------------------------------------
+
+def wait_done(client, job_id):
+    from web.app import jobs
+    for job in list(jobs._jobs.values()):
+        if job.id == job_id:
+            assert job.wait(5)
+    return client.get(f'/api/jobs/{job_id}').get_json()
+
+
+class TestJobRoutes:
+    def test_start_job_returns_202(self, client):
+        start(client)
+        res = client.post('/api/jobs')
+        assert res.status_code == 202
+        data = res.get_json()
+        assert set(data) == {'job', 'status', 'move'}
+
+    def test_poll_until_done(self, client):
+        start(client)
+        job_id = client.post('/api/jobs').get_json()['job']
+        data = wait_done(client, job_id)
+        assert data['status'] == 'done'
+        row, col = data['move']
+        board = client.get('/api/board').get_json()['board']
+        assert board['current_turn'] == 'BLACK'
+        assert board['grid'][row][col] == 'WHITE'
+
+    def test_event_stream(self, client):
+        start(client)
+        job_id = client.post('/api/jobs').get_json()['job']
+        res = client.get(f'/api/jobs/{job_id}/events')
+        assert res.status_code == 200
+        assert res.mimetype == 'text/event-stream'
+        body = res.get_data(as_text=True)
+        event, data = body.strip().splitlines()[-2:]
+        assert event == 'event: done'
+        assert json.loads(data[len('data: '):])['job'] == job_id
+
+    def test_not_opponents_turn(self, client):
+        start(client, color='WHITE')
+        res = client.post('/api/jobs')
+        assert res.status_code == 400
+        assert res.get_json() == {'error': "Not opponent's turn"}
+
+    def test_no_game(self, client):
+        res = client.post('/api/jobs')
+        assert res.status_code == 400
+
+    def test_unknown_job_is_404(self, client):
+        start(client)
+        assert client.get('/api/jobs/nope').status_code == 404
+        assert client.get('/api/jobs/nope/events').status_code == 404
+
+    def test_other_sessions_job_is_404(self, client):
+        from web.app import app
+        start(client)
+        job_id = client.post('/api/jobs').get_json()['job']
+        with app.test_client() as other:
+            assert other.get(f'/api/jobs/{job_id}').status_code == 404
+
+    def test_move_with_think_starts_job(self, client):
+        start(client, color='WHITE')
+        move = client.get('/api/board').get_json()['valid_moves'][0]
+        res = client.post('/api/move', json={'row': move[0], 'col': move[1], 'think': True})
+        data = res.get_json()
+        assert 'job' in data
+        assert wait_done(client, data['job'])['status'] == 'done'
+        assert client.get('/api/board').get_json()['board']['current_turn'] == 'WHITE'
+
+    def test_move_without_think_has_no_job(self, client):
+        start(client, color='WHITE')
+        move = client.get('/api/board').get_json()['valid_moves'][0]
+        data = client.post('/api/move', json={'row': move[0], 'col': move[1]}).get_json()
+        assert 'job' not in data
+
+
+# ---------------------------------------------------------------------------
+# ASGI routes
+# ---------------------------------------------------------------------------
+
+class TestAsgiJobRoutes:
+    @pytest.fixture
+    def aclient(self):
+        pytest.importorskip("starlette")
+        pytest.importorskip("httpx")
+        from starlette.testclient import TestClient
+        from web import asgi
+        with TestClient(asgi.app) as c:
+            yield c
+
+    def test_job_and_event_stream(self, aclient):
+        start(aclient)
+        res = aclient.post('/api/jobs')
+        assert res.status_code == 202
+        job_id = res.json()['job']
+        body = aclient.get(f'/api/jobs/{job_id}/events').text
+        assert 'event: done' in body
+        data = aclient.get(f'/api/jobs/{job_id}').json()
+        assert data['status'] == 'done'
+        assert aclient.get('/api/board').json()['board']['current_turn'] == 'BLACK'
+
+    def test_unknown_job_is_404(self, aclient):
+        start(aclient)
+        assert aclient.get('/api/jobs/nope').status_code == 404
+
+    def test_submit_runs_off_the_event_loop(self, aclient, monkeypatch):
+        import asyncio
+        from web import asgi
+        on_loop = []
+        submit = asgi.jobs.submit
+
+        def recording_submit(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return submit(*args)
+
+        monkeypatch.setattr(asgi.jobs, 'submit', recording_submit)
+        start(aclient)
+        assert aclient.post('/api/jobs').status_code == 202
+        start(aclient, color='WHITE')
+        move = aclient.get('/api/board').json()['valid_moves'][0]
+        aclient.post('/api/move', json={'row': move[0], 'col': move[1], 'think': True})
+        assert on_loop == [False, False]
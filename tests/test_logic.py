@@ -4,9 +4,11 @@ Board() initialises with current_turn = Square.WHITE, so WHITE moves first.
 Starting pieces:  WHITE at (3,3) and (4,4), BLACK at (3,4) and (4,3).
 WHITE's four legal opening moves:  (2,4) (3,5) (4,2) (5,3).
 """
+import base64
+
 import pytest
 from game.square import Square
-from game.board import Board
+from game.board import Board, RAYS
 
 
 # ---------------------------------------------------------------------------
@@ -93,6 +95,27 @@ class TestOpenMoves:
             assert len(flips) >= 1, f"move {pos} should flip at least one piece"
 
 
+# ---------------------------------------------------------------------------
+# Precomputed rays
+# ---------------------------------------------------------------------------
+
+class TestRays:
+    def test_rays_match_coord_helpers(self):
+        b = Board()
+        for r in range(8):
+            for c in range(8):
+                sq = (r, c)
+                paths = [b.north_coords(sq), b.south_coords(sq), b.east_coords(sq), b.west_coords(sq),
+                         b.northeast_coords(sq), b.northwest_coords(sq), b.southeast_coords(sq),
+                         b.southwest_coords(sq)]
+                assert [list(ray) for ray in RAYS[r * 8 + c]] == [p for p in paths if p]
+
+    def test_get_flips_on_ray(self):
+        b = Board()
+        assert b.get_flips(RAYS[2 * 8 + 4][1]) == [(3, 4)]  # south from (2,4)
+        assert b.get_flips(RAYS[0][0]) == []
+
+
 # ---------------------------------------------------------------------------
 # make_move
 # ---------------------------------------------------------------------------
@@ -182,6 +205,158 @@ class TestPassTurn:
             b.pass_turn()
 
 
+# ---------------------------------------------------------------------------
+# open_moves cache
+# ---------------------------------------------------------------------------
+
+class TestMoveCache:
+    def test_repeated_call_is_a_hit(self):
+        b = Board()
+        first = b.open_moves()
+        assert b.open_moves() is first
+        assert b.move_cache_stats() == {'probes': 2, 'hits': 1, 'hit_rate': 0.5}
+
+    def test_make_move_invalidates(self):
+        b = Board()
+        b.make_move((2, 4), b.open_moves()['moves'][(2, 4)])
+        assert b.open_moves() == Board.from_dict(b.to_dict()).open_moves()
+        assert b.move_cache_stats()['hits'] == 0
+
+    def test_pass_turn_invalidates(self):
+        b = Board()
+        white = b.open_moves()
+        b.pass_turn()
+        black = b.open_moves()
+        assert black['color'] == Square.BLACK
+        assert set(black['moves']) == {(2, 3), (3, 2), (4, 5), (5, 4)}
+        b.undo_move()
+        assert b.open_moves() == white
+
+    def test_direct_grid_write_invalidates(self):
+        b = Board()
+        b.open_moves()
+        b.grid[3][2] = Square.WHITE
+        assert b.open_moves() == Board.from_dict(b.to_dict()).open_moves()
+
+    def test_game_over_still_raises(self):
+        b = Board()
+        b.open_moves()
+        b.pass_turn()
+        b.pass_turn()
+        with pytest.raises(Exception):
+            b.open_moves()
+
+
+# ---------------------------------------------------------------------------
+# iter_moves
+# ---------------------------------------------------------------------------
+
+class TestIterMoves:
+    def _midgame(self, seed):
+        import random
+        b = Board(rng=random.Random(seed))
+        for _ in range(20):
+            b.make_random_move()
+        return b
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_matches_open_moves(self, seed):
+        b = self._midgame(seed)
+        expected = list(Board.from_dict(b.to_dict()).open_moves()['moves'].items())
+        assert list(b.iter_moves()) == expected
+
+    def test_follows_order_and_skips_left_out_squares(self):
+        b = Board()
+        order = [(5, 3), (0, 0), (2, 4), (4, 5)]
+        assert [pos for pos, _ in b.iter_moves(order)] == [(5, 3), (2, 4)]
+
+    def test_cached_moves_follow_order(self):
+        b = Board()
+        b.open_moves()
+        order = [(5, 3), (0, 0), (2, 4), (4, 5)]
+        assert list(b.iter_moves(order)) == [(pos, b.open_moves()['moves'][pos]) for pos in [(5, 3), (2, 4)]]
+
+    def test_flips_computed_on_demand(self, monkeypatch):
+        b = Board()
+        calls = []
+        flips_at = Board._flips_at
+        monkeypatch.setattr(Board, '_flips_at', lambda self, pos: calls.append(pos) or flips_at(self, pos))
+        pos, flips = next(b.iter_moves())
+        assert pos == (2, 4)
+        assert flips == [(3, 4)]
+        assert calls[-1] == (2, 4)
+        assert len(calls) < b.open_count()
+
+    def test_moves_between_steps(self):
+        b = Board()
+        seen = []
+        for pos, flips in b.iter_moves():
+            b.make_move(pos, flips)
+            seen.append(pos)
+            b.undo_move()
+        assert seen == list(b.open_moves()['moves'])
+
+    def test_no_moves_yields_nothing(self):
+        b = Board()
+        b.grid = [[Square.WHITE] * 8 for _ in range(7)] + [[Square.OPEN] + [Square.BLACK] * 7]
+        b.current_turn = Square.BLACK
+        assert list(b.iter_moves()) == []
+
+    def test_game_over_raises(self):
+        b = Board()
+        b.pass_turn()
+        b.pass_turn()
+        with pytest.raises(Exception):
+            next(b.iter_moves())
+
+
+# ---------------------------------------------------------------------------
+# undo_move
+# ---------------------------------------------------------------------------
+
+class TestUndoMove:
+    def test_undo_restores_starting_position(self):
+        b = Board()
+        start = b.to_dict()
+        b.make_move((2, 4), [(3, 4)])
+        assert b.undo_move() == ((2, 4), [(3, 4)])
+        assert b.to_dict() == start
+        assert b.open_count() == 60
+        assert b.count(Square.WHITE) == 2
+
+    def test_undo_pass_restores_counters(self):
+        b = Board()
+        b.pass_turn()
+        assert b.undo_move() == (None, None)
+        assert b.current_turn == Square.WHITE
+        assert b.pass_count == 0
+        assert b.consecutive_passes == 0
+
+    def test_undo_whole_game(self):
+        b = Board()
+        snapshots = []
+        while not b.game_over():
+            snapshots.append(b.to_dict())
+            b.make_smart_move()
+        while snapshots:
+            b.undo_move()
+            assert b.to_dict() == snapshots.pop()
+        assert not b.move_stack
+
+    def test_undo_restores_consecutive_passes_after_move(self):
+        b = Board()
+        b.pass_turn()
+        pos, flips = next(iter(b.open_moves()['moves'].items()))
+        b.make_move(pos, flips)
+        b.undo_move()
+        assert b.consecutive_passes == 1
+        assert b.current_turn == Square.BLACK
+
+    def test_undo_with_empty_stack_raises(self):
+        with pytest.raises(Exception):
+            Board().undo_move()
+
+
 # ---------------------------------------------------------------------------
 # game_over
 # ---------------------------------------------------------------------------
@@ -213,6 +388,44 @@ class TestGameOver:
         assert b.open_count() == 59
 
 
+# ---------------------------------------------------------------------------
+# Incremental counters
+# ---------------------------------------------------------------------------
+
+class TestIncrementalCounts:
+    def _scan(self, b, sq):
+        return sum(b.grid[r][c] == sq for r in range(8) for c in range(8))
+
+    def test_counts_follow_moves(self):
+        b = Board()
+        while not b.game_over():
+            b.make_maxflips_move()
+            for sq in Square:
+                assert b.count(sq) == self._scan(b, sq)
+        assert b.open_count() == self._scan(b, Square.OPEN)
+
+    def test_open_squares_in_row_major_order(self):
+        b = Board()
+        b.make_move((2, 4), [(3, 4)])
+        expected = [(r, c) for r in range(8) for c in range(8) if b.grid[r][c] == Square.OPEN]
+        assert b.open_squares() == expected
+
+    def test_direct_grid_write_updates_counts(self):
+        b = Board()
+        b.grid[3][3] = Square.OPEN
+        assert b.count(Square.WHITE) == 1
+        assert (3, 3) in b.open_squares()
+
+    def test_from_dict_rebuilds_counts(self):
+        b = Board()
+        b.make_move((2, 4), [(3, 4)])
+        b2 = Board.from_dict(b.to_dict())
+        assert b2.count(Square.WHITE) == 4
+        assert b2.count(Square.BLACK) == 1
+        assert b2.open_count() == 59
+        assert b2.open_squares() == b.open_squares()
+
+
 # ---------------------------------------------------------------------------
 # winner
 # ---------------------------------------------------------------------------
@@ -291,6 +504,31 @@ class TestSerialization:
         assert b2.grid[3][3] == Square.WHITE
         assert b2.open_count() == 60
 
+    def test_bytes_roundtrip(self):
+        b = Board()
+        b.make_smart_move()
+        b.pass_turn()
+        data = b.to_bytes()
+        assert len(data) == 21
+        b2 = Board.from_bytes(data)
+        assert b2.to_dict() == b.to_dict()
+        assert b2.zobrist_key == b.zobrist_key
+
+    def test_hex_and_base64_forms(self):
+        data = Board().to_bytes()
+        assert Board.from_bytes(bytes.fromhex(data.hex())).to_dict() == Board().to_dict()
+        assert Board.from_bytes(base64.b64decode(base64.b64encode(data))).to_dict() == Board().to_dict()
+
+    @pytest.mark.parametrize('data', [
+        b'',
+        b'\x02' + bytes(20),                                          # unknown version
+        b'\x01' + (1).to_bytes(8, 'big') * 2 + b'\x02\x00\x00\x00',   # overlapping masks
+        b'\x01' + bytes(16) + b'\x00\x00\x00\x00',                    # OPEN to move
+    ])
+    def test_from_bytes_rejects_bad_data(self, data):
+        with pytest.raises(ValueError):
+            Board.from_bytes(data)
+
 
 # ---------------------------------------------------------------------------
 # AI strategies
@@ -325,6 +563,21 @@ class TestAIStrategies:
         # at least as many as a single flip
         assert self._count(b, Square.WHITE) >= 3  # 2 original + 1 flipped minimum
 
+    def test_seeded_rng_replays_game(self):
+        import random
+        games = []
+        for _ in range(2):
+            b = Board(rng=random.Random(123))
+            while not b.game_over():
+                b.make_random_move() if b.current_turn == Square.WHITE else b.make_maxflips_move()
+            games.append(b.to_dict())
+        assert games[0] == games[1]
+
+    def test_from_dict_accepts_rng(self):
+        import random
+        rng = random.Random(5)
+        assert Board.from_dict(Board().to_dict(), rng=rng).rng is rng
+
     def test_strategy_returns_valid_pos_and_flips(self):
         b = Board()
         pos, flips = b.make_random_move()
@@ -0,0 +1,141 @@
+"""Tests for the metrics in web/metrics.py and the /metrics endpoint."""
+import re
+import threading
+
+import pytest
+
+from web import metrics as metrics_module
+from web.metrics import ApiMetrics, Registry
+
+
+def sample(text, line_start):
+    """Return the value of the sample line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {line_start!r} in:\n{text}")
+
+
+# ---------------------------------------------------------------------------
+# Counters and histograms
+# ---------------------------------------------------------------------------
+
+class TestMetrics:
+    def test_counter_exposition(self):
+        registry = Registry()
+        counter = registry.counter("things_total", "Things seen.", ("kind",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc("b")
+        assert registry.render() == (
+            '# HELP things_total Things seen.\n'
+            '# TYPE things_total counter\n'
+            'things_total{kind="a"} 3.0\n'
+            'things_total{kind="b"} 1.0\n'
+        )
+
+    def test_histogram_exposition(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert registry.render().splitlines()[2:] == [
+            'latency_seconds_bucket{le="0.1"} 2.0',
+            'latency_seconds_bucket{le="1.0"} 3.0',
+            'latency_seconds_bucket{le="+Inf"} 4.0',
+            'latency_seconds_sum 3.65',
+            'latency_seconds_count 4.0',
+        ]
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("errors_total", "Errors.", ("error",)).inc('say "hi"\\\n')
+        assert 'errors_total{error="say \\"hi\\"\\\\\\n"} 1.0' in registry.render()
+
+    def test_threads_are_summed(self):
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits.")
+        histogram = registry.histogram("size_bytes", "Sizes.", buckets=(10,))
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+                histogram.observe(5)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        text = registry.render()
+        assert sample(text, "hits_total") == 8000
+        assert sample(text, 'size_bytes_bucket{le="10.0"}') == 8000
+        assert sample(text, "size_bytes_sum") == 40000
+
+    def test_exited_threads_are_folded(self, monkeypatch):
+        monkeypatch.setattr(metrics_module, "MAX_SHARDS", 2)
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits.")
+        for _ in range(10):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+        assert len(counter._shards) <= 2
+        assert sample(registry.render(), "hits_total") == 10
+
+
+# ---------------------------------------------------------------------------
+# /metrics
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    import web.app
+    fresh = ApiMetrics()
+    monkeypatch.setattr(web.app, "metrics", fresh)
+    return fresh
+
+
+class TestMetricsEndpoint:
+    def test_exposition_format(self, client, fresh_metrics):
+        res = client.get('/metrics')
+        assert res.status_code == 200
+        assert res.mimetype == 'text/plain'
+        assert '# TYPE blacknwhite_http_request_duration_seconds histogram' in res.get_data(as_text=True)
+
+    def test_request_latency_and_payload(self, client, fresh_metrics):
+        client.get('/api/board')
+        client.get('/api/board')
+        text = client.get('/metrics').get_data(as_text=True)
+        assert sample(text, 'blacknwhite_http_request_duration_seconds_count{endpoint="/api/board",method="GET"}') == 2
+        assert sample(text, 'blacknwhite_http_requests_total{endpoint="/api/board",method="GET",status="200"}') == 2
+        assert sample(text, 'blacknwhite_response_payload_bytes_count{endpoint="/api/board"}') == 2
+
+    def test_error_counts(self, client, fresh_metrics):
+        client.post('/api/start', json={'color': 'BLACK', 'strategy': 'random'})
+        client.post('/api/move', json={'row': 2, 'col': 3})
+        client.post('/api/opponentmove')
+        client.post('/api/move', json={'row': 0, 'col': 0})
+        text = client.get('/metrics').get_data(as_text=True)
+        assert sample(text, 'blacknwhite_api_errors_total{endpoint="/api/move",error="Not your turn"}') == 1
+        assert sample(text, 'blacknwhite_api_errors_total{endpoint="/api/move",error="Invalid move"}') == 1
+        assert sample(text, 'blacknwhite_http_requests_total{endpoint="/api/move",method="POST",status="400"}') == 2
+
+    def test_think_time_by_strategy(self, client, fresh_metrics):
+        client.post('/api/start', json={'color': 'BLACK', 'strategy': 'maxflips'})
+        client.post('/api/opponentmove')
+        text = client.get('/metrics').get_data(as_text=True)
+        assert sample(text, 'blacknwhite_ai_think_seconds_count{strategy="maxflips"}') == 1
+
+    def test_job_think_time(self, client, fresh_metrics):
+        from web.app import jobs
+        client.post('/api/start', json={'color': 'BLACK', 'strategy': 'random'})
+        job_id = client.post('/api/jobs').get_json()['job']
+        assert jobs._jobs[job_id].wait(5)
+        text = client.get('/metrics').get_data(as_text=True)
+        assert sample(text, 'blacknwhite_ai_think_seconds_count{strategy="random"}') == 1
+
+    def test_unmatched_route(self, client, fresh_metrics):
+        client.get('/nope')
+        text = client.get('/metrics').get_data(as_text=True)
+        assert re.search(r'blacknwhite_http_requests_total\{endpoint="<unmatched>",method="GET",status="404"\}', text)
@@ -0,0 +1,194 @@
+"""Tests for pondering (web/ponder.py)."""
+import itertools
+
+import pytest
+
+from game.board import Board
+from game.poscache import shared_cache
+from web.core import GameState, choose_reply, move_seed, opponent_move
+from web.ponder import MAX_BUDGET, MISSING, Ponderer
+
+
+def human_turn_state(strategy='smart'):
+    """A game where the human (WHITE, which moves first) is to move."""
+    return GameState(strategy=strategy, color='WHITE', seed=9)
+
+
+def first_move(state):
+    moves = state.board.open_moves()['moves']
+    pos = next(iter(moves))
+    state.board.make_move(pos, moves[pos])
+    return pos
+
+
+def wait(ponderer):
+    for round_ in list(ponderer._games.values()):
+        round_.future.result()
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Positions the shared position cache knows are not pondered."""
+    shared_cache().clear()
+
+
+@pytest.fixture
+def ponderer():
+    p = Ponderer(budget=5)
+    yield p
+    p.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Ponderer
+# ---------------------------------------------------------------------------
+
+class TestPonderer:
+    def test_ponders_every_human_move(self, ponderer):
+        state = human_turn_state()
+        round_ = ponderer.start('g', state)
+        round_.future.result()
+        assert len(round_.replies) == len(state.board.open_moves()['moves'])
+        assert ponderer.stats()['positions'] == len(round_.replies)
+
+    def test_skips_positions_the_cache_knows(self, ponderer):
+        state = human_turn_state()
+        first_move(state)
+        shared_cache().put(state.board, 'smart', next(iter(state.board.open_moves()['moves'])))
+        state.board.undo_move()
+        round_ = ponderer.start('g', state)
+        round_.future.result()
+        # Only the cached position is skipped, not its symmetric twins.
+        assert len(round_.replies) == len(state.board.open_moves()['moves']) - 1
+
+    def test_reply_matches_synchronous_move(self, ponderer):
+        state = human_turn_state()
+        ponderer.start('g', state)
+        wait(ponderer)
+        first_move(state)
+        expected = human_turn_state()
+        first_move(expected)
+        opponent_move(expected)
+        assert ponderer.play('g', state)
+        assert state.board.to_bytes() == expected.board.to_bytes()
+        assert ponderer.stats()['hits'] == 1
+
+    def test_take_ends_the_round(self, ponderer):
+        state = human_turn_state()
+        round_ = ponderer.start('g', state)
+        wait(ponderer)
+        first_move(state)
+        assert ponderer.take('g', state) is not MISSING
+        assert round_.cancelled
+        assert ponderer.take('g', state) is MISSING
+
+    def test_unpondered_position_is_missing(self, ponderer):
+        state = human_turn_state()
+        ponderer.start('g', state)
+        wait(ponderer)
+        assert ponderer.take('g', state) is MISSING
+        assert not ponderer.play('other', state)
+        assert ponderer.stats()['misses'] == 2
+
+    def test_new_game_seed_is_missing(self, ponderer):
+        state = human_turn_state()
+        ponderer.start('g', state)
+        wait(ponderer)
+        first_move(state)
+        state.seed += 1
+        assert ponderer.take('g', state) is MISSING
+
+    def test_budget_bounds_the_round(self):
+        ticks = itertools.count()
+        calls = []
+
+        def compute(*args):
+            calls.append(args)
+            return None
+
+        p = Ponderer(budget=2, compute=compute, clock=lambda: next(ticks))
+        round_ = p.start('g', human_turn_state())
+        round_.future.result()
+        assert len(calls) == 2
+        assert round_.spent == 2
+        p.shutdown()
+
+    def test_budget_is_capped(self):
+        assert Ponderer(budget=MAX_BUDGET * 10).budget == MAX_BUDGET
+
+    def test_zero_budget_disables(self):
+        p = Ponderer(budget=0)
+        assert not p.enabled
+        assert p.start('g', human_turn_state()) is None
+
+    @pytest.mark.parametrize('state', [
+        human_turn_state('random'),
+        GameState(strategy='smart', color='BLACK'),
+    ])
+    def test_only_human_turn_with_slow_strategy(self, ponderer, state):
+        assert ponderer.start('g', state) is None
+
+    def test_oldest_game_is_dropped(self):
+        p = Ponderer(budget=5, max_games=2)
+        rounds = [p.start(sid, human_turn_state()) for sid in ('a', 'b', 'c')]
+        assert rounds[0].cancelled
+        assert set(p._games) == {'b', 'c'}
+        p.shutdown()
+
+    def test_restart_cancels_previous_round(self, ponderer):
+        old = ponderer.start('g', human_turn_state())
+        ponderer.start('g', human_turn_state())
+        assert old.cancelled
+
+    def test_replies_use_child_move_seed(self):
+        seen = []
+        p = Ponderer(budget=5, compute=lambda *args: seen.append(args))
+        state = human_turn_state('search')
+        p.start('g', state).future.result()
+        board = Board.from_bytes(seen[0][0])
+        assert seen[0][1:] == ('search', move_seed(state.seed, board))
+        assert choose_reply(seen[0][0], 'first', 's') is not None
+        p.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Web API
+# ---------------------------------------------------------------------------
+
+class TestPonderApi:
+    def test_opponent_move_answers_from_pondering(self, client):
+        from web.app import ponderer
+        ponderer.hits = 0
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'smart', 'seed': 4})
+        wait(ponderer)
+        move = client.get('/api/board').get_json()['valid_moves'][0]
+        client.post('/api/move', json={'row': move[0], 'col': move[1]})
+        res = client.post('/api/opponentmove')
+        assert res.status_code == 200
+        assert res.get_json()['board']['current_turn'] == 'WHITE'
+        assert ponderer.hits == 1
+
+    def test_job_answers_from_pondering(self, client):
+        from web.app import jobs, ponderer
+        ponderer.hits = 0
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'smart', 'seed': 4})
+        wait(ponderer)
+        move = client.get('/api/board').get_json()['valid_moves'][0]
+        data = client.post('/api/move', json={'row': move[0], 'col': move[1], 'think': True}).get_json()
+        job = jobs._jobs[data['job']]
+        assert job.wait(5)
+        assert job.status == 'done'
+        assert ponderer.hits == 1
+
+    def test_move_response_shows_the_players_move(self, client):
+        from web.app import jobs, ponderer
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'smart', 'seed': 4})
+        wait(ponderer)
+        move = client.get('/api/board').get_json()['valid_moves'][0]
+        data = client.post('/api/move', json={'row': move[0], 'col': move[1], 'think': True}).get_json()
+        # The pondered reply is ready, but the body must not include it.
+        assert data['board']['current_turn'] == 'BLACK'
+        assert data['board']['grid'][move[0]][move[1]] == 'WHITE'
+        assert sum(row.count('WHITE') for row in data['board']['grid']) == 4
+        assert jobs._jobs[data['job']].wait(5)
+        assert client.get('/api/board').get_json()['board']['current_turn'] == 'WHITE'
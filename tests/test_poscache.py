@@ -0,0 +1,192 @@
+"""Unit tests for game/poscache.py."""
+import pytest
+
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard
+from game.poscache import PositionCache, SQUARE_MAPS, INVERSE_MAPS, canonical, play_cached
+
+
+def transformed(board, symmetry):
+    """Return a copy of ``board`` with every square moved by ``symmetry``."""
+    out = Board()
+    table = SQUARE_MAPS[symmetry]
+    for r in range(8):
+        for c in range(8):
+            index = table[r * 8 + c]
+            out.grid[index // 8][index % 8] = board.grid[r][c]
+    out.current_turn = board.current_turn
+    return out
+
+
+def opening(plies=6):
+    b = Board()
+    for _ in range(plies):
+        b.make_smart_move()
+    return b
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# Canonical keys
+# ---------------------------------------------------------------------------
+
+class TestCanonical:
+    def test_maps_are_permutations(self):
+        for table, inverse in zip(SQUARE_MAPS, INVERSE_MAPS):
+            assert sorted(table) == list(range(64))
+            assert [inverse[table[i]] for i in range(64)] == list(range(64))
+
+    def test_symmetric_positions_share_key(self):
+        b = opening()
+        keys = {canonical(transformed(b, s))[0] for s in range(8)}
+        assert len(keys) == 1
+
+    def test_side_to_move_is_part_of_key(self):
+        b = opening()
+        key = canonical(b)[0]
+        b.pass_turn()
+        assert canonical(b)[0] != key
+
+    def test_engines_agree(self):
+        grid = opening()
+        assert canonical(BitBoard.from_dict(grid.to_dict())) == canonical(grid)
+
+
+# ---------------------------------------------------------------------------
+# PositionCache
+# ---------------------------------------------------------------------------
+
+class TestPositionCache:
+    def test_put_and_get(self):
+        cache = PositionCache()
+        b = opening()
+        pos = next(iter(b.open_moves()['moves']))
+        assert cache.get(b, 'smart') is None
+        cache.put(b, 'smart', pos)
+        assert cache.get(b, 'smart') == pos
+        assert cache.get(b, 'first') is None
+
+    def test_symmetric_lookup_maps_move_back(self):
+        cache = PositionCache(symmetric={'smart'})
+        b = opening()
+        pos = next(iter(b.open_moves()['moves']))
+        cache.put(b, 'smart', pos)
+        for s in range(8):
+            twin = transformed(b, s)
+            index = SQUARE_MAPS[s][pos[0] * 8 + pos[1]]
+            assert cache.get(twin, 'smart') == divmod(index, 8)
+
+    def test_lru_eviction(self):
+        cache = PositionCache(max_entries=2)
+        boards = [opening(n) for n in (2, 4, 6)]
+        for b in boards[:2]:
+            cache.put(b, 'first', next(iter(b.open_moves()['moves'])))
+        cache.get(boards[0], 'first')
+        cache.put(boards[2], 'first', next(iter(boards[2].open_moves()['moves'])))
+        assert cache.get(boards[1], 'first') is None
+        assert cache.get(boards[0], 'first') is not None
+        assert cache.stats()['evictions'] == 1
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = PositionCache(ttl=5, clock=clock)
+        b = opening()
+        cache.put(b, 'first', next(iter(b.open_moves()['moves'])))
+        clock.now = 5
+        assert cache.get(b, 'first') is None
+        assert len(cache) == 0
+
+    def test_rejects_non_positive_size(self):
+        with pytest.raises(ValueError):
+            PositionCache(max_entries=0)
+
+
+class TestPlayCached:
+    def test_hit_replays_same_move(self):
+        cache = PositionCache()
+        first, second = opening(), opening()
+        played = play_cached(first, 'smart', first.make_smart_move, cache)
+        calls = []
+        replay = play_cached(second, 'smart', lambda: calls.append(1), cache)
+        assert replay == played
+        assert calls == []
+        assert second.to_dict() == first.to_dict()
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_hit_checks_only_the_cached_square(self, cls, monkeypatch):
+        cache = PositionCache()
+        b = cls.from_dict(opening().to_dict())
+        pos, flips = next(b.iter_moves())
+        cache.put(b, 'first', pos)
+
+        def generate(self):
+            raise AssertionError("cache hit generated every move")
+
+        monkeypatch.setattr(cls, '_generate_moves', generate)
+        assert play_cached(b, 'first', lambda: None, cache) == (pos, flips)
+
+    def test_illegal_cached_square_is_a_miss(self):
+        cache = PositionCache()
+        b = opening()
+        cache.put(b, 'first', (3, 3))
+        assert cache.get(b, 'first') is None
+        cache.put(b, 'first', next(sq for sq in b.open_squares() if sq not in b.open_moves()['moves']))
+        assert cache.get(b, 'first') is None
+
+    def test_symmetric_twin_misses_by_default(self):
+        cache = PositionCache()
+        b = opening()
+        play_cached(b, 'smart', b.make_smart_move, cache)
+        twin = transformed(opening(), 4)
+        play_cached(twin, 'smart', twin.make_smart_move, cache)
+        assert cache.stats()['hits'] == 0
+        assert len(cache) == 2
+
+    def test_hit_on_symmetric_twin(self):
+        cache = PositionCache(symmetric={'smart'})
+        b = opening()
+        played, _ = play_cached(b, 'smart', b.make_smart_move, cache)
+        twin = transformed(opening(), 4)
+        pos, flips = play_cached(twin, 'smart', twin.make_smart_move, cache)
+        assert cache.stats()['hits'] == 1
+        assert pos == divmod(SQUARE_MAPS[4][played[0] * 8 + played[1]], 8)
+        assert twin.to_dict()['grid'] == transformed(b, 4).to_dict()['grid']
+
+    def test_passes_are_not_cached(self):
+        cache = PositionCache()
+        b = Board()
+        for r in range(8):
+            for c in range(8):
+                b.grid[r][c] = Square.OPEN
+        b.grid[0][0] = Square.WHITE
+        b.grid[7][7] = Square.BLACK
+        b.grid[7][6] = Square.BLACK
+        assert play_cached(b, 'smart', b.make_smart_move, cache) == (None, None)
+        assert cache.stats()['stores'] == 0
+
+
+# ---------------------------------------------------------------------------
+# Web app
+# ---------------------------------------------------------------------------
+
+class TestOpponentMoveUsesCache:
+    def test_second_game_hits_cache(self, client):
+        from game.poscache import shared_cache
+        cache = shared_cache()
+        cache.clear()
+        cache.reset_stats()
+        for _ in range(2):
+            client.post('/api/start', json={'color': 'BLACK', 'strategy': 'smart'})
+            res = client.post('/api/opponentmove')
+            assert res.status_code == 200
+        assert cache.stats()['hits'] == 1
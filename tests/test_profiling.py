@@ -0,0 +1,159 @@
+"""Tests for the opt-in profiling hooks in game/profiling.py."""
+import random
+
+import pytest
+
+from game import profiling
+from game.bitboard import BitBoard
+from game.board import Board
+from game.search import Searcher
+
+
+@pytest.fixture(autouse=True)
+def clean_counters():
+    profiling.disable()
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+# ---------------------------------------------------------------------------
+# Enabling
+# ---------------------------------------------------------------------------
+
+class TestEnable:
+    def test_disabled_leaves_methods_untouched(self):
+        original = Board.__dict__["open_moves"]
+        profiling.enable()
+        assert Board.__dict__["open_moves"] is not original
+        profiling.disable()
+        assert Board.__dict__["open_moves"] is original
+
+    def test_disabled_counts_nothing(self):
+        Board().make_smart_move()
+        assert profiling.snapshot() == {}
+
+    def test_enable_is_idempotent(self):
+        profiling.enable()
+        wrapped = Board.__dict__["make_move"]
+        profiling.enable()
+        assert Board.__dict__["make_move"] is wrapped
+
+    def test_inherited_methods_are_not_wrapped_twice(self):
+        profiling.enable()
+        assert "open_moves" not in BitBoard.__dict__
+
+    def test_profiled_restores_previous_state(self):
+        with profiling.profiled():
+            assert profiling.is_enabled()
+        assert not profiling.is_enabled()
+        profiling.enable()
+        with profiling.profiled():
+            pass
+        assert profiling.is_enabled()
+
+    @pytest.mark.parametrize('value,expected', [('', False), ('0', False), ('1', True)])
+    def test_env(self, monkeypatch, value, expected):
+        monkeypatch.setenv(profiling.PROFILE_ENV_VAR, value)
+        assert profiling.enable_from_env() is expected
+
+
+# ---------------------------------------------------------------------------
+# Counters
+# ---------------------------------------------------------------------------
+
+class TestCounters:
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_strategy_counts_nested_calls(self, cls):
+        board = cls(rng=random.Random(1))
+        with profiling.profiled():
+            board.make_smart_move()
+            board.make_random_move()
+        counters = profiling.snapshot()
+        assert counters["make_smart_move"]["calls"] == 1
+        assert counters["make_random_move"]["calls"] == 1
+        assert counters["make_move"]["calls"] == 2
+        assert counters["open_moves"]["calls"] >= 2
+        assert counters["generate_moves"]["calls"] == 2
+        assert counters["make_smart_move"]["seconds"] >= 0
+        assert "nodes" not in counters["make_move"]
+
+    def test_search_nodes(self):
+        with profiling.profiled():
+            result = Searcher(node_limit=500).search(BitBoard())
+        counters = profiling.snapshot()["search"]
+        assert counters["calls"] == 1
+        assert counters["nodes"] == result.nodes > 0
+        assert counters["nodes_per_sec"] > 0
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_search_counts_lazy_move_generation(self, cls):
+        board = cls(rng=random.Random(2))
+        for _ in range(10):
+            board.make_random_move()
+        with profiling.profiled():
+            Searcher(max_depth=3).search(board)
+        counters = profiling.snapshot()
+        assert counters["iter_moves"]["calls"] > 0
+        assert counters["flips_at"]["calls"] > 0
+        assert counters["make_move"]["calls"] > 0
+        assert counters["iter_moves"]["seconds"] > 0
+
+    def test_move_records_are_counted(self):
+        board = BitBoard()
+        with profiling.profiled():
+            moves = board.iter_move_records()
+            board.play_move(next(moves))
+            moves.close()
+        counters = profiling.snapshot()
+        assert counters["iter_move_records"]["calls"] == 1
+        assert counters["play_move"]["calls"] == 1
+
+    def test_exception_is_still_counted(self):
+        board = Board()
+        with profiling.profiled():
+            with pytest.raises(ValueError):
+                board.make_move((0, 0), [])
+        assert profiling.snapshot()["make_move"]["calls"] == 1
+
+    def test_reset_and_merge(self):
+        with profiling.profiled():
+            Board().open_moves()
+        counters = profiling.snapshot()
+        profiling.merge(counters)
+        assert profiling.snapshot()["open_moves"]["calls"] == 2
+        profiling.reset()
+        assert profiling.snapshot() == {}
+
+    def test_format_table(self):
+        with profiling.profiled():
+            Searcher(node_limit=100).search(BitBoard())
+        table = profiling.format_table(profiling.snapshot()).splitlines()
+        assert table[0] == profiling.HEADER
+        assert any(line.startswith("search \t1 \t") for line in table)
+
+
+# ---------------------------------------------------------------------------
+# Tournament and web app
+# ---------------------------------------------------------------------------
+
+class TestIntegration:
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_tournament_collects_counters(self, workers):
+        from game.tournament import run_tournament
+        run_tournament(["random"], games=4, workers=workers, chunk_size=2, profile=True)
+        assert profiling.snapshot()["make_random_move"]["calls"] > 0
+        assert not profiling.is_enabled()
+
+    def test_api_profile_disabled(self, client):
+        res = client.get('/api/profile')
+        assert res.status_code == 404
+        assert res.get_json() == {'error': 'Profiling is disabled'}
+
+    def test_api_profile(self, client):
+        profiling.enable()
+        client.post('/api/start', json={'color': 'BLACK', 'strategy': 'maxflips'})
+        client.post('/api/opponentmove')
+        data = client.get('/api/profile').get_json()
+        assert data['make_maxflips_move']['calls'] == 1
@@ -0,0 +1,121 @@
+"""Tests for the compact move and position records (game/records.py)."""
+import random
+
+import pytest
+
+from game import BitBoard, Board, BoardState, Move, Square
+
+
+def midgame(cls, plies=20, seed=3):
+    board = cls(rng=random.Random(seed))
+    for _ in range(plies):
+        board.make_random_move()
+    return board
+
+
+# ---------------------------------------------------------------------------
+# Move
+# ---------------------------------------------------------------------------
+
+class TestMove:
+    def test_from_pos_roundtrip(self):
+        move = Move.from_pos((2, 4), [(3, 4)])
+        assert move.index == 20
+        assert move.flips == 1 << 28
+        assert move.pos == (2, 4)
+        assert move.flip_list() == [(3, 4)]
+
+    def test_unpacks_like_iter_moves(self):
+        pos, flips = Move.from_pos((5, 3), [(4, 3)])
+        assert (pos, flips) == ((5, 3), [(4, 3)])
+
+    def test_equality_and_hash(self):
+        assert Move(20, 1 << 28) == Move.from_pos((2, 4), [(3, 4)])
+        assert len({Move(20, 1 << 28), Move(20, 1 << 28), Move(29, 1 << 28)}) == 2
+
+    def test_has_no_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Move(20, 1 << 28).note = 'x'
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_records_match_iter_moves(self, cls):
+        board = midgame(cls)
+        expected = [(pos, sorted(flips)) for pos, flips in board.iter_moves()]
+        assert [(m.pos, m.flip_list()) for m in board.iter_move_records()] == expected
+        order = [pos for pos, _ in expected][::-1]
+        assert [m.pos for m in board.iter_move_records(order)] == order
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_play_move_and_undo(self, cls):
+        board = midgame(cls)
+        before = board.to_bytes()
+        pos, flips = next(board.iter_moves())
+        expected = midgame(cls)
+        expected.make_move(pos, flips)
+        board.play_move(next(board.iter_move_records()))
+        assert board.to_bytes() == expected.to_bytes()
+        board.undo_move()
+        assert board.to_bytes() == before
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_play_move_without_flips_is_rejected(self, cls):
+        with pytest.raises(ValueError):
+            cls().play_move(Move(20, 0))
+
+
+# ---------------------------------------------------------------------------
+# BoardState
+# ---------------------------------------------------------------------------
+
+class TestBoardState:
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_roundtrip(self, cls):
+        board = midgame(cls)
+        board.pass_turn()
+        state = board.state()
+        assert state.current_turn == board.current_turn
+        assert state.consecutive_passes == 1
+        assert cls.from_state(state).to_bytes() == board.to_bytes()
+
+    def test_engines_agree(self):
+        assert midgame(Board).state() == midgame(BitBoard).state()
+        assert BitBoard.from_state(midgame(Board).state()).to_bytes() == midgame(Board).to_bytes()
+
+    def test_default_engine(self, monkeypatch):
+        monkeypatch.setenv('BLACKNWHITE_ENGINE', 'bitboard')
+        board = BoardState(1 << 27, 1 << 28, Square.BLACK).to_board()
+        assert isinstance(board, BitBoard)
+        assert board.current_turn == Square.BLACK
+
+    def test_hashable(self):
+        assert len({Board().state(), BitBoard().state()}) == 1
+
+
+# ---------------------------------------------------------------------------
+# Slots
+# ---------------------------------------------------------------------------
+
+class TestSlots:
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_boards_have_no_instance_dict(self, cls):
+        board = cls()
+        assert not hasattr(board, '__dict__')
+        with pytest.raises(AttributeError):
+            board.note = 'x'
+
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    @pytest.mark.parametrize('rng', [None, random.Random(4)])
+    def test_boards_copy_and_pickle(self, cls, rng):
+        import copy
+        import pickle
+        board = midgame(cls)
+        board.rng = rng
+        for clone in (copy.deepcopy(board), pickle.loads(pickle.dumps(board))):
+            assert clone.to_bytes() == board.to_bytes()
+            assert clone.open_moves() == board.open_moves()
+            clone.make_random_move()
+        assert copy.deepcopy(cls()).to_bytes() == cls().to_bytes()
+
+    def test_positions_are_shared(self):
+        a, b = Board(), BitBoard()
+        assert all(x is y for x, y in zip(a.open_squares(), b.open_squares()))
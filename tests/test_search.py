@@ -0,0 +1,105 @@
+"""Unit tests for game/search.py and Board.make_search_move."""
+import pytest
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard
+from game.search import Searcher, evaluate, DISC_SCALE
+
+
+def midgame(cls=Board, plies=12):
+    b = cls()
+    for _ in range(plies):
+        b.make_smart_move()
+    return b
+
+
+# ---------------------------------------------------------------------------
+# Searcher
+# ---------------------------------------------------------------------------
+
+class TestSearcher:
+    def test_returns_legal_move(self):
+        b = midgame()
+        moves = b.open_moves()['moves']
+        result = Searcher(node_limit=500).search(b)
+        assert result.move in moves
+        assert result.flips == moves[result.move]
+        assert result.depth >= 1
+
+    def test_board_is_left_unchanged(self):
+        b = midgame()
+        before = b.to_dict()
+        Searcher(node_limit=2000).search(b)
+        assert b.to_dict() == before
+        assert b.move_stack == midgame().move_stack
+
+    def test_node_limit_is_respected(self):
+        result = Searcher(node_limit=300).search(midgame())
+        assert result.nodes <= 300
+
+    def test_time_limit_is_respected(self):
+        result = Searcher(time_limit=0.05).search(midgame())
+        assert result.elapsed < 0.25
+
+    def test_engines_agree(self):
+        grid = Searcher(max_depth=3).search(midgame(Board))
+        bits = Searcher(max_depth=3).search(midgame(BitBoard))
+        assert (grid.move, grid.score, grid.nodes) == (bits.move, bits.score, bits.nodes)
+
+    def test_takes_available_corner(self):
+        # WHITE to move can take (0,0) by flipping the BLACK disc on (1,1)
+        b = Board()
+        b.grid[1][1] = Square.BLACK
+        b.grid[2][2] = Square.WHITE
+        result = Searcher(max_depth=2).search(b)
+        assert result.move == (0, 0)
+
+    def test_exact_near_end_of_game(self):
+        b = midgame(BitBoard, plies=56)
+        if b.game_over() or not b.open_moves()['moves']:
+            pytest.skip("position has no move to search")
+        result = Searcher().search(b)
+        assert result.score % DISC_SCALE == 0
+
+    def test_no_moves_raises(self):
+        b = Board()
+        for r in range(8):
+            for c in range(8):
+                b.grid[r][c] = Square.OPEN
+        b.grid[0][0] = Square.WHITE
+        with pytest.raises(ValueError):
+            Searcher(max_depth=1).search(b)
+
+
+class TestEvaluate:
+    def test_start_position_is_even(self):
+        assert evaluate(Board()) == 0
+
+    def test_corner_is_good_for_owner(self):
+        b = Board()
+        b.grid[0][0] = Square.WHITE
+        assert evaluate(b) > 0
+        b.pass_turn()
+        assert evaluate(b) < 0
+
+
+# ---------------------------------------------------------------------------
+# Strategy
+# ---------------------------------------------------------------------------
+
+class TestSearchStrategy:
+    def test_search_move_advances_game(self):
+        b = Board()
+        pos, flips = b.make_search_move(node_limit=200)
+        assert pos is not None
+        assert b.current_turn == Square.BLACK
+
+    def test_search_move_passes_without_moves(self):
+        b = Board()
+        for r in range(8):
+            for c in range(8):
+                b.grid[r][c] = Square.OPEN
+        b.grid[0][0] = Square.WHITE
+        b.grid[7][7] = Square.BLACK
+        assert b.make_search_move(node_limit=10) == (None, None)
+        assert b.consecutive_passes == 1
@@ -0,0 +1,171 @@
+"""Unit tests for web/store.py and the app's use of it."""
+import pytest
+
+from web import app as web_app
+from web.app import GameState
+from web.store import MemoryStore, SQLiteStore, make_store, new_session_id
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# MemoryStore
+# ---------------------------------------------------------------------------
+
+class TestMemoryStore:
+    def test_save_and_load(self):
+        store = MemoryStore()
+        state = GameState(strategy='smart', color='BLACK')
+        store.save('a', state)
+        assert store.load('a') is state
+        assert store.load('b') is None
+
+    def test_delete(self):
+        store = MemoryStore()
+        store.save('a', 1)
+        store.delete('a')
+        store.delete('missing')
+        assert store.load('a') is None
+
+    def test_evicts_least_recently_used(self):
+        store = MemoryStore(max_entries=2)
+        store.save('a', 1)
+        store.save('b', 2)
+        store.load('a')
+        store.save('c', 3)
+        assert store.load('b') is None
+        assert store.load('a') == 1
+        assert store.load('c') == 3
+        assert len(store) == 2
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        store = MemoryStore(ttl=10, clock=clock)
+        store.save('a', 1)
+        clock.now += 10
+        assert store.load('a') is None
+
+    def test_access_refreshes_ttl(self):
+        clock = FakeClock()
+        store = MemoryStore(ttl=10, clock=clock)
+        store.save('a', 1)
+        clock.now += 8
+        assert store.load('a') == 1
+        clock.now += 8
+        assert store.load('a') == 1
+
+    def test_save_prunes_expired_entries(self):
+        clock = FakeClock()
+        store = MemoryStore(ttl=10, clock=clock)
+        store.save('a', 1)
+        store.save('b', 2)
+        clock.now += 11
+        store.save('c', 3)
+        assert len(store) == 1
+
+    def test_rejects_non_positive_size(self):
+        with pytest.raises(ValueError):
+            MemoryStore(max_entries=0)
+
+
+# ---------------------------------------------------------------------------
+# SQLiteStore
+# ---------------------------------------------------------------------------
+
+class TestSQLiteStore:
+    def _store(self, **kwargs):
+        return SQLiteStore(':memory:', GameState.to_json, GameState.from_json, **kwargs)
+
+    def test_round_trip(self):
+        store = self._store()
+        state = GameState(strategy='maxflips', color='WHITE', seed=5)
+        state.board.make_smart_move()
+        store.save('a', state)
+        loaded = store.load('a')
+        assert loaded is not state
+        assert loaded.to_json() == state.to_json()
+
+    def test_delete(self):
+        store = self._store()
+        store.save('a', GameState())
+        store.delete('a')
+        assert store.load('a') is None
+
+    def test_expiry_and_purge(self):
+        clock = FakeClock()
+        store = self._store(ttl=10, clock=clock)
+        store.save('a', GameState())
+        clock.now += 10
+        assert store.load('a') is None
+        assert store.purge() == 1
+
+    def test_save_purges_expired_games(self):
+        clock = FakeClock()
+        store = self._store(ttl=10, clock=clock, purge_interval=30)
+        store.save('old', GameState())
+        clock.now += 25
+        store.save('new', GameState())
+        assert store._db.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 2
+        clock.now += 5
+        store.save('newer', GameState())
+        assert [row[0] for row in store._db.execute("SELECT sid FROM games ORDER BY sid")] == ['new', 'newer']
+
+    def test_file_is_shared_between_stores(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'games.db'}"
+        first = make_store(url, GameState.to_json, GameState.from_json)
+        second = make_store(url, GameState.to_json, GameState.from_json)
+        first.save('a', GameState(strategy='smart'))
+        assert second.load('a').strategy == 'smart'
+
+
+class TestMakeStore:
+    def test_memory(self):
+        assert isinstance(make_store('memory://'), MemoryStore)
+
+    def test_sqlite_needs_codec(self):
+        with pytest.raises(ValueError):
+            make_store('sqlite:///:memory:')
+
+    @pytest.mark.parametrize('url', ['sqlite://games.db', 'sqlite:games.db'])
+    def test_sqlite_url_needs_three_slashes(self, url):
+        with pytest.raises(ValueError, match='sqlite:///'):
+            make_store(url, GameState.to_json, GameState.from_json)
+
+    def test_unknown_scheme(self):
+        with pytest.raises(ValueError):
+            make_store('redis://localhost')
+
+    def test_session_ids_are_unique(self):
+        assert new_session_id() != new_session_id()
+
+
+# ---------------------------------------------------------------------------
+# Web app
+# ---------------------------------------------------------------------------
+
+class TestAppSession:
+    def test_cookie_holds_only_the_id(self, client):
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'random'})
+        cookie = client.get_cookie('session')
+        assert cookie is not None
+        assert len(cookie.value) < 100
+        assert 'grid' not in cookie.value
+
+    def test_expired_game_is_gone(self, client):
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'random'})
+        with client.session_transaction() as sess:
+            web_app.store.delete(sess[web_app.SESSION_KEY])
+        assert client.post('/api/pass').status_code == 400
+
+    def test_reset_deletes_stored_game(self, client):
+        client.post('/api/start', json={'color': 'WHITE', 'strategy': 'random'})
+        with client.session_transaction() as sess:
+            sid = sess[web_app.SESSION_KEY]
+        client.post('/api/reset')
+        assert web_app.store.load(sid) is None
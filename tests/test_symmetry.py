@@ -0,0 +1,105 @@
+"""Unit tests for game/symmetry.py."""
+import random
+
+import pytest
+
+from game.bitboard import BitBoard
+from game.board import Board
+from game.symmetry import (INVERSES, INVERSE_MAPS, SQUARE_MAPS, SYMMETRIES, canonical, canonical_masks,
+                           map_square, transform, transform_board, transforms, unmap_square)
+
+# The symmetries by their definition on (row, col), in symmetry order.
+REFERENCE = (
+    lambda r, c: (r, c),
+    lambda r, c: (r, 7 - c),
+    lambda r, c: (7 - r, c),
+    lambda r, c: (7 - r, 7 - c),
+    lambda r, c: (c, r),
+    lambda r, c: (c, 7 - r),
+    lambda r, c: (7 - c, r),
+    lambda r, c: (7 - c, 7 - r),
+)
+
+
+def reference_transform(mask, symmetry):
+    result = 0
+    for index in range(64):
+        if mask >> index & 1:
+            r, c = REFERENCE[symmetry](index // 8, index % 8)
+            result |= 1 << (r * 8 + c)
+    return result
+
+
+def midgame(cls, plies=12, seed=7):
+    board = cls(rng=random.Random(seed))
+    for _ in range(plies):
+        board.make_random_move()
+    return board
+
+
+# ---------------------------------------------------------------------------
+# Transforms
+# ---------------------------------------------------------------------------
+
+class TestTransforms:
+    @pytest.mark.parametrize('symmetry', range(SYMMETRIES))
+    def test_matches_definition(self, symmetry):
+        rng = random.Random(symmetry)
+        for mask in [0, 1, 1 << 63, 0xFFFFFFFFFFFFFFFF] + [rng.getrandbits(64) for _ in range(200)]:
+            assert transform(mask, symmetry) == reference_transform(mask, symmetry)
+
+    def test_transforms_lists_every_symmetry(self):
+        mask = random.Random(1).getrandbits(64)
+        assert transforms(mask) == tuple(transform(mask, s) for s in range(SYMMETRIES))
+
+    @pytest.mark.parametrize('symmetry', range(SYMMETRIES))
+    def test_inverses(self, symmetry):
+        mask = random.Random(2).getrandbits(64)
+        assert transform(transform(mask, symmetry), INVERSES[symmetry]) == mask
+
+    def test_square_maps_are_permutations(self):
+        for table, inverse in zip(SQUARE_MAPS, INVERSE_MAPS):
+            assert sorted(table) == list(range(64))
+            assert [inverse[table[i]] for i in range(64)] == list(range(64))
+
+    @pytest.mark.parametrize('symmetry', range(SYMMETRIES))
+    def test_map_and_unmap_square(self, symmetry):
+        for r in range(8):
+            for c in range(8):
+                assert map_square((r, c), symmetry) == REFERENCE[symmetry](r, c)
+                assert unmap_square(map_square((r, c), symmetry), symmetry) == (r, c)
+
+
+# ---------------------------------------------------------------------------
+# Boards and canonical form
+# ---------------------------------------------------------------------------
+
+class TestCanonical:
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_symmetric_positions_share_key(self, cls):
+        board = midgame(cls)
+        keys = {canonical(transform_board(board, s))[0] for s in range(SYMMETRIES)}
+        assert len(keys) == 1
+
+    def test_symmetry_takes_board_to_canonical_frame(self):
+        board = midgame(BitBoard)
+        (black, white, turn), symmetry = canonical(board)
+        assert transform_board(board, symmetry).masks() == (black, white)
+        assert turn == board.current_turn.value
+
+    def test_canonical_is_smallest_image(self):
+        black, white = midgame(BitBoard).masks()
+        best, symmetry = canonical_masks(black, white)
+        assert best == min(zip(transforms(black), transforms(white)))
+        assert best == (transform(black, symmetry), transform(white, symmetry))
+
+    def test_engines_agree(self):
+        assert canonical(midgame(Board)) == canonical(midgame(BitBoard))
+
+    @pytest.mark.parametrize('symmetry', range(SYMMETRIES))
+    def test_legal_moves_map_with_the_board(self, symmetry):
+        board = midgame(Board)
+        image = transform_board(board, symmetry)
+        assert image.current_turn == board.current_turn
+        expected = {map_square(pos, symmetry) for pos in board.open_moves()['moves']}
+        assert set(image.open_moves()['moves']) == expected
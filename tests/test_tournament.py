@@ -0,0 +1,55 @@
+"""Unit tests for game/tournament.py."""
+from game.tournament import (
+    make_chunks, play_chunk, play_game, run_tournament, format_row, strategy_method,
+)
+
+
+class TestHelpers:
+    def test_strategy_method(self):
+        assert strategy_method('smart') == 'make_smart_move'
+        assert strategy_method('make_random_move') == 'make_random_move'
+
+    def test_chunks_cover_every_game(self):
+        tasks = make_chunks([('smart', 'random')], 10, 4)
+        assert tasks == [('smart', 'random', 0, 4), ('smart', 'random', 4, 4), ('smart', 'random', 8, 2)]
+
+    def test_play_game_is_deterministic(self):
+        assert play_game('random', 'maxflips', 3, seed=9) == play_game('random', 'maxflips', 3, seed=9)
+
+    def test_search_games_are_reproducible(self):
+        first = play_game('search', 'random', 0, seed=2)
+        play_game('random', 'search', 1, seed=2)
+        assert play_game('search', 'random', 0, seed=2) == first
+
+    def test_short_and_long_names_play_the_same_game(self):
+        assert play_game('random', 'random', 1) == play_game('make_random_move', 'make_random_move', 1)
+
+    def test_chunk_totals_add_up(self):
+        totals = play_chunk('random', 'random', 0, 6)
+        assert totals['games'] == 6
+        assert totals['white_wins'] + totals['black_wins'] + totals['ties'] == 6
+
+    def test_format_row(self):
+        totals = {'games': 2, 'white_wins': 1, 'black_wins': 1, 'ties': 0,
+                  'white_discs': 64, 'black_discs': 64}
+        row = format_row('smart', 'random', totals)
+        assert row.startswith('make_smart_move \tmake_random_move \t2')
+        assert row.endswith('32.00 \t32.00')
+
+
+class TestRunTournament:
+    def test_results_independent_of_workers_and_chunks(self):
+        serial = run_tournament(['random', 'maxflips'], games=6, workers=1, chunk_size=6, seed=4)
+        pooled = run_tournament(['random', 'maxflips'], games=6, workers=2, chunk_size=2, seed=4)
+        assert serial == pooled
+
+    def test_progress_is_streamed_per_chunk(self):
+        seen = []
+        run_tournament(['random'], games=4, workers=1, chunk_size=2,
+                       progress=lambda w, b, totals: seen.append(totals['games']))
+        assert seen == [2, 4]
+
+    def test_every_pairing_reported(self):
+        results = run_tournament(['random', 'smart'], games=2, workers=1)
+        assert list(results) == [('random', 'random'), ('random', 'smart'),
+                                 ('smart', 'random'), ('smart', 'smart')]
@@ -0,0 +1,162 @@
+"""Unit tests for game/zobrist.py and game/transposition.py."""
+import pytest
+from game.square import Square
+from game.board import Board
+from game.bitboard import BitBoard
+from game.search import Searcher
+from game.transposition import TranspositionTable, EXACT, LOWER, UPPER, SLOT_BYTES
+
+
+# ---------------------------------------------------------------------------
+# Zobrist keys
+# ---------------------------------------------------------------------------
+
+class TestZobrist:
+    @pytest.mark.parametrize('cls', [Board, BitBoard])
+    def test_incremental_key_matches_fresh_board(self, cls):
+        b = cls()
+        keys = [b.zobrist_key]
+        while not b.game_over():
+            b.make_maxflips_move()
+            assert b.zobrist_key == cls.from_dict(b.to_dict()).zobrist_key
+            keys.append(b.zobrist_key)
+        while b.move_stack:
+            keys.pop()
+            b.undo_move()
+            assert b.zobrist_key == keys[-1]
+
+    def test_engines_agree(self):
+        grid, bits = Board(), BitBoard()
+        for _ in range(10):
+            pos, flips = grid.make_smart_move()
+            bits.make_move(pos, flips)
+            assert grid.zobrist_key == bits.zobrist_key
+
+    def test_side_to_move_changes_key(self):
+        b = Board()
+        before = b.zobrist_key
+        b.pass_turn()
+        assert b.zobrist_key != before
+        b.undo_move()
+        assert b.zobrist_key == before
+
+    def test_direct_grid_write_updates_key(self):
+        b = Board()
+        before = b.zobrist_key
+        b.grid[0][0] = Square.BLACK
+        assert b.zobrist_key != before
+        b.grid[0][0] = Square.OPEN
+        assert b.zobrist_key == before
+
+    def test_transposed_move_orders_share_key(self):
+        a, b = Board(), BitBoard()
+        for pos in [(2, 4), (2, 5), (3, 5), (2, 3)]:
+            a.make_move(pos, a.open_moves()['moves'][pos])
+        for pos in [(3, 5), (2, 5), (2, 4), (2, 3)]:
+            b.make_move(pos, b.open_moves()['moves'][pos])
+        assert a.to_dict() == b.to_dict()
+        assert a.zobrist_key == b.zobrist_key
+
+
+# ---------------------------------------------------------------------------
+# TranspositionTable
+# ---------------------------------------------------------------------------
+
+class TestTranspositionTable:
+    def test_size_is_bounded(self):
+        tt = TranspositionTable(size_mb=1)
+        assert tt.size * SLOT_BYTES <= 1024 * 1024
+        assert tt.size & (tt.size - 1) == 0
+
+    def test_rejects_non_positive_size(self):
+        with pytest.raises(ValueError):
+            TranspositionTable(size_mb=0)
+
+    def test_store_and_probe(self):
+        tt = TranspositionTable(size_mb=1)
+        tt.store(12345, 4, EXACT, -730, 19)
+        assert tt.probe(12345) == (4, EXACT, -730, 19)
+        assert tt.probe(54321) is None
+
+    def test_store_without_move(self):
+        tt = TranspositionTable(size_mb=1)
+        tt.store(7, 2, UPPER, 15)
+        assert tt.probe(7) == (2, UPPER, 15, None)
+
+    def test_shallower_entry_does_not_replace_deeper_one(self):
+        tt = TranspositionTable(size_mb=1)
+        other = 5 + tt.size  # same slot, different key
+        tt.store(5, 6, EXACT, 1, 0)
+        tt.store(other, 2, LOWER, 2, 1)
+        assert tt.probe(5) == (6, EXACT, 1, 0)
+        assert tt.probe(other) is None
+
+    def test_stale_entry_is_replaced(self):
+        tt = TranspositionTable(size_mb=1)
+        other = 5 + tt.size
+        tt.store(5, 6, EXACT, 1, 0)
+        tt.new_search()
+        tt.store(other, 2, LOWER, 2, 1)
+        assert tt.probe(other) == (2, LOWER, 2, 1)
+        assert tt.stats()['replacements'] == 1
+
+    def test_stats_report_hit_rate(self):
+        tt = TranspositionTable(size_mb=1)
+        tt.store(1, 1, EXACT, 0)
+        tt.probe(1)
+        tt.probe(2)
+        stats = tt.stats()
+        assert stats['probes'] == 2
+        assert stats['hits'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_torn_entry_reads_as_miss(self):
+        tt = TranspositionTable(size_mb=1)
+        other = 5 + tt.size
+        tt.store(other, 2, LOWER, 2, 1)
+        other_data = tt._data[other & (tt.size - 1)]
+        tt.store(5, 6, EXACT, 1, 0)
+        # Another thread's write lands in the data word only.
+        tt._data[5] = other_data
+        assert tt.probe(5) is None
+        assert tt.probe(other) is None
+
+    def test_concurrent_searches_agree_with_private_table(self):
+        import threading
+        position = TestSearchWithTable()._position
+        expected = Searcher(max_depth=4, tt=TranspositionTable(size_mb=1)).search(position())
+        shared = TranspositionTable(size_mb=1)
+        results = []
+
+        def search():
+            for _ in range(3):
+                results.append(Searcher(max_depth=4, tt=shared).search(position()))
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert {r.score for r in results} == {expected.score}
+
+    def test_clear(self):
+        tt = TranspositionTable(size_mb=1)
+        tt.store(1, 1, EXACT, 0)
+        tt.clear()
+        assert tt.probe(1) is None
+
+
+class TestSearchWithTable:
+    def _position(self):
+        b = BitBoard()
+        for _ in range(14):
+            b.make_smart_move()
+        return b
+
+    def test_same_move_fewer_nodes(self):
+        plain = Searcher(max_depth=4).search(self._position())
+        tt = TranspositionTable(size_mb=1)
+        cached = Searcher(max_depth=4, tt=tt).search(self._position())
+        assert cached.score == plain.score
+        assert cached.nodes <= plain.nodes
+        assert tt.stats()['hits'] > 0
@@ -36,9 +36,9 @@ def test_board_has_64_squares(page, live_server_url):
     assert page.locator('.square').count() == 64
 
 
-def test_strategy_dropdown_has_three_options(page, live_server_url):
+def test_strategy_dropdown_has_four_options(page, live_server_url):
     page.goto(live_server_url)
-    assert page.locator('#strategySelect option').count() == 3
+    assert page.locator('#strategySelect option').count() == 4
 
 
 def test_initial_pieces_rendered(page, live_server_url):
@@ -1,8 +1,14 @@
-from flask import Flask, render_template, request, jsonify, session, Response
-from game.board import Board
-from game.square import Square
-import os
+from flask import Flask, render_template, request, jsonify, session, Response, g
+from web.core import (ApiError, GameState, SESSION_KEY, ai_to_move, check_opponent_turn, new_game,
+                      opponent_move, player_move, player_pass, profile_counters, require_state,
+                      session_locks, store, wants_compact)
+from web.jobs import DONE, JobManager
+from web.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, ApiMetrics
+from web import ponder
+from web.store import new_session_id
 import json
+import os
+import time
 
 
 app = Flask(__name__)
@@ -10,71 +16,24 @@ app.secret_key = os.environ.get("SECRET_KEY") or os.urandom(24)
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 
+# Request, AI and error metrics served at /metrics; see web.metrics.
+metrics = ApiMetrics()
 
-class GameState:
-    """Holds all per-session game data: the board, the player's color, and the AI strategy.
+# Replies precomputed while the human thinks; see web.ponder.
+ponderer = ponder.from_env()
 
-    Instances are serialised to JSON for storage in the Flask session cookie and
-    deserialised on each request via :meth:`from_json`.
-    """
 
-    def __init__(self, strategy=None, color=None):
-        """Create a fresh game with a new board.
-
-        Args:
-            strategy: AI strategy for the opponent — ``'random'``, ``'maxflips'``,
-                ``'smart'``, or ``'first'`` (default).
-            color: The human player's color as an uppercase string — ``'BLACK'`` or
-                ``'WHITE'``.
-        """
-        self.board = Board()
-        self.strategy = strategy
-        self.color = color
-
-    def to_json(self):
-        """Serialise the game state to a JSON string suitable for session storage.
-
-        The board is embedded as a plain dict (not a nested JSON string) so the
-        client can read all fields without a second ``JSON.parse`` call.
-        Includes ``valid_moves`` (list of ``[row, col]`` pairs) when it is the
-        human player's turn, so the client can highlight legal squares.
-        """
-        valid_moves = []
-        if (
-            self.color
-            and not self.board.game_over()
-            and self.board.current_turn.name == self.color
-        ):
-            try:
-                moves = self.board.open_moves().get("moves", {})
-                valid_moves = [list(pos) for pos in moves.keys()]
-            except Exception:
-                pass
-        return json.dumps(
-            {
-                "board": self.board.to_dict(),
-                "strategy": self.strategy,
-                "color": self.color,
-                "valid_moves": valid_moves,
-            }
-        )
-
-    @staticmethod
-    def from_json(json_str):
-        """Deserialise a JSON string produced by :meth:`to_json` back into a GameState.
-
-        Args:
-            json_str: The JSON string from the session cookie.
-
-        Returns:
-            A fully reconstructed :class:`GameState` instance.
-        """
-        data = json.loads(json_str)
-        state = GameState()
-        state.board = Board.from_dict(data["board"])
-        state.strategy = data["strategy"]
-        state.color = data["color"]
-        return state
+def observe_job(job):
+    """Record a finished background job's time as AI think time."""
+    if job.status == DONE:
+        metrics.observe_think(job.strategy, job.seconds)
+
+
+# Background AI moves for /api/jobs; see web.jobs.
+jobs = JobManager(store, ponderer=ponderer, on_done=observe_job, locks=session_locks)
+
+# Seconds between keep-alive comments on a job's event stream.
+SSE_KEEPALIVE = 15
 
 
 @app.route("/")
@@ -83,7 +42,62 @@ def index():
     return render_template("index.html")
 
 
-SESSION_KEY = "game_state"
+def load_state():
+    """Return the session's stored :class:`GameState`, or None if there is none."""
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        return None
+    return store.load(sid)
+
+
+def game_lock():
+    """Return the lock to hold while changing the session's game."""
+    return session_locks.get(session.get(SESSION_KEY))
+
+
+def state_response(state, extra=None):
+    """Return ``state`` as a JSON response in the format the client negotiated."""
+    compact = wants_compact(request.args.get("format"), request.headers.get("Accept"))
+    response = Response(state.to_json(compact=compact, extra=extra), mimetype="application/json")
+    response.vary.add("Accept")
+    return response
+
+
+def save_state(state):
+    """Store ``state`` under the session's id, allocating one if needed."""
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        sid = session[SESSION_KEY] = new_session_id()
+    store.save(sid, state)
+
+
+def endpoint_label():
+    """Return the route rule of the current request, for metric labels."""
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    """Record the request's latency, status and payload size in :data:`metrics`."""
+    started = g.pop("request_started", None)
+    if started is not None:
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.observe_request(endpoint_label(), request.method, response.status_code,
+                                time.perf_counter() - started, size)
+    return response
+
+
+@app.errorhandler(ApiError)
+def api_error(error):
+    """Return a rejected request as ``{"error": message}``."""
+    metrics.count_error(endpoint_label(), error.message)
+    return jsonify({"error": error.message}), error.status
+
 
 """ API Endpoints """
 
@@ -94,18 +108,21 @@ def api_board():
 
     If no session exists, returns a default (unstarted) board.
     """
-    if not session.get(SESSION_KEY):
-        state = GameState()
-    else:
-        state = GameState.from_json(session[SESSION_KEY])
+    with game_lock():
+        state = load_state()
+        if state is None:
+            state = GameState()
 
-    return Response(state.to_json(), mimetype='application/json')
+        return state_response(state)
 
 
 @app.route("/api/reset", methods=["POST"])
 def api_reset():
     """Clear the session and return a fresh default board."""
-    session.pop(SESSION_KEY, None)
+    sid = session.pop(SESSION_KEY, None)
+    if sid:
+        with session_locks.get(sid):
+            store.delete(sid)
 
     return api_board()
 
@@ -116,23 +133,15 @@ def api_start():
 
     Request body (JSON):
         color    -- ``'BLACK'`` or ``'WHITE'`` (default ``'BLACK'``)
-        strategy -- ``'random'``, ``'maxflips'``, ``'smart'``, or ``'first'`` (default)
+        seed     -- optional integer seed for the AI's random choices
+        strategy -- ``'random'``, ``'maxflips'``, ``'smart'``, ``'search'``, or
+                    ``'first'`` (default)
     """
-    data = request.json or {}
-    strategy = data.get("strategy", "first")
-    color = data.get("color", "BLACK").upper()
-
-    allowed_strategies = {"first", "random", "maxflips", "smart"}
-    allowed_colors = {"BLACK", "WHITE"}
-
-    if strategy not in allowed_strategies:
-        strategy = "first"
-    if color not in allowed_colors:
-        color = "BLACK"
-
-    state = GameState(strategy=strategy, color=color)
-    session[SESSION_KEY] = state.to_json()
-    return Response(state.to_json(), mimetype='application/json')
+    state = new_game(request.json or {})
+    with game_lock():
+        save_state(state)
+    ponderer.start(session[SESSION_KEY], state)
+    return state_response(state)
 
 
 @app.route("/api/pass", methods=["POST"])
@@ -141,18 +150,11 @@ def api_pass():
 
     Returns 400 if there is no active game or it is not the player's turn.
     """
-    if not session.get(SESSION_KEY):
-        # if no game state, throw error
-        return jsonify({"error": "No game in progress"}), 400
-    else:
-        state = GameState.from_json(session[SESSION_KEY])
-
-    if state.color != state.board.current_turn.name:
-        return jsonify({"error": "Not your turn"}), 400
-
-    state.board.pass_turn()
-    session[SESSION_KEY] = state.to_json()
-    return Response(state.to_json(), mimetype='application/json')
+    with game_lock():
+        state = load_state()
+        player_pass(state)
+        save_state(state)
+    return state_response(state)
 
 
 @app.route("/api/move", methods=["POST"])
@@ -160,81 +162,102 @@ def api_move():
     """Apply the player's move at the given board position.
 
     Request body (JSON):
-        row -- zero-based row index
-        col -- zero-based column index
+        row   -- zero-based row index
+        col   -- zero-based column index
+        think -- optional; when true and the AI is to move next, start its
+                 move as a background job and return its id as ``job``
 
     Returns 400 if there is no active game, it is not the player's turn,
     the game is already over, or the chosen square is not a legal move.
+
+    The response always shows the position right after the player's move:
+    it is built under the session's lock, which the job needs to play.
     """
     data = request.json or {}
-    if not session.get(SESSION_KEY):
-        # if no game state, throw error
-        return jsonify({"error": "No game in progress"}), 400
-    else:
-        state = GameState.from_json(session[SESSION_KEY])
-
-    if state.color != state.board.current_turn.name:
-        return jsonify({"error": "Not your turn"}), 400
-
-    row = data.get("row")
-    col = data.get("col")
-    if not isinstance(row, int) or not isinstance(col, int):
-        return jsonify({"error": "Missing row or col"}), 400
-    if not (0 <= row < 8 and 0 <= col < 8):
-        return jsonify({"error": "Row and col must be between 0 and 7"}), 400
-
-    if state.board.game_over():
-        return jsonify({"error": "Game is over"}), 400
-    moves = state.board.open_moves()["moves"]
-    pos = (row, col)
-    if pos not in moves:
-        return jsonify({"error": "Invalid move"}), 400
-    try:
-        state.board.make_move(pos, moves[pos])
-    except ValueError:
-        app.logger.exception("Failed to apply player move")
-        return jsonify({"error": "Invalid move"}), 400
-
-    session[SESSION_KEY] = state.to_json()
-    return Response(state.to_json(), mimetype='application/json')
+    with game_lock():
+        state = load_state()
+        player_move(state, data)
+        save_state(state)
+        extra = None
+        if data.get("think") is True and ai_to_move(state):
+            extra = {"job": jobs.submit(session[SESSION_KEY], state).id}
+        return state_response(state, extra)
 
 
 @app.route("/api/opponentmove", methods=["POST"])
 def api_opponent_move():
     """Make one move for the AI opponent using the session's chosen strategy.
 
-    Includes a random delay of up to 2 seconds to simulate thinking time.
+    Answers from the pondered replies when the player's move was pondered.
+
+    Returns 400 if there is no active game, it is the player's turn, or
+    the game is already over.
+    """
+    with game_lock():
+        state = load_state()
+        check_opponent_turn(state)
+        sid = session[SESSION_KEY]
+        started = time.perf_counter()
+        if not ponderer.play(sid, state):
+            opponent_move(state)
+        metrics.observe_think(state.strategy, time.perf_counter() - started)
+        save_state(state)
+        ponderer.start(sid, state)
+    return state_response(state)
+
+
+@app.route("/api/jobs", methods=["POST"])
+def api_job_start():
+    """Start the AI's move as a background job and return ``{"job", "status", "move"}``.
+
     Returns 400 if there is no active game, it is the player's turn, or
     the game is already over.
     """
-    if not session.get(SESSION_KEY):
-        # if no game state, throw error
-        return jsonify({"error": "No game in progress"}), 400
-    else:
-        state = GameState.from_json(session[SESSION_KEY])
-
-    if state.color == state.board.current_turn.name:
-        return jsonify({"error": "Not opponent's turn"}), 400
-
-    if state.board.game_over():
-        return jsonify({"error": "Game is over"}), 400
-
-    if state.strategy == "random":
-        state.board.make_random_move()
-    elif state.strategy == "maxflips":
-        state.board.make_maxflips_move()
-    elif state.strategy == "smart":
-        state.board.make_smart_move()
-    else:  # 'first' or default
-        moves = state.board.open_moves()["moves"]
-        if moves:
-            pos, flips = next(iter(moves.items()))
-            state.board.make_move(pos, flips)
-        else:
-            state.board.pass_turn()
-
-    session[SESSION_KEY] = state.to_json()
-    return Response(state.to_json(), mimetype='application/json')
+    state = require_state(load_state())
+    job = jobs.submit(session[SESSION_KEY], state)
+    return jsonify(job.to_dict()), 202
+
+
+def find_job(job_id):
+    """Return the session's job ``job_id`` or raise a 404 :class:`ApiError`."""
+    job = jobs.get(job_id, session.get(SESSION_KEY))
+    if job is None:
+        raise ApiError("Unknown job", status=404)
+    return job
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job(job_id):
+    """Return a job's status; ``move`` is the AI's ``[row, col]`` once done."""
+    return jsonify(find_job(job_id).to_dict())
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def api_job_events(job_id):
+    """Stream a single Server-Sent Event named after the job's final status."""
+    job = find_job(job_id)
+
+    def stream():
+        while not job.wait(SSE_KEEPALIVE):
+            yield ": keep-alive\n\n"
+        yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/profile", methods=["GET"])
+def api_profile():
+    """Return this process's :mod:`game.profiling` counters.
+
+    Returns 404 unless the server runs with ``BLACKNWHITE_PROFILE=1``.
+    """
+    return jsonify(profile_counters())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Return the API metrics in the Prometheus text exposition format."""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,343 @@
+"""ASGI serving mode for the web API.
+
+Serves the same page and ``/api/*`` routes as :mod:`web.app`, with the
+same JSON contract, on Starlette.  Route logic comes from
+:mod:`web.core`; only the request and session plumbing differs.
+
+Strategies in :data:`POOL_STRATEGIES` think in a bounded
+:class:`~concurrent.futures.ProcessPoolExecutor`
+(``BLACKNWHITE_AI_WORKERS`` processes, default one per CPU), so a long
+search neither blocks the event loop nor other requests, and throughput
+scales with cores.  At most :data:`QUEUE_PER_WORKER` jobs per worker
+wait for a free process; further requests, background jobs and
+pondering all wait their turn before submitting.  Cheap strategies run
+inline, where a process round trip would cost more than the move.
+
+Background AI jobs (:mod:`web.jobs`) and pondering (:mod:`web.ponder`)
+run in the same pool, and ``/api/jobs/<id>/events`` waits for jobs
+without tying up a thread.
+
+Run with::
+
+    uvicorn web.asgi:app
+"""
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+from game.poscache import shared_cache
+from web.core import (ApiError, CACHED_STRATEGIES, GameState, SESSION_KEY, ai_to_move, apply_reply,
+                      check_opponent_turn, choose_reply, new_game, opponent_move, player_move,
+                      player_pass, profile_counters, require_state, session_locks, store, wants_compact)
+from web.jobs import JobManager
+from web import ponder
+from web.store import new_session_id
+
+AI_WORKERS_ENV_VAR = "BLACKNWHITE_AI_WORKERS"
+
+# Strategies worth a trip to the process pool.
+POOL_STRATEGIES = {"search"}
+
+# Jobs allowed to queue per worker process before new ones wait.
+QUEUE_PER_WORKER = 4
+
+# Seconds between checks, and between keep-alive comments, on a job's event stream.
+SSE_POLL_INTERVAL = 0.02
+SSE_KEEPALIVE = 15
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+templates = Jinja2Templates(directory=os.path.join(_HERE, "templates"))
+
+
+class AiPool:
+    """A lazily started process pool with a bounded number of pending jobs.
+
+    Every submission, from a request, a background job or pondering,
+    takes one of the pool's slots until it finishes.
+    """
+
+    def __init__(self, workers=None, queue_per_worker=QUEUE_PER_WORKER):
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self.workers * (1 + queue_per_worker))
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, fn, *args):
+        """Submit ``fn(*args)`` to a worker and return its concurrent Future.
+
+        Blocks while every slot is taken, so never call it on the event loop.
+        """
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` in a worker process and return its result."""
+        future = await asyncio.to_thread(self.submit, fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+ai_pool = AiPool(int(os.environ.get(AI_WORKERS_ENV_VAR, 0)) or None)
+
+
+def pool_reply(packed, strategy, move_seed):
+    """Run :func:`web.core.choose_reply` in :data:`ai_pool` and wait for it."""
+    return ai_pool.submit(choose_reply, packed, strategy, move_seed).result()
+
+
+ponderer = ponder.from_env(compute=pool_reply)
+jobs = JobManager(store, executor=ai_pool, ponderer=ponderer, locks=session_locks)
+
+
+def load_state(request):
+    """Return the session's stored :class:`GameState`, or None if there is none."""
+    sid = request.session.get(SESSION_KEY)
+    if not sid:
+        return None
+    return store.load(sid)
+
+
+def save_state(request, state):
+    """Store ``state`` under the session's id, allocating one if needed."""
+    sid = request.session.get(SESSION_KEY)
+    if not sid:
+        sid = request.session[SESSION_KEY] = new_session_id()
+    store.save(sid, state)
+
+
+def game_lock(request):
+    """Return the lock to hold while changing the session's game.
+
+    Hold it only around code that does not await: it is a thread lock,
+    shared with background jobs.
+    """
+    return session_locks.get(request.session.get(SESSION_KEY))
+
+
+def state_response(request, state, extra=None):
+    """Return ``state`` as a JSON response in the format the client negotiated."""
+    compact = wants_compact(request.query_params.get("format"), request.headers.get("accept"))
+    return Response(state.to_json(compact=compact, extra=extra), media_type="application/json",
+                    headers={"Vary": "Accept"})
+
+
+async def request_json(request):
+    """Return the JSON object body of ``request``, or ``{}``."""
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def api_error(request, error):
+    """Return a rejected request as ``{"error": message}``."""
+    return JSONResponse({"error": error.message}, status_code=error.status)
+
+
+async def index(request):
+    """Serve the main game page."""
+    return templates.TemplateResponse(request, "index.html")
+
+
+async def api_board(request):
+    """Return the current game state, or a default board without a session."""
+    with game_lock(request):
+        state = load_state(request)
+        if state is None:
+            state = GameState()
+        return state_response(request, state)
+
+
+async def api_reset(request):
+    """Clear the session and return a fresh default board."""
+    sid = request.session.pop(SESSION_KEY, None)
+    if sid:
+        with session_locks.get(sid):
+            store.delete(sid)
+    return await api_board(request)
+
+
+async def api_start(request):
+    """Start a new game; see :func:`web.core.new_game` for the body."""
+    state = new_game(await request_json(request))
+    with game_lock(request):
+        save_state(request, state)
+    ponderer.start(request.session[SESSION_KEY], state)
+    return state_response(request, state)
+
+
+async def api_pass(request):
+    """Pass the current player's turn."""
+    with game_lock(request):
+        state = load_state(request)
+        player_pass(state)
+        save_state(request, state)
+    return state_response(request, state)
+
+
+async def api_move(request):
+    """Apply the player's ``{"row", "col"}`` move, starting the AI's job if ``think``.
+
+    The job is submitted, and the response built, from a snapshot taken
+    under the session's lock, so the response shows the position right
+    after the player's move even if the job has already played.
+    """
+    data = await request_json(request)
+    with game_lock(request):
+        state = load_state(request)
+        player_move(state, data)
+        save_state(request, state)
+        state = state.snapshot()
+    extra = None
+    if data.get("think") is True and ai_to_move(state):
+        job = await submit_job(request, state)
+        extra = {"job": job.id}
+    return state_response(request, state, extra)
+
+
+async def api_opponent_move(request):
+    """Make one move for the AI opponent using the session's chosen strategy.
+
+    Pondered replies are used first.  Strategies in :data:`POOL_STRATEGIES`
+    think in :data:`ai_pool`.  If the game changes while they do (a
+    concurrent request for the same session), the reply is dropped and
+    ``409`` returned.
+    """
+    state = load_state(request)
+    check_opponent_turn(state)
+    sid = request.session[SESSION_KEY]
+    packed = state.board.to_bytes()
+    cache = shared_cache() if state.strategy in CACHED_STRATEGIES else None
+    computed = False
+    reply = await asyncio.to_thread(ponderer.take, sid, state)
+    if reply is ponder.MISSING and state.strategy in POOL_STRATEGIES:
+        reply = cache.get(state.board, state.strategy) if cache is not None else None
+        if reply is None:
+            reply = await ai_pool.run(choose_reply, packed, state.strategy, state.move_seed())
+            computed = True
+    with game_lock(request):
+        state = load_state(request)
+        if state is None or state.board.to_bytes() != packed:
+            raise ApiError("Game changed while the AI was thinking", status=409)
+        if reply is ponder.MISSING:
+            opponent_move(state)
+        else:
+            if computed and cache is not None and reply is not None:
+                cache.put(state.board, state.strategy, reply)
+            apply_reply(state, reply)
+        save_state(request, state)
+    ponderer.start(sid, state)
+    return state_response(request, state)
+
+
+async def submit_job(request, state):
+    """Submit the AI's move for ``state`` to :data:`jobs` off the event loop.
+
+    :meth:`JobManager.submit` may wait for a pondered reply that is being
+    computed.
+    """
+    return await asyncio.to_thread(jobs.submit, request.session[SESSION_KEY], state)
+
+
+async def api_job_start(request):
+    """Start the AI's move as a background job."""
+    state = require_state(load_state(request))
+    job = await submit_job(request, state)
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+def find_job(request):
+    """Return the session's job named in the path or raise a 404 :class:`ApiError`."""
+    job = jobs.get(request.path_params["job_id"], request.session.get(SESSION_KEY))
+    if job is None:
+        raise ApiError("Unknown job", status=404)
+    return job
+
+
+async def api_job(request):
+    """Return a job's status; ``move`` is the AI's ``[row, col]`` once done."""
+    return JSONResponse(find_job(request).to_dict())
+
+
+async def api_job_events(request):
+    """Stream a single Server-Sent Event named after the job's final status."""
+    job = find_job(request)
+
+    async def stream():
+        waited = 0.0
+        while not job.wait(0):
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            waited += SSE_POLL_INTERVAL
+            if waited >= SSE_KEEPALIVE:
+                waited = 0.0
+                yield ": keep-alive\n\n"
+        yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def api_profile(request):
+    """Return the :mod:`game.profiling` counters of this process.
+
+    Moves computed in :data:`ai_pool` run in other processes and are not
+    counted.
+    """
+    return JSONResponse(profile_counters())
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    ponderer.shutdown()
+    ai_pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route("/", index),
+        Route("/api/board", api_board, methods=["GET"]),
+        Route("/api/reset", api_reset, methods=["POST"]),
+        Route("/api/start", api_start, methods=["POST"]),
+        Route("/api/pass", api_pass, methods=["POST"]),
+        Route("/api/move", api_move, methods=["POST"]),
+        Route("/api/opponentmove", api_opponent_move, methods=["POST"]),
+        Route("/api/jobs", api_job_start, methods=["POST"]),
+        Route("/api/jobs/{job_id}", api_job, methods=["GET"]),
+        Route("/api/jobs/{job_id}/events", api_job_events, methods=["GET"]),
+        Route("/api/profile", api_profile, methods=["GET"]),
+        Mount("/static", StaticFiles(directory=os.path.join(_HERE, "static")), name="static"),
+    ],
+    middleware=[
+        Middleware(SessionMiddleware, secret_key=os.environ.get("SECRET_KEY") or os.urandom(24).hex(),
+                   same_site="lax"),
+    ],
+    exception_handlers={ApiError: api_error},
+    lifespan=lifespan,
+)
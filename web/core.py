@@ -0,0 +1,336 @@
+"""Framework-independent core of the web API.
+
+Both serving modes share everything here: the per-session
+:class:`GameState`, the server-side game store, and one function per
+API operation.  :mod:`web.app` (Flask, WSGI) and :mod:`web.asgi`
+(Starlette, ASGI) only translate requests and sessions into these calls
+and :class:`ApiError` into ``400`` responses, so both serve the same
+routes with the same JSON contract.
+
+The AI's move is split in two for the ASGI mode: :func:`choose_reply`
+is a plain function of the packed board, so it can run in a worker
+process, and :func:`apply_reply` plays its answer on the live game.
+"""
+import base64
+import json
+import logging
+import os
+import random
+import secrets
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from game import profiling
+from game.book import install_default as install_default_book
+from game.engine import board_class, create_board
+from game.poscache import play_cached
+from web.store import STORE_ENV_VAR, DEFAULT_STORE, SessionLocks, make_store
+
+logger = logging.getLogger(__name__)
+
+# Use the opening book named by BLACKNWHITE_BOOK, if any, for the
+# 'smart' and 'search' strategies.
+install_default_book()
+
+# Count board, strategy and search calls when BLACKNWHITE_PROFILE is set;
+# served at /api/profile.
+profiling.enable_from_env()
+
+# Per-move wall-clock budget for the 'search' strategy, in seconds.
+SEARCH_TIME_LIMIT = 0.05
+
+# Strategies whose reply depends only on the exact position; their moves
+# are shared between sessions through game.poscache.  'search' is left
+# out: its reply depends on how far it got within SEARCH_TIME_LIMIT.
+CACHED_STRATEGIES = {"first", "smart"}
+
+STRATEGIES = {"first", "random", "maxflips", "smart", "search"}
+COLORS = {"BLACK", "WHITE"}
+
+# Clients opt into compact responses with ?format=compact or this media type.
+COMPACT_MIMETYPE = "application/vnd.blacknwhite.compact+json"
+
+# Session key holding the game store id.
+SESSION_KEY = "sid"
+
+
+class ApiError(Exception):
+    """A request the API rejects; ``message`` is returned as ``{"error": ...}``."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def move_seed(seed, board):
+    """Return the seed of the AI's move on ``board`` in a game seeded with ``seed``.
+
+    It is derived from the game seed and the ply, so it does not depend
+    on anything outside the game.
+    """
+    ply = board.pass_count + 60 - board.open_count()
+    return f"{seed}/{ply}"
+
+
+class GameState:
+    """Holds all per-session game data: the board, the player's color, and the AI strategy.
+
+    Instances live in the server-side game store (see :mod:`web.store`); the
+    session cookie only holds the id they are stored under.  Backends that
+    persist games outside the process use :meth:`to_json`/:meth:`from_json`.
+    """
+    __slots__ = ("board", "strategy", "color", "seed")
+
+    def __init__(self, strategy=None, color=None, seed=None):
+        """Create a fresh game with a new board.
+
+        Args:
+            strategy: AI strategy for the opponent — ``'random'``, ``'maxflips'``,
+                ``'smart'``, ``'search'``, or ``'first'`` (default).
+            color: The human player's color as an uppercase string — ``'BLACK'`` or
+                ``'WHITE'``.
+            seed: Seed for the AI's random choices; a random one is drawn when
+                omitted.  Replaying the same moves with the same seed replays
+                the same AI replies.
+        """
+        self.board = create_board()
+        self.strategy = strategy
+        self.color = color
+        self.seed = seed if seed is not None else secrets.randbits(32)
+
+    def move_seed(self):
+        """Return the seed of the AI's next move; see :func:`move_seed`."""
+        return move_seed(self.seed, self.board)
+
+    def move_rng(self):
+        """Return the RNG for the AI's next move, seeded with :meth:`move_seed`."""
+        return random.Random(self.move_seed())
+
+    def snapshot(self):
+        """Return a copy of this game with a board of its own.
+
+        Take it under the session's lock to read the position later while
+        background jobs may change the stored game.
+        """
+        state = GameState.__new__(GameState)
+        state.board = type(self.board).from_bytes(self.board.to_bytes())
+        state.strategy = self.strategy
+        state.color = self.color
+        state.seed = self.seed
+        return state
+
+    def to_json(self, compact=False, extra=None):
+        """Serialise the game state to a JSON string for API responses and stores.
+
+        The board is embedded as a plain dict (not a nested JSON string) so the
+        client can read all fields without a second ``JSON.parse`` call.
+        Includes ``valid_moves`` (list of ``[row, col]`` pairs) when it is the
+        human player's turn, so the client can highlight legal squares.
+
+        With ``compact=True`` the board is instead the base64 of
+        :meth:`Board.to_bytes` and ``valid_moves`` a 16-digit hex mask
+        (bit = row * 8 + col), which is about a tenth of the size.
+
+        ``extra`` fields, such as a job id, are added to the object.
+        """
+        valid_moves = []
+        if (
+            self.color
+            and not self.board.game_over()
+            and self.board.current_turn.name == self.color
+        ):
+            try:
+                moves = self.board.open_moves().get("moves", {})
+                valid_moves = [list(pos) for pos in moves.keys()]
+            except Exception:
+                pass
+        if compact:
+            board = base64.b64encode(self.board.to_bytes()).decode("ascii")
+            valid_moves = format(sum(1 << (r * 8 + c) for r, c in valid_moves), "016x")
+        else:
+            board = self.board.to_dict()
+        return json.dumps(
+            {
+                "board": board,
+                "strategy": self.strategy,
+                "color": self.color,
+                "seed": self.seed,
+                "valid_moves": valid_moves,
+                **(extra or {}),
+            }
+        )
+
+    @staticmethod
+    def from_json(json_str):
+        """Deserialise a JSON string produced by :meth:`to_json` back into a GameState.
+
+        Accepts both the full and the compact form.
+
+        Args:
+            json_str: A JSON string produced by :meth:`to_json`.
+
+        Returns:
+            A fully reconstructed :class:`GameState` instance.
+        """
+        data = json.loads(json_str)
+        state = GameState()
+        if isinstance(data["board"], str):
+            state.board = board_class().from_bytes(base64.b64decode(data["board"]))
+        else:
+            state.board = board_class().from_dict(data["board"])
+        state.strategy = data["strategy"]
+        state.color = data["color"]
+        state.seed = data.get("seed", state.seed)
+        return state
+
+
+store = make_store(os.environ.get(STORE_ENV_VAR, DEFAULT_STORE),
+                   dumps=GameState.to_json, loads=GameState.from_json)
+
+# Held while a request or a background job changes a session's game.
+session_locks = SessionLocks()
+
+
+def wants_compact(format_arg, accept):
+    """Return True if ``?format=`` or the ``Accept`` header asks for the compact format."""
+    if format_arg == "compact":
+        return True
+    accepted = parse_accept_header(accept, MIMEAccept)
+    return accepted.best_match(["application/json", COMPACT_MIMETYPE]) == COMPACT_MIMETYPE
+
+
+def profile_counters():
+    """Return the :mod:`game.profiling` counters, or raise a 404 :class:`ApiError` if it is off."""
+    if not profiling.is_enabled():
+        raise ApiError("Profiling is disabled", status=404)
+    return profiling.snapshot()
+
+
+def require_state(state):
+    """Return ``state``, or raise :class:`ApiError` if there is no game."""
+    if state is None:
+        raise ApiError("No game in progress")
+    return state
+
+
+def new_game(data):
+    """Return a new :class:`GameState` for a ``/api/start`` request body.
+
+    Unknown strategies fall back to ``'first'`` and unknown colors to
+    ``'BLACK'``; a non-integer seed is ignored.
+    """
+    strategy = data.get("strategy", "first")
+    color = data.get("color", "BLACK").upper()
+    if strategy not in STRATEGIES:
+        strategy = "first"
+    if color not in COLORS:
+        color = "BLACK"
+    seed = data.get("seed")
+    if not isinstance(seed, int) or isinstance(seed, bool):
+        seed = None
+    return GameState(strategy=strategy, color=color, seed=seed)
+
+
+def player_pass(state):
+    """Pass the human player's turn."""
+    require_state(state)
+    if state.color != state.board.current_turn.name:
+        raise ApiError("Not your turn")
+    state.board.pass_turn()
+
+
+def player_move(state, data):
+    """Apply the human player's move from a ``{"row", "col"}`` request body."""
+    require_state(state)
+    if state.color != state.board.current_turn.name:
+        raise ApiError("Not your turn")
+
+    row = data.get("row")
+    col = data.get("col")
+    if not isinstance(row, int) or not isinstance(col, int):
+        raise ApiError("Missing row or col")
+    if not (0 <= row < 8 and 0 <= col < 8):
+        raise ApiError("Row and col must be between 0 and 7")
+
+    if state.board.game_over():
+        raise ApiError("Game is over")
+    moves = state.board.open_moves()["moves"]
+    pos = (row, col)
+    if pos not in moves:
+        raise ApiError("Invalid move")
+    try:
+        state.board.make_move(pos, moves[pos])
+    except ValueError:
+        logger.exception("Failed to apply player move")
+        raise ApiError("Invalid move")
+
+
+def ai_to_move(state):
+    """Return True if the AI is to move in ``state``'s live game."""
+    return (state.color is not None and state.color != state.board.current_turn.name
+            and not state.board.game_over())
+
+
+def check_opponent_turn(state):
+    """Raise :class:`ApiError` unless the AI is to move in a live game."""
+    require_state(state)
+    if state.color == state.board.current_turn.name:
+        raise ApiError("Not opponent's turn")
+    if state.board.game_over():
+        raise ApiError("Game is over")
+
+
+def play_first_move(board):
+    """Play the first legal move in row-major order, or pass if there is none.
+
+    Only the moves up to the first legal one are generated.
+    """
+    for pos, flips in board.iter_moves():
+        board.make_move(pos, flips)
+        return pos, flips
+    board.pass_turn()
+    return None, None
+
+
+def strategy_player(board, strategy):
+    """Return a callable that plays one ``strategy`` move on ``board``."""
+    if strategy == "random":
+        return board.make_random_move
+    if strategy == "maxflips":
+        return board.make_maxflips_move
+    if strategy == "smart":
+        return board.make_smart_move
+    if strategy == "search":
+        return lambda: board.make_search_move(time_limit=SEARCH_TIME_LIMIT)
+    return lambda: play_first_move(board)  # 'first' or default
+
+
+def opponent_move(state):
+    """Play the AI's move on ``state`` in this process."""
+    check_opponent_turn(state)
+    state.board.rng = state.move_rng()
+    play = strategy_player(state.board, state.strategy)
+    if state.strategy in CACHED_STRATEGIES:
+        play_cached(state.board, state.strategy, play)
+    else:
+        play()
+
+
+def choose_reply(packed_board, strategy, move_seed):
+    """Return the AI's ``(row, col)`` for a packed board, or None to pass.
+
+    A pure function of its arguments, so it can run in a worker process.
+    """
+    board = board_class().from_bytes(packed_board, rng=random.Random(move_seed))
+    pos, _ = strategy_player(board, strategy)()
+    return pos
+
+
+def apply_reply(state, pos):
+    """Play the AI's reply ``pos`` (None = pass) chosen by :func:`choose_reply`."""
+    if pos is None:
+        state.board.pass_turn()
+    else:
+        state.board.make_move(pos, state.board.open_moves()["moves"][pos])
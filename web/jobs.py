@@ -0,0 +1,178 @@
+"""Background AI moves for the web API.
+
+Instead of holding a request open while the AI thinks, a client can
+start a job and collect the result later: ``POST /api/jobs`` (or a
+``/api/move`` with ``"think": true``) returns a job id at once, and the
+client polls ``GET /api/jobs/<id>`` or listens on
+``GET /api/jobs/<id>/events`` (Server-Sent Events) until it is done.
+
+A job computes the reply with :func:`web.core.choose_reply` on the
+packed board in an executor, then plays it on the stored game.  If the
+game changed in the meantime (the client used ``/api/opponentmove``,
+reset, ...) the reply is dropped and the job ends ``stale``.  With a
+:class:`~web.ponder.Ponderer`, pondered (or cached) replies skip the
+computation, and each finished job starts pondering the human's next
+move.  Even those are played from the executor, never from the caller
+of :meth:`JobManager.submit`, so a request handler can still serialise
+the position it just saved.
+
+Job statuses: ``pending``, ``done``, ``stale`` and ``error``.
+"""
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from game.poscache import shared_cache
+from web.core import CACHED_STRATEGIES, apply_reply, check_opponent_turn, choose_reply
+from web.ponder import MISSING
+from web.store import SessionLocks
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+STALE = "stale"
+ERROR = "error"
+
+# Finished jobs are forgotten this many seconds after they end.
+JOB_TTL = 120
+DEFAULT_WORKERS = 4
+
+
+def known_reply(pos):
+    """Return ``pos``: the executor call for a reply known at submission."""
+    return pos
+
+
+class Job:
+    """One AI move being computed for a stored game."""
+
+    def __init__(self, sid, packed, strategy, move_seed):
+        self.id = secrets.token_urlsafe(8)
+        self.sid = sid
+        self.packed = packed
+        self.strategy = strategy
+        self.move_seed = move_seed
+        self.status = PENDING
+        self.move = None
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job ends or ``timeout`` passes; return True if it ended."""
+        return self._done.wait(timeout)
+
+    @property
+    def seconds(self):
+        """Seconds from submission to the end of the job, or None while pending."""
+        return self.finished - self.started if self.finished is not None else None
+
+    def to_dict(self):
+        return {
+            "job": self.id,
+            "status": self.status,
+            "move": list(self.move) if self.move is not None else None,
+        }
+
+
+class JobManager:
+    """Runs AI jobs in ``executor`` and applies their moves to ``store``.
+
+    ``executor`` may be a thread or a process pool; by default a small
+    thread pool is created.  ``on_done`` is called with every job that
+    ends, from whichever thread ended it.  A finished job plays its move
+    while holding the session's lock from ``locks``; request handlers
+    that change games must share the same :class:`~web.store.SessionLocks`.
+    """
+
+    def __init__(self, store, executor=None, ttl=JOB_TTL, clock=time.monotonic, ponderer=None,
+                 on_done=None, locks=None):
+        self.store = store
+        self.locks = locks if locks is not None else SessionLocks()
+        self.ponderer = ponderer
+        self.on_done = on_done
+        self._owns_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(DEFAULT_WORKERS)
+        self.ttl = ttl
+        self.clock = clock
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, sid, state):
+        """Start computing the AI's move for ``state``, stored under ``sid``.
+
+        The move is always played from the executor, even when a pondered
+        or cached reply is ready, so callers may hold the session's lock.
+        Raises :class:`web.core.ApiError` if it is not the AI's turn.
+        """
+        check_opponent_turn(state)
+        job = Job(sid, state.board.to_bytes(), state.strategy, state.move_seed())
+        job.started = self.clock()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        reply = self.ponderer.take(sid, state) if self.ponderer is not None else MISSING
+        cache = shared_cache() if job.strategy in CACHED_STRATEGIES else None
+        if reply is MISSING and cache is not None:
+            reply = cache.get(state.board, job.strategy) or MISSING
+        if reply is not MISSING:
+            job.future = self.executor.submit(known_reply, reply)
+        else:
+            job.future = self.executor.submit(choose_reply, job.packed, job.strategy, job.move_seed)
+        job.future.add_done_callback(lambda future: self._completed(job, future))
+        return job
+
+    def get(self, job_id, sid):
+        """Return the job ``job_id`` if it belongs to session ``sid``, else None."""
+        job = self._jobs.get(job_id)
+        if job is None or job.sid != sid:
+            return None
+        return job
+
+    def _completed(self, job, future):
+        try:
+            pos = future.result()
+        except Exception:
+            logger.exception("AI job %s failed", job.id)
+            self._end(job, ERROR)
+            return
+        self._finish(job, pos)
+
+    def _finish(self, job, pos):
+        """Play ``pos`` on the stored game unless it moved on since the job started."""
+        with self.locks.get(job.sid):
+            state = self.store.load(job.sid)
+            if state is None or state.board.to_bytes() != job.packed:
+                status = STALE
+            else:
+                cache = shared_cache() if job.strategy in CACHED_STRATEGIES else None
+                if cache is not None and pos is not None:
+                    cache.put(state.board, job.strategy, pos)
+                apply_reply(state, pos)
+                self.store.save(job.sid, state)
+                job.move = pos
+                status = DONE
+                if self.ponderer is not None:
+                    self.ponderer.start(job.sid, state)
+        self._end(job, status)
+
+    def _end(self, job, status):
+        job.status = status
+        job.finished = self.clock()
+        if self.on_done is not None:
+            self.on_done(job)
+        job._done.set()
+
+    def _prune(self):
+        cutoff = self.clock() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """Shut down the executor if this manager created it."""
+        if self._owns_executor:
+            self.executor.shutdown(cancel_futures=True)
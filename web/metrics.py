@@ -0,0 +1,215 @@
+"""In-process metrics for the web API, served as Prometheus text.
+
+:class:`ApiMetrics` aggregates the numbers operations care about:
+
+- ``blacknwhite_http_request_duration_seconds``: latency histogram per
+  endpoint and method;
+- ``blacknwhite_http_requests_total``: requests per endpoint, method and
+  status;
+- ``blacknwhite_ai_think_seconds``: how long the AI took to produce a
+  move, per strategy;
+- ``blacknwhite_response_payload_bytes``: size of the game state payloads
+  sent back, per endpoint;
+- ``blacknwhite_api_errors_total``: rejected requests per endpoint and
+  error message (``Not your turn``, ``Invalid move``, ...).
+
+:meth:`ApiMetrics.render` returns them in the Prometheus text exposition
+format, which :mod:`web.app` serves at ``/metrics``; any HTTP client can
+read it, no collector needed.
+
+Recording is lock-light: every thread updates its own shard of each
+metric, and only :meth:`Registry.render` (and a thread's first update)
+takes a lock.  Shards of threads that have exited are folded together so
+per-request threads do not pile up.
+"""
+import bisect
+import math
+import threading
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+THINK_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PAYLOAD_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Shards kept before those of exited threads are folded together.
+MAX_SHARDS = 64
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """A metric whose values are kept in one shard per thread."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []  # (thread, {label values: value})
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                if len(self._shards) >= MAX_SHARDS:
+                    self._fold_exited()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_exited(self):
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                for key, value in shard.copy().items():
+                    self._retired[key] = self._merge(self._retired.get(key), value)
+        self._shards = alive
+
+    def collect(self):
+        """Return ``{label values: value}`` summed over every thread."""
+        with self._lock:
+            self._fold_exited()
+            total = {key: self._merge(None, value) for key, value in self._retired.items()}
+            for _, shard in self._shards:
+                for key, value in shard.copy().items():
+                    total[key] = self._merge(total.get(key), value)
+        return total
+
+    def _merge(self, total, value):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in sorted(self.collect().items()):
+            lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, total, value):
+        return (total or 0) + value
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # one count per bucket, then +Inf, then the running sum
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self, total, value):
+        value = list(value)
+        if total is None:
+            return value
+        return [a + b for a, b in zip(total, value)]
+
+    def _samples(self, key, counts):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+        lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ApiMetrics:
+    """The web API's metrics; see the module docstring."""
+
+    def __init__(self):
+        self.registry = Registry()
+        self.request_duration = self.registry.histogram(
+            "blacknwhite_http_request_duration_seconds", "Time to handle an API request.",
+            ("endpoint", "method"))
+        self.requests = self.registry.counter(
+            "blacknwhite_http_requests_total", "API requests handled.", ("endpoint", "method", "status"))
+        self.think_time = self.registry.histogram(
+            "blacknwhite_ai_think_seconds", "Time the AI took to produce a move.", ("strategy",),
+            THINK_BUCKETS)
+        self.payload_size = self.registry.histogram(
+            "blacknwhite_response_payload_bytes", "Size of API response bodies.", ("endpoint",),
+            PAYLOAD_BUCKETS)
+        self.errors = self.registry.counter(
+            "blacknwhite_api_errors_total", "Requests rejected by the API.", ("endpoint", "error"))
+
+    def observe_request(self, endpoint, method, status, seconds, size=None):
+        """Record one handled request; ``size`` is the body length, if known."""
+        self.request_duration.observe(seconds, endpoint, method)
+        self.requests.inc(endpoint, method, str(status))
+        if size is not None:
+            self.payload_size.observe(size, endpoint)
+
+    def observe_think(self, strategy, seconds):
+        self.think_time.observe(seconds, strategy)
+
+    def count_error(self, endpoint, message):
+        self.errors.inc(endpoint, message)
+
+    def render(self):
+        return self.registry.render()
@@ -0,0 +1,208 @@
+"""Pondering: think about the AI's next reply while the human thinks.
+
+Between the AI's move and the human's click the server sits idle.
+:class:`Ponderer` spends that time on the position the human faces: for
+each of their legal moves, likeliest first (taken to be the ones that
+flip the most), it computes the AI's reply with
+:func:`web.core.choose_reply` and keeps it for that game.  When the
+human's move lands on a pondered position, ``/api/opponentmove`` and
+background jobs answer from that table instead of thinking.
+
+Every round of pondering is bounded: it stops once it has spent
+``budget`` seconds computing (``BLACKNWHITE_PONDER_BUDGET``, default
+0.5, capped at :data:`MAX_BUDGET`; 0 turns pondering off), at most
+``workers`` rounds run at once (``BLACKNWHITE_PONDER_WORKERS``), and
+replies are kept for at most ``max_games`` games.  A game's round ends
+as soon as the AI is asked for its move.
+
+Only strategies in :data:`PONDER_STRATEGIES` are pondered; the others
+answer faster than a lookup pays back.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from game.engine import board_class
+from game.poscache import shared_cache
+from web.core import CACHED_STRATEGIES, apply_reply, choose_reply, move_seed
+
+logger = logging.getLogger(__name__)
+
+BUDGET_ENV_VAR = "BLACKNWHITE_PONDER_BUDGET"
+WORKERS_ENV_VAR = "BLACKNWHITE_PONDER_WORKERS"
+DEFAULT_BUDGET = 0.5
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_GAMES = 1024
+
+# Upper bound on the per-round budget, in seconds, whatever is configured.
+MAX_BUDGET = 10.0
+
+# Strategies slow enough to be worth pondering.
+PONDER_STRATEGIES = {"smart", "search"}
+
+# Returned by Ponderer.take when there is no pondered reply (None means pass).
+MISSING = object()
+
+
+class _Round:
+    """Pondering of one position the human faces."""
+
+    def __init__(self, packed, strategy, seed):
+        self.packed = packed
+        self.strategy = strategy
+        self.seed = seed
+        self.replies = {}  # packed position after the human's move -> reply
+        self.current = None
+        self.cancelled = False
+        self.spent = 0.0
+        self.future = None
+
+
+class Ponderer:
+    """Precomputes the AI's replies to the human's moves, per game.
+
+    Args:
+        budget: seconds of computing per round; 0 disables pondering.
+        workers: rounds run at once, each in its own thread.
+        max_games: games whose replies are kept before the oldest is dropped.
+        strategies: strategies to ponder.
+        compute: ``compute(packed, strategy, move_seed)`` returns the AI's
+            reply; :func:`web.core.choose_reply` by default.  The ASGI app
+            passes one that waits on its process pool.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, workers=DEFAULT_WORKERS, max_games=DEFAULT_MAX_GAMES,
+                 strategies=PONDER_STRATEGIES, compute=choose_reply, clock=time.perf_counter):
+        self.budget = min(budget, MAX_BUDGET)
+        self.workers = workers
+        self.max_games = max_games
+        self.strategies = strategies
+        self.compute = compute
+        self.clock = clock
+        self._executor = None
+        self._games = OrderedDict()  # sid -> _Round
+        self._lock = threading.Lock()
+        self.rounds = self.positions = self.hits = self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.budget > 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ponder")
+        return self._executor
+
+    def start(self, sid, state):
+        """Start pondering the human's moves in ``state`` for game ``sid``.
+
+        Does nothing unless the human is to move in a live game against a
+        pondered strategy.  Returns the round, or None.
+        """
+        board = state.board
+        if (not self.enabled or state.strategy not in self.strategies
+                or state.color != board.current_turn.name or board.game_over()):
+            return None
+        round_ = _Round(board.to_bytes(), state.strategy, state.seed)
+        with self._lock:
+            self._cancel(self._games.pop(sid, None))
+            self._games[sid] = round_
+            while len(self._games) > self.max_games:
+                self._cancel(self._games.popitem(last=False)[1])
+            self.rounds += 1
+        round_.future = self._get_executor().submit(self._run, round_)
+        return round_
+
+    def take(self, sid, state):
+        """Return the pondered reply for ``state``'s position, or :data:`MISSING`.
+
+        Ends pondering for ``sid`` either way, waiting only if the reply
+        for this very position is being computed.
+        """
+        with self._lock:
+            round_ = self._games.pop(sid, None)
+        reply = MISSING
+        if round_ is not None:
+            round_.cancelled = True
+            packed = state.board.to_bytes()
+            if round_.current == packed:
+                round_.future.result()
+            if round_.strategy == state.strategy and round_.seed == state.seed:
+                reply = round_.replies.get(packed, MISSING)
+        with self._lock:
+            if reply is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return reply
+
+    def play(self, sid, state):
+        """Play the pondered reply on ``state`` if there is one; return True if it did."""
+        reply = self.take(sid, state)
+        if reply is MISSING:
+            return False
+        apply_reply(state, reply)
+        return True
+
+    def _run(self, round_):
+        board = board_class().from_bytes(round_.packed)
+        moves = sorted(board.open_moves()["moves"].items(), key=lambda item: -len(item[1]))
+        cache = shared_cache() if round_.strategy in CACHED_STRATEGIES else None
+        for pos, flips in moves:
+            if round_.cancelled or round_.spent >= self.budget:
+                break
+            board.make_move(pos, flips)
+            # Replies the position cache already knows need no pondering.
+            known = board.game_over() or (cache is not None and cache.get(board, round_.strategy) is not None)
+            packed = board.to_bytes()
+            seed = move_seed(round_.seed, board)
+            board.undo_move()
+            if known:
+                continue
+            round_.current = packed
+            started = self.clock()
+            try:
+                round_.replies[packed] = self.compute(packed, round_.strategy, seed)
+            except Exception:
+                logger.exception("Pondering failed")
+                break
+            finally:
+                round_.spent += self.clock() - started
+                round_.current = None
+            with self._lock:
+                self.positions += 1
+
+    @staticmethod
+    def _cancel(round_):
+        if round_ is not None:
+            round_.cancelled = True
+
+    def stats(self):
+        """Return a dict of the games being pondered and the counters."""
+        return {
+            "games": len(self._games),
+            "rounds": self.rounds,
+            "positions": self.positions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            for round_ in self._games.values():
+                round_.cancelled = True
+            self._games.clear()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+def from_env(**kwargs):
+    """Return a :class:`Ponderer` configured from the environment."""
+    budget = float(os.environ.get(BUDGET_ENV_VAR, DEFAULT_BUDGET))
+    workers = int(os.environ.get(WORKERS_ENV_VAR, DEFAULT_WORKERS))
+    return Ponderer(budget=budget, workers=max(workers, 1), **kwargs)
@@ -2,7 +2,7 @@
 /** The human player's color ('BLACK' or 'WHITE'), or null before a game is started. */
 let playerColor = null;
 
-/** The AI strategy chosen at game start ('random', 'maxflips', 'smart'). */
+/** The AI strategy chosen at game start ('random', 'maxflips', 'smart', 'search'). */
 let currentStrategy = null;
 
 /** Last-fetched game state, used to avoid redundant server round-trips. */
@@ -11,9 +11,15 @@ let currentState = null;
 /** Prevents overlapping API requests from concurrent clicks or AI calls. */
 let isRequestPending = false;
 
+/** Id of the AI job started by the player's last move, if any. */
+let pendingJob = null;
+
+/** Minimum pause before showing the AI's reply, so the player's own move registers. */
+const AI_MOVE_DELAY_MS = 700;
+
 const VALID_SQUARE_VALUES = new Set(['OPEN', 'BLACK', 'WHITE']);
 
-const STRATEGY_NAMES = { random: 'Random', maxflips: 'Max Flips', smart: 'Smart' };
+const STRATEGY_NAMES = { random: 'Random', maxflips: 'Max Flips', smart: 'Smart', search: 'Search' };
 
 /**
  * Display an error message in the status bar, auto-clearing after 3 seconds.
@@ -32,13 +38,70 @@ function setStatus(msg) {
     el.classList.remove('error');
 }
 
+const TURN_NAMES = { 1: 'BLACK', 2: 'WHITE' };
+
+/**
+ * Decode a compact board (base64 of the 21-byte layout written by
+ * Board.to_bytes) into the same shape as Board.to_dict.
+ * @param {string} encoded
+ * @returns {Object} { size, grid, current_turn, pass_count, consecutive_passes }
+ */
+function decodeBoard(encoded) {
+    const bytes = Uint8Array.from(atob(encoded), ch => ch.charCodeAt(0));
+    const view = new DataView(bytes.buffer);
+    // bytes 1-8: BLACK mask, 9-16: WHITE mask, big-endian, bit = row * 8 + col
+    const black = [view.getUint32(5), view.getUint32(1)];
+    const white = [view.getUint32(13), view.getUint32(9)];
+    const grid = [];
+    for (let r = 0; r < 8; r++) {
+        const row = [];
+        for (let c = 0; c < 8; c++) {
+            const i = r * 8 + c, word = i >> 5, bit = 1 << (i & 31);
+            row.push(black[word] & bit ? 'BLACK' : white[word] & bit ? 'WHITE' : 'OPEN');
+        }
+        grid.push(row);
+    }
+    return {
+        size: 8,
+        grid,
+        current_turn: TURN_NAMES[view.getUint8(17)],
+        pass_count: view.getUint16(19),
+        consecutive_passes: view.getUint8(18),
+    };
+}
+
+/**
+ * Decode a 16-digit hex move mask into a list of [row, col] pairs.
+ * @param {string} hex
+ * @returns {number[][]}
+ */
+function decodeMoves(hex) {
+    const words = [parseInt(hex.slice(8), 16), parseInt(hex.slice(0, 8), 16)];
+    const moves = [];
+    for (let i = 0; i < 64; i++) {
+        if (words[i >> 5] & (1 << (i & 31))) moves.push([i >> 3, i & 7]);
+    }
+    return moves;
+}
+
+/**
+ * Decode a compact-format state response in place.
+ * @param {Object} data
+ * @returns {Object} Parsed state with shape { board, strategy, color, valid_moves }.
+ */
+function decodeState(data) {
+    data.board = decodeBoard(data.board);
+    data.valid_moves = decodeMoves(data.valid_moves);
+    return data;
+}
+
 /**
- * Fetch the current game state from the server.
- * @returns {Promise<Object>} Parsed JSON with shape { board, strategy, color, valid_moves }.
+ * Fetch the current game state from the server in the compact format.
+ * @returns {Promise<Object>} Parsed state with shape { board, strategy, color, valid_moves }.
  */
 async function fetchState() {
-    const res = await fetch('/api/board');
-    return await res.json();
+    const res = await fetch('/api/board?format=compact');
+    return decodeState(await res.json());
 }
 
 /**
@@ -149,13 +212,17 @@ async function makeMove(r, c) {
 
     isRequestPending = true;
     try {
-        const res = await fetch('/api/move', {
+        const res = await fetch('/api/move?format=compact', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ row: r, col: c })
+            body: JSON.stringify({ row: r, col: c, think: true })
         });
         if (res.ok) {
-            await update();
+            // Show the position right after our move; the AI's reply, even
+            // if its job is already done, is shown by aiMove after the delay.
+            const data = decodeState(await res.json());
+            pendingJob = data.job || null;
+            show(data);
         } else {
             const body = await res.json().catch(() => ({}));
             showError(body.error || 'Invalid move');
@@ -264,11 +331,65 @@ async function startGame(color, strategy) {
     await update();
 }
 
-async function aiMove() {
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+/**
+ * Poll a background AI job until it is no longer pending.
+ * @param {string} id
+ * @returns {Promise<Object>} The final job: { job, status, move }.
+ */
+async function pollJob(id) {
+    for (;;) {
+        const res = await fetch(`/api/jobs/${id}`);
+        if (!res.ok) return { job: id, status: 'error', move: null };
+        const job = await res.json();
+        if (job.status !== 'pending') return job;
+        await sleep(100);
+    }
+}
+
+/**
+ * Wait for a background AI job over Server-Sent Events, falling back to polling.
+ * @param {string} id
+ * @returns {Promise<Object>} The final job: { job, status, move }.
+ */
+function waitForJob(id) {
+    if (typeof EventSource === 'undefined') return pollJob(id);
+    return new Promise(resolve => {
+        const source = new EventSource(`/api/jobs/${id}/events`);
+        const finish = event => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        };
+        ['done', 'stale', 'error'].forEach(status => source.addEventListener(status, finish));
+        source.onerror = () => {
+            source.close();
+            resolve(pollJob(id));
+        };
+    });
+}
+
+/**
+ * Let the AI move.  Uses the job started by the player's move if there is
+ * one, otherwise starts a new one, and waits for it alongside the usual
+ * pause so thinking time overlaps the delay.  Falls back to the blocking
+ * /api/opponentmove if the job cannot be used.
+ * @param {string|null} jobId
+ */
+async function aiMove(jobId) {
     if (isRequestPending) return;
     isRequestPending = true;
     try {
-        await fetch('/api/opponentmove', { method: 'POST' });
+        if (!jobId) {
+            const res = await fetch('/api/jobs', { method: 'POST' });
+            jobId = res.ok ? (await res.json()).job : null;
+        }
+        const [job] = await Promise.all([jobId ? waitForJob(jobId) : null, sleep(AI_MOVE_DELAY_MS)]);
+        if (!job || job.status === 'error') {
+            await fetch('/api/opponentmove', { method: 'POST' });
+        }
     } catch (e) {
         showError('Network error');
     } finally {
@@ -277,15 +398,24 @@ async function aiMove() {
     await update();
 }
 
-async function update() {
-    const data = await fetchState();
+/**
+ * Render a fetched state and, if the AI is to move, let it move.
+ * @param {Object} data
+ */
+function show(data) {
     currentState = data;
     renderBoard(data);
     if (playerColor && !isGameOver(data.board) && data.board.current_turn !== playerColor) {
-        setTimeout(aiMove, 700);
+        const jobId = pendingJob;
+        pendingJob = null;
+        setTimeout(() => aiMove(jobId), 0);
     }
 }
 
+async function update() {
+    show(await fetchState());
+}
+
 document.getElementById('startBlackBtn').onclick = async () => {
     try {
         const strategy = document.getElementById('strategySelect').value;
@@ -0,0 +1,202 @@
+"""Server-side game storage for the web app.
+
+The session cookie only carries a short random id; the game itself
+lives in a :class:`GameStore` keyed by that id.
+
+- :class:`MemoryStore` keeps live objects in process, in LRU order, and
+  drops entries that have not been touched for ``ttl`` seconds.  Nothing
+  is serialised, so a request costs a dict lookup.
+- :class:`SQLiteStore` keeps serialised games in a SQLite database, so
+  several worker processes on one host can share games or keep them
+  across a restart.
+
+Other backends (Redis, memcached, ...) only need to implement
+:meth:`GameStore.load`, :meth:`GameStore.save` and
+:meth:`GameStore.delete`.
+
+Code that loads a game, changes it and saves it back holds the
+session's lock from :class:`SessionLocks` throughout, so request
+handlers and background AI jobs never interleave on one game.
+
+:func:`make_store` builds a store from a URL such as ``memory://`` or
+``sqlite:///games.db``; the web app reads it from ``BLACKNWHITE_STORE``.
+"""
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+STORE_ENV_VAR = "BLACKNWHITE_STORE"
+DEFAULT_STORE = "memory://"
+
+# Sessions untouched for this long are dropped, in seconds.
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_LOCK_STRIPES = 256
+
+# SQLiteStore deletes expired games at most this often, in seconds.
+DEFAULT_PURGE_INTERVAL = 60 * 60
+
+
+def new_session_id():
+    """Return a fresh, unguessable session id."""
+    return secrets.token_urlsafe(16)
+
+
+class SessionLocks:
+    """One reentrant lock per session id, for load-change-save sequences.
+
+    Sessions share ``stripes`` locks by hash, which keeps memory bounded
+    at the cost of the odd wait between unrelated sessions.  The locks
+    are per process: they protect the live games of :class:`MemoryStore`,
+    not games that several processes share through :class:`SQLiteStore`.
+    """
+
+    def __init__(self, stripes=DEFAULT_LOCK_STRIPES):
+        self._locks = tuple(threading.RLock() for _ in range(stripes))
+
+    def get(self, sid):
+        """Return the lock guarding the game stored under ``sid``."""
+        return self._locks[hash(sid) % len(self._locks)]
+
+
+class GameStore:
+    """Interface of a session-id -> game mapping."""
+
+    def load(self, sid):
+        """Return the game stored under ``sid``, or None if absent or expired."""
+        raise NotImplementedError
+
+    def save(self, sid, state):
+        """Store ``state`` under ``sid``, replacing any previous game."""
+        raise NotImplementedError
+
+    def delete(self, sid):
+        """Forget the game stored under ``sid``, if any."""
+        raise NotImplementedError
+
+
+class MemoryStore(GameStore):
+    """In-process LRU store with sliding TTL expiry.
+
+    Loading or saving a game moves it to the back of the LRU order and
+    restarts its TTL.  Because every entry has the same TTL, the front
+    of the order is always the next to expire, so expired entries are
+    pruned from the front on each save.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # sid -> (expires, state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            now = self.clock()
+            if entry[0] <= now:
+                del self._entries[sid]
+                return None
+            self._entries[sid] = (now + self.ttl, entry[1])
+            self._entries.move_to_end(sid)
+            return entry[1]
+
+    def save(self, sid, state):
+        with self._lock:
+            now = self.clock()
+            self._entries[sid] = (now + self.ttl, state)
+            self._entries.move_to_end(sid)
+            while self._entries:
+                oldest, (expires, _) = next(iter(self._entries.items()))
+                if expires > now and len(self._entries) <= self.max_entries:
+                    break
+                del self._entries[oldest]
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+class SQLiteStore(GameStore):
+    """Store serialised games in a SQLite table.
+
+    Args:
+        path: database file, or ``':memory:'`` for a private database.
+        dumps: callable turning a game into a string.
+        loads: callable turning that string back into a game.
+        ttl: seconds after the last save before a game expires.
+        purge_interval: seconds between the :meth:`purge` calls that
+            :meth:`save` makes, so expired rows do not pile up.
+    """
+
+    def __init__(self, path, dumps, loads, ttl=DEFAULT_TTL, clock=time.time,
+                 purge_interval=DEFAULT_PURGE_INTERVAL):
+        self.dumps = dumps
+        self.loads = loads
+        self.ttl = ttl
+        self.clock = clock
+        self.purge_interval = purge_interval
+        self._next_purge = clock() + purge_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS games (sid TEXT PRIMARY KEY, expires REAL NOT NULL, data TEXT NOT NULL)"
+        )
+
+    def load(self, sid):
+        with self._lock:
+            row = self._db.execute("SELECT expires, data FROM games WHERE sid = ?", (sid,)).fetchone()
+        if row is None or row[0] <= self.clock():
+            return None
+        return self.loads(row[1])
+
+    def save(self, sid, state):
+        data = self.dumps(state)
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO games (sid, expires, data) VALUES (?, ?, ?)",
+                (sid, now + self.ttl, data),
+            )
+            due = now >= self._next_purge
+            if due:
+                self._next_purge = now + self.purge_interval
+        if due:
+            self.purge()
+
+    def delete(self, sid):
+        with self._lock:
+            self._db.execute("DELETE FROM games WHERE sid = ?", (sid,))
+
+    def purge(self):
+        """Delete every expired game and return how many were removed."""
+        with self._lock:
+            return self._db.execute("DELETE FROM games WHERE expires <= ?", (self.clock(),)).rowcount
+
+
+def make_store(url, dumps=None, loads=None):
+    """Build a store from ``memory://`` or ``sqlite:///<path>``.
+
+    ``dumps``/``loads`` are required by backends that serialise games.
+    """
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:"):
+        # sqlite:///games.db is relative, sqlite:////var/games.db absolute
+        if not url.startswith("sqlite:///"):
+            raise ValueError(f"sqlite store URL must look like sqlite:///<path>, got {url!r}")
+        path = url[len("sqlite:///"):] or ":memory:"
+        if dumps is None or loads is None:
+            raise ValueError("sqlite store needs dumps and loads")
+        return SQLiteStore(path, dumps, loads)
+    raise ValueError(f"Unknown game store: {url!r}")